@@ -0,0 +1,145 @@
+"""Cache of parsed .abs files."""
+import hashlib
+import logging
+import pickle
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from ..files import FileDoesNotExist, FileObj, version_key
+from ..files.tar_index import SidecarStore
+from .exceptions import AbsNotFoundException
+from .metadata import DocMetadata
+from .parse_abs import parse_abs_file
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_OVERHEAD = 4096
+"""Rough bytes of the objects in a `DocMetadata` other than its text."""
+
+
+def approx_size(doc: DocMetadata) -> int:
+    """Rough bytes used by `doc`.
+
+    The fields are mostly slices of the raw text so this is about twice the
+    text plus a fixed amount for the other objects.
+    """
+    return 2 * (len(doc.raw_safe) + len(doc.abstract)) + _ENTRY_OVERHEAD
+
+
+class AbsCache:
+    """Process local LRU cache of `DocMetadata` from `parse_abs_file()`.
+
+    Entries are keyed by the name, etag, size and updated of the `FileObj`,
+    so a changed .abs is parsed again. At most `max_entries` are kept and at
+    most about `max_bytes`, see `approx_size()`.
+
+    `shared` is an optional second tier, any `SidecarStore` such as a
+    `DirectorySidecarStore` in a node local directory, so worker processes
+    on a node can reuse each other's parses. Entries in it are pickled, so
+    it must only be writable by trusted processes. Errors reading or writing
+    it are logged and the file is parsed as if it were not there.
+
+    The same `DocMetadata` is returned to every caller that gets it from
+    this process's tier, so callers must not modify it. Use
+    `dataclasses.replace()` to get a changed copy.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 256 * 1024 * 1024,
+                 shared: Optional[SidecarStore] = None):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._data: OrderedDict[str, Tuple[DocMetadata, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def parse(self, file: FileObj) -> DocMetadata:
+        """Gets the `DocMetadata` of `file` from the cache or by parsing it.
+
+        Raises the same exceptions as `parse_abs_file()`.
+        """
+        if isinstance(file, FileDoesNotExist):
+            raise AbsNotFoundException
+        key = hashlib.sha256(version_key(file).encode('utf-8')).hexdigest()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+
+        doc = self._get_shared(key)
+        if doc is None:
+            doc = parse_abs_file(file)
+            with self._lock:
+                self.misses += 1
+            if self.shared is not None:
+                try:
+                    self.shared.put(f"{key}.abs.pickle", pickle.dumps(doc, pickle.HIGHEST_PROTOCOL))
+                except Exception:
+                    logger.warning("could not save shared abs cache entry %s", key,
+                                   exc_info=True)
+        self._add(key, doc)
+        return doc
+
+    def _get_shared(self, key: str) -> Optional[DocMetadata]:
+        if self.shared is None:
+            return None
+        try:
+            data = self.shared.get(f"{key}.abs.pickle")
+        except Exception:
+            logger.warning("could not read shared abs cache entry %s", key, exc_info=True)
+            return None
+        if data is None:
+            return None
+        try:
+            doc = pickle.loads(data)
+        except Exception:
+            logger.warning("ignoring bad shared abs cache entry %s", key)
+            return None
+        with self._lock:
+            self.shared_hits += 1
+        return doc  # type: ignore
+
+    def _add(self, key: str, doc: DocMetadata) -> None:
+        size = approx_size(doc)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._data[key] = (doc, size)
+            self.total_bytes += size
+            while len(self._data) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.total_bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all entries from this process, the shared tier is kept."""
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hits, shared hits, misses, evictions and sizes."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'shared_hits': self.shared_hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': len(self._data),
+                    'bytes': self.total_bytes,
+                    'max_entries': self.max_entries,
+                    'max_bytes': self.max_bytes}
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,136 @@
+"""Parse many arXiv .abs files in parallel."""
+import io
+import itertools
+import logging
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, \
+    ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional, \
+    Set, Tuple, Union
+
+from ..files import FileDoesNotExist, FileObj
+from ..files.object_store import ObjectStore
+from .exceptions import AbsNotFoundException
+from .metadata import DocMetadata
+from .parse_abs import parse_abs
+
+logger = logging.getLogger(__name__)
+
+
+class BulkParseError(NamedTuple):
+    """A file that could not be read or parsed."""
+
+    name: str
+    exception: Exception
+
+
+BulkResult = Union[DocMetadata, BulkParseError]
+
+Progress = Callable[[int, int], None]
+"""Called with the number of files done and how many of those failed."""
+
+_Item = Tuple[str, Union[str, Exception], Optional[datetime]]
+
+
+def _read(file: FileObj) -> _Item:
+    """Reads the text of `file` like `parse_abs_file()` does."""
+    if isinstance(file, FileDoesNotExist):
+        return file.name, AbsNotFoundException(file.name), None
+    try:
+        with io.TextIOWrapper(file.open('rb'), encoding='latin-1') as fh:  # type: ignore
+            return file.name, fh.read(), file.updated
+    except Exception as ex:
+        return file.name, ex, None
+
+
+def _parse_chunk(items: List[_Item]) -> List[BulkResult]:
+    results: List[BulkResult] = []
+    for name, raw, modified in items:
+        if isinstance(raw, Exception):
+            results.append(BulkParseError(name, raw))
+            continue
+        try:
+            results.append(parse_abs(raw, modified))  # type: ignore
+        except Exception as ex:
+            results.append(BulkParseError(name, ex))
+    return results
+
+
+def parse_abs_files(files: Iterable[FileObj], processes: Optional[int] = None,
+                    chunksize: int = 64, ordered: bool = True,
+                    max_pending: Optional[int] = None, read_threads: int = 8,
+                    progress: Optional[Progress] = None) -> Iterator[BulkResult]:
+    """Parses the .abs `files` on a pool of processes.
+
+    Yields a `DocMetadata` for each file or a `BulkParseError` for files
+    that could not be read or parsed. With `ordered` the results are in the
+    order of `files`, otherwise they are in the order chunks finish, which
+    keeps all processes busy when some chunks are slow.
+
+    The files are read in this process by `read_threads` threads and sent
+    to the pool in chunks of `chunksize`. At most `max_pending` chunks, by
+    default twice the number of processes, are read but not yet yielded, so
+    memory is bounded however many files there are. `processes` of 0 parses
+    in this process, which is useful for debugging.
+
+    `progress` is called after each chunk is yielded.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    workers = 1 if processes == 0 else processes or os.cpu_count() or 1
+    pool = None if processes == 0 else ProcessPoolExecutor(max_workers=workers)
+    max_pending = max_pending or 2 * workers
+    reader = ThreadPoolExecutor(read_threads, thread_name_prefix="parse_abs_files")
+
+    def submit(chunk: List[FileObj]) -> Future:
+        items = list(reader.map(_read, chunk))
+        if pool is None:
+            future: Future = Future()
+            future.set_result(_parse_chunk(items))
+            return future
+        return pool.submit(_parse_chunk, items)
+
+    done = failed = 0
+    remaining = iter(files)
+    pending: Deque[Future] = deque()
+    unordered: Set[Future] = set()
+    try:
+        while True:
+            while len(pending) + len(unordered) < max_pending:
+                chunk = list(itertools.islice(remaining, chunksize))
+                if not chunk:
+                    break
+                (pending.append if ordered else unordered.add)(submit(chunk))
+            if ordered:
+                if not pending:
+                    break
+                finished = [pending.popleft()]
+            else:
+                if not unordered:
+                    break
+                completed, _ = wait(unordered, return_when=FIRST_COMPLETED)
+                unordered -= completed
+                finished = list(completed)
+            for future in finished:
+                results = future.result()
+                yield from results
+                done += len(results)
+                failed += sum(1 for r in results if isinstance(r, BulkParseError))
+                if progress is not None:
+                    progress(done, failed)
+    finally:
+        for future in itertools.chain(pending, unordered):
+            future.cancel()
+        reader.shutdown(wait=True)
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    logger.debug("parsed %d abs files with %d errors", done, failed)
+
+
+def parse_abs_prefix(store: ObjectStore, prefix: str, **kwargs) -> Iterator[BulkResult]:  # type: ignore
+    """Parses the .abs files listed in `store` under `prefix`, ex.
+    `ftp/arxiv/papers/2401/`, with `parse_abs_files()`."""
+    files = (obj for obj in store.list(prefix) if obj.name.endswith('.abs'))
+    return parse_abs_files(files, **kwargs)
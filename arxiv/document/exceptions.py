@@ -16,3 +16,7 @@ class AbsParsingException(OSError, AbsException):
 
 class AbsDeletedException(AbsException):
     """Error class for arXiv papers that have been deleted."""
+
+
+class SnapshotException(Exception):
+    """Error class for DocMetadata snapshots that can't be written or read."""
@@ -1,8 +1,9 @@
 """Representations of arXiv document metadata."""
 from collections import abc
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime
-from typing import Iterator, List, Optional, Set, Literal, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Literal, \
+    Sequence
 
 from ..taxonomy.definitions import CATEGORIES
 from ..taxonomy.category import Category, Group, Archive
@@ -305,3 +306,59 @@ class DocMetadata:
         rv += f"  {self.abstract}\n"
         rv += "\\"
         return rv
+
+
+class LazyDocMetadata(DocMetadata):
+    """`DocMetadata` that gets some of its fields when they are first used.
+
+    `values` are the fields that are known up front. The others with a
+    loader in `loaders` are gotten by calling it with `source`, so one
+    mapping of loaders can be shared by many instances. Fields that have
+    neither get their defaults. An exception from a loader is raised each
+    time the field is used until a call succeeds.
+
+    Pickling and copying load all the fields. It is equal to a `DocMetadata`
+    with the same fields. `dataclasses.replace()` and `to_doc()` load all
+    the fields and return a `DocMetadata`.
+    """
+
+    def __new__(cls, *args: Any, **changes: Any) -> Any:
+        # dataclasses.replace() calls the class with just the fields
+        if changes and not args:
+            return DocMetadata(**changes)
+        return super().__new__(cls)
+
+    def __init__(self, values: Dict[str, Any], loaders: Mapping[str, Callable[[Any], Any]],
+                 source: Any):
+        for name in loaders:
+            if hasattr(DocMetadata, name) or name in values:
+                raise ValueError(f"{name} has a value so its loader would never be used")
+        self.__dict__.update(values)
+        self._loaders = loaders
+        self._source = source
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes that are not set yet
+        loader = self.__dict__.get('_loaders', {}).get(name)
+        if loader is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        value = self.__dict__[name] = loader(self._source)
+        return value
+
+    def to_doc(self) -> DocMetadata:
+        """A `DocMetadata` with all the fields loaded."""
+        return DocMetadata(**{f.name: getattr(self, f.name) for f in fields(DocMetadata)})
+
+    def __replace__(self, **changes: Any) -> DocMetadata:
+        return replace(self.to_doc(), **changes)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        for name in self._loaders:
+            getattr(self, name)
+        return {name: value for name, value in self.__dict__.items()
+                if name not in ('_loaders', '_source')}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DocMetadata):
+            return NotImplemented
+        return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(DocMetadata))
@@ -1,17 +1,19 @@
 """Parse fields from a single arXiv abstract (.abs) file."""
 
+import logging
 import os
 import re
-from typing import Any, Dict, List, Tuple, Optional, Sequence
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Optional, Sequence
 from datetime import datetime
 from pathlib import Path
 
 from zoneinfo import ZoneInfo
-from dateutil import parser
+from dateutil import parser, tz
 
 from ..taxonomy.definitions import ARCHIVES, CATEGORIES
 from ..files import FileObj, FileDoesNotExist
-from .metadata import AuthorList, DocMetadata, Submitter
+from ..taxonomy.category import Archive, Category
+from .metadata import AuthorList, DocMetadata, LazyDocMetadata, Submitter
 from ..config import settings
 from .version import VersionEntry, SourceFlag
 from ..license import License
@@ -19,6 +21,7 @@ from ..identifier import Identifier
 from .exceptions import \
     AbsException, AbsParsingException, AbsNotFoundException
 
+logger = logging.getLogger(__name__)
 
 RE_ABS_COMPONENTS = re.compile(r'^\\\\\n', re.MULTILINE)
 RE_FROM_FIELD = re.compile(
@@ -46,6 +49,10 @@ of .abs string.
 Field names are not normalized.
 """
 
+_FIELD_KEYS = {field: re.sub(r'_no$', '_num', field.lower().replace('-', '_'))
+               for field in NAMED_FIELDS}
+"""Normalized field names by the names in the .abs."""
+
 REQUIRED_FIELDS = ['title', 'authors', 'abstract']
 """Required parsed fields with normalized field names.
 
@@ -63,19 +70,28 @@ line.
 _fs_tz: Optional[ZoneInfo] = None
 """FS timezone if in a flask app."""
 
+_MONTHS = {month: n for n, month in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], 1)}
+_WEEKDAYS = frozenset(['Mon,', 'Tue,', 'Wed,', 'Thu,', 'Fri,', 'Sat,', 'Sun,'])
+
+_date_fallbacks = 0
+"""Number of dates `parse_date()` passed to dateutil."""
 
-def parse_abs_file(file: FileObj) -> DocMetadata:
+
+def parse_abs_file(file: FileObj, lazy: bool = False) -> DocMetadata:
     """Parse an arXiv .abs file from the local FS.
 
     The modified time on the abs file will be used as the modified time for the
     abstract. It will be pulled from `flask.config` if in a app_context. It
     can be specified with tz arg.
+
+    With `lazy` a `LazyDocMetadata` is returned, see `parse_abs()`.
     """
     if isinstance(file, FileDoesNotExist):
         raise AbsNotFoundException
     try:
         with file.open(mode='r', encoding='latin-1') as absf:
-            return parse_abs(absf.read(), file.updated)
+            return parse_abs(absf.read(), file.updated, lazy)
 
     except FileNotFoundError:
         raise AbsNotFoundException
@@ -84,36 +100,75 @@ def parse_abs_file(file: FileObj) -> DocMetadata:
 
 
 
-def parse_abs(raw: str, modified:datetime) -> DocMetadata:
-    """Parse an abs with fields and an abstract."""
+def parse_abs(raw: str, modified:datetime, lazy: bool = False) -> DocMetadata:
+    """Parse an abs with fields and an abstract.
+
+    With `lazy` a `LazyDocMetadata` is returned that only parses the
+    `raw_safe`, `arxiv_identifier`, `version_history`, `license` and
+    `secondary_categories` when they are first used. That is quicker and
+    smaller for listings which don't use them, but errors in those parts of
+    the .abs are raised on first use instead of here.
+    """
 
     # There are two main components to an .abs file that contain data,
     # but the split is expected to return four components.
-    components = RE_ABS_COMPONENTS.split(raw)
+    components = split_components(raw)
     if len(components) > 4:
             components = alt_component_split(components)
+    if len(components) < 3:
+        raise AbsParsingException(
+            'Unexpected number of components parsed from .abs.')
 
     abstract = components[2]
-    abs = parse_abs_top(components[1], modified, abstract)
+    if lazy:
+        abs = _lazy_doc_metadata(_tokenize_top(components[1]), modified, abstract)
+    else:
+        abs = parse_abs_top(components[1], modified, abstract)
     missing = [rf for rf in REQUIRED_FIELDS if not hasattr(abs, rf) or not getattr(abs, rf)]
     if missing:
         raise AbsParsingException(f"missing required field(s) {','.join(missing)}")
     return abs
 
 
+def split_components(raw: str) -> List[str]:
+    r"""Splits `raw` at lines of just `\\`.
 
-
-def parse_abs_top(raw: str, modified:datetime, abstract:str) -> DocMetadata:
-    """Parse just the fields part of the abs.
-
-    The top section is the field section of the abs data before the abstract.
-
-    An abstract may be passed in so it is added to the DocMetadata when constructed. The
-    abstract cannot be added later since the DocMetadata class is frozen.
-
-    `raw` is expected to not have surrounding `\\` delimiters.
+    Same as `RE_ABS_COMPONENTS.split(raw)` with a scan for the delimiter.
     """
-    prehistory, misc_fields = re.split(r'\n\n', raw)
+    components = []
+    pos = 0
+    if raw.startswith('\\\\\n'):
+        components.append('')
+        pos = 3
+    while True:
+        delim = raw.find('\n\\\\\n', max(pos - 1, 0))
+        if delim < 0:
+            components.append(raw[pos:])
+            return components
+        components.append(raw[pos:delim + 1])
+        pos = delim + 4
+
+
+class _Top(NamedTuple):
+    """The top section of an .abs split into its parts."""
+
+    raw: str
+    arxiv_id: str
+    fields: Dict[str, Any]
+    version_entries: List[str]
+    name: str
+    email: str
+    from_slice: Optional[Tuple[int, str, int]]
+    """Start, replacement and end of the submitter email in `raw`, None if it
+    has to be found with `RE_FROM_FIELD`."""
+
+
+def _tokenize_top(raw: str) -> _Top:
+    sep = raw.find('\n\n')
+    if sep < 0 or raw.find('\n\n', sep + 2) >= 0:
+        raise AbsParsingException(
+            'Expected one blank line between the prehistory and the fields.')
+    prehistory, misc_fields = raw[:sep], raw[sep + 2:]
 
     fields: Dict[str, Any] = \
         _parse_metadata_fields(key_value_block=misc_fields)
@@ -124,15 +179,21 @@ def parse_abs_top(raw: str, modified:datetime, abstract:str) -> DocMetadata:
         raise AbsParsingException(
             'Could not extract arXiv ID from prehistory component.')
 
-    arxiv_id = id_match.group('arxiv_id')
-
     # cleanup and create list of prehistory entries
-    prehistory = re.sub(r'^.*\n', '', prehistory)
-    parsed_version_entries = [line for line in re.split(r'\n', prehistory)
+    first_newline = prehistory.find('\n')
+    if first_newline >= 0:
+        prehistory = prehistory[first_newline + 1:]
+    lines = prehistory.split('\n')
+    parsed_version_entries = [line for line in lines
                               if line.startswith("Date") or line.startswith("replaced with revised")]
+    if not parsed_version_entries:
+        raise AbsParsingException('At least one version entry expected.')
 
-    # submitter data
-    from_match = RE_FROM_FIELD.match(prehistory)
+    # submitter data, the from line is matched on its own when the name
+    # can't run on to the following lines, which it can when there is no <
+    from_line = lines[0]
+    fast_from = from_line.startswith('From:') and '<' in from_line
+    from_match = RE_FROM_FIELD.match(from_line if fast_from else prehistory)
     if not from_match or not from_match.group('name'):
         name = ''
         email = 'email-not-provided'
@@ -140,48 +201,86 @@ def parse_abs_top(raw: str, modified:datetime, abstract:str) -> DocMetadata:
         name = from_match.group('name').rstrip()
         email = from_match.group('email')
 
-    # get the version history for this particular version of the document
-    if parsed_version_entries:
-        (version, version_history, arxiv_id_v) \
-            = _parse_version_entries(arxiv_id=arxiv_id,
-                                     version_entry_list=parsed_version_entries)
-        arxiv_identifier = Identifier(arxiv_id=arxiv_id_v)
+    from_start = first_newline + 1
+    from_slice = None
+    if fast_from and from_match and raw.find('From:') == from_start:
+        from_slice = (from_start, from_match.group('from') + (from_match.group('name') or ''),
+                      from_start + from_match.end())
+
+    return _Top(raw, id_match.group('arxiv_id'), fields, parsed_version_entries,
+                name, email, from_slice)
+
+
+def _raw_safe(raw: str, from_slice: Optional[Tuple[int, str, int]]) -> str:
+    """The raw top without the submitter email."""
+    if from_slice is None:
+        return re.sub(RE_FROM_FIELD, r'\g<from>\g<name>', raw, 1)
+    start, replacement, end = from_slice
+    return raw[:start] + replacement + raw[end:]
+
+
+def _primary(category_list: List[str], identifier: Callable[[], Identifier]) \
+        -> Tuple[Optional[Category], Archive]:
+    """Primary category and archive from the categories or the old style ID."""
+    if category_list and category_list[0] in CATEGORIES:
+        primary_category = CATEGORIES[category_list[0]]
+        return primary_category, primary_category.get_archive()
+    arxiv_identifier = identifier()
+    if arxiv_identifier.is_old_id:
+        return None, ARCHIVES[arxiv_identifier.archive]
+    elif category_list:
+        raise AbsException(f"Invalid caregory {category_list[0]}")
     else:
-        raise AbsParsingException('At least one version entry expected.')
+        raise AbsException('Cannot infer archive from identifier.')
+
+
+def _string_fields(fields: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {'categories': fields.get('categories'),
+            'journal_ref': fields.get('journal_ref'),
+            'report_num': fields.get('report_num'),
+            'doi': fields.get('doi'),
+            'acm_class': fields.get('acm_class'),
+            'msc_class': fields.get('msc_class'),
+            'proxy': fields.get('proxy'),
+            'comments': fields.get('comments')}
+
+
+def parse_abs_top(raw: str, modified:datetime, abstract:str) -> DocMetadata:
+    """Parse just the fields part of the abs.
+
+    The top section is the field section of the abs data before the abstract.
+
+    An abstract may be passed in so it is added to the DocMetadata when constructed. The
+    abstract cannot be added later since the DocMetadata class is frozen.
+
+    `raw` is expected to not have surrounding `\\` delimiters.
+    """
+    top = _tokenize_top(raw)
+    fields = top.fields
+
+    # get the version history for this particular version of the document
+    (version, version_history, arxiv_id_v) \
+        = _parse_version_entries(arxiv_id=top.arxiv_id,
+                                 version_entry_list=top.version_entries)
+    arxiv_identifier = Identifier(arxiv_id=arxiv_id_v)
 
     # some transformations
-    category_list: List[str] = []
-    primary_category = None
-
-    if 'categories' in fields and fields['categories']:
-        category_list = fields['categories'].split()
-        if category_list[0] in CATEGORIES:
-            primary_category = CATEGORIES[category_list[0]]
-            primary_archive = primary_category.get_archive()
-        elif arxiv_identifier.is_old_id:
-            primary_archive = ARCHIVES[arxiv_identifier.archive]
-        else:
-            raise AbsException(f"Invalid caregory {category_list[0]}")
-    elif arxiv_identifier.is_old_id:
-        primary_archive = ARCHIVES[arxiv_identifier.archive]
-    else:
-        raise AbsException('Cannot infer archive from identifier.')
+    category_list: List[str] = fields['categories'].split() if fields.get('categories') else []
+    primary_category, primary_archive = _primary(category_list, lambda: arxiv_identifier)
 
     doc_license: License = \
         License() if 'license' not in fields else License(
             recorded_uri=fields['license'])
-    raw_safe = re.sub(RE_FROM_FIELD, r'\g<from>\g<name>', raw, 1)
 
     return DocMetadata(
-        raw_safe=raw_safe,
-        arxiv_id=arxiv_id,
+        raw_safe=_raw_safe(top.raw, top.from_slice),
+        arxiv_id=top.arxiv_id,
         arxiv_id_v=arxiv_id_v,
         arxiv_identifier=arxiv_identifier,
         title=fields['title'],
         abstract=abstract,
         authors=AuthorList(fields['authors']),
-        submitter=Submitter(name=name, email=email),
-        categories=fields['categories'] if 'categories' in fields else None,
+        submitter=Submitter(name=top.name, email=top.email),
         primary_category=primary_category,
         primary_archive=primary_archive,
         primary_group=primary_archive.get_group(),
@@ -189,25 +288,62 @@ def parse_abs_top(raw: str, modified:datetime, abstract:str) -> DocMetadata:
             CATEGORIES[x] for x in category_list[1:]
             if (category_list and len(category_list) > 1)
         ],
-        journal_ref=None if 'journal_ref' not in fields
-        else fields['journal_ref'],
-        report_num=None if 'report_num' not in fields
-        else fields['report_num'],
-        doi=None if 'doi' not in fields else fields['doi'],
-        acm_class=None if 'acm_class' not in fields else
-        fields['acm_class'],
-        msc_class=None if 'msc_class' not in fields else
-        fields['msc_class'],
-        proxy=None if 'proxy' not in fields else fields['proxy'],
-        comments=fields['comments'] if 'comments' in fields else None,
         version=version,
         license=doc_license,
         version_history=version_history,
-        modified=modified
+        modified=modified,
         # private=private  # TODO, not implemented
+        **_string_fields(fields)
     )
 
 
+class _LazySource(NamedTuple):
+    """What the loaders of a `LazyDocMetadata` from an .abs need."""
+
+    raw: str
+    arxiv_id: str
+    arxiv_id_v: str
+    from_slice: Optional[Tuple[int, str, int]]
+    categories: Optional[str]
+    license: Optional[str]
+
+
+_LAZY_LOADERS: Dict[str, Callable[[_LazySource], Any]] = {
+    'raw_safe': lambda src: _raw_safe(src.raw, src.from_slice),
+    'arxiv_identifier': lambda src: Identifier(arxiv_id=src.arxiv_id_v),
+    'secondary_categories': lambda src: [CATEGORIES[x] for x in (src.categories or '').split()[1:]],
+    'license': lambda src: License() if src.license is None else License(recorded_uri=src.license),
+    # the version entries are found again rather than kept
+    'version_history': lambda src: _parse_version_entries(
+        src.arxiv_id, _tokenize_top(src.raw).version_entries)[1],
+}
+
+
+def _lazy_doc_metadata(top: _Top, modified: datetime, abstract: str) -> LazyDocMetadata:
+    """`LazyDocMetadata` with the same values `parse_abs_top()` would give."""
+    fields = top.fields
+    version = len(top.version_entries)
+    source = _LazySource(top.raw, top.arxiv_id, f"{top.arxiv_id}v{version}", top.from_slice,
+                         fields.get('categories'), fields.get('license'))
+    category_list: List[str] = fields['categories'].split() if fields.get('categories') else []
+    primary_category, primary_archive = _primary(
+        category_list, lambda: _LAZY_LOADERS['arxiv_identifier'](source))
+    return LazyDocMetadata(
+        {'arxiv_id': top.arxiv_id,
+         'arxiv_id_v': source.arxiv_id_v,
+         'title': fields['title'],
+         'abstract': abstract,
+         'authors': AuthorList(fields['authors']),
+         'submitter': Submitter(name=top.name, email=top.email),
+         'primary_category': primary_category,
+         'primary_archive': primary_archive,
+         'primary_group': primary_archive.get_group(),
+         'version': version,
+         'modified': modified,
+         **_string_fields(fields)},
+        _LAZY_LOADERS, source)
+
+
 def _parse_version_entries(arxiv_id: str, version_entry_list: List) \
         -> Tuple[int, Sequence[VersionEntry], str]:
     """Parse the version entries from the arXiv .abs file."""
@@ -221,7 +357,7 @@ def _parse_version_entries(arxiv_id: str, version_entry_list: List) \
                 'Could not extract date components from date line.')
         try:
             sd = date_match.group('date')
-            submitted_date = parser.parse(date_match.group('date'))
+            submitted_date = parse_date(sd)
         except (ValueError, TypeError) as ex:
             raise AbsParsingException(
                 f'Could not parse submitted date {sd} as datetime') from ex
@@ -247,23 +383,73 @@ def _parse_version_entries(arxiv_id: str, version_entry_list: List) \
         f"{version_entries[-1].version}")
 
 
+def parse_date(date: str) -> datetime:
+    """Parses a date from a version entry, ex. `Mon, 2 Apr 2007 19:18:42 GMT`.
+
+    Dates like that, with or without the weekday and the `GMT`, are parsed
+    directly. Others are parsed with `dateutil.parser` and counted, see
+    `date_fallbacks()`. Either way the result is the same as from dateutil:
+    `GMT` dates are in `dateutil.tz.UTC` and dates without a zone are naive.
+
+    Raises `ValueError` if the date cannot be parsed.
+    """
+    parsed = _parse_date_fast(date)
+    if parsed is not None:
+        return parsed
+    global _date_fallbacks
+    _date_fallbacks += 1
+    logger.debug("parsing unusual .abs date with dateutil: %r", date)
+    return parser.parse(date)
+
+
+def date_fallbacks() -> int:
+    """Number of dates `parse_date()` could only parse with dateutil."""
+    return _date_fallbacks
+
+
+def _parse_date_fast(date: str) -> Optional[datetime]:
+    parts = date.split()
+    if parts and parts[0] in _WEEKDAYS:
+        del parts[0]
+    if len(parts) == 5 and parts[4] == 'GMT':
+        tzinfo: Optional[tz.tzutc] = tz.UTC
+    elif len(parts) == 4:
+        tzinfo = None
+    else:
+        return None
+    day, month, year, clock = parts[:4]
+    hms = clock.split(':')
+    if month not in _MONTHS or len(year) != 4 or len(day) > 2 or len(hms) != 3 \
+            or len(hms[0]) > 2 or len(hms[1]) != 2 or len(hms[2]) != 2:
+        return None
+    digits = day + year + hms[0] + hms[1] + hms[2]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    try:
+        return datetime(int(year), _MONTHS[month], int(day),
+                        int(hms[0]), int(hms[1]), int(hms[2]), tzinfo=tzinfo)
+    except ValueError:
+        return None
+
+
 def _parse_metadata_fields(key_value_block: str) -> Dict[str, str]:
-    """Parse the key-value block from the arXiv .abs string."""
-    key_value_block = key_value_block.lstrip()
-    field_lines = re.split(r'\n', key_value_block)
+    """Parse the key-value block from the arXiv .abs string.
+
+    A line starts a field if it is one of `NAMED_FIELDS` then a colon, lines
+    that don't are added to the previous field.
+    """
     field_name = 'unknown'
     fields_builder: Dict[str, str] = {}
-    for field_line in field_lines:
-        field_match = RE_FIELD_COMPONENTS.match(field_line)
-        if field_match and field_match.group('field') in NAMED_FIELDS:
-            field_name = field_match.group(
-                'field').lower().replace('-', '_')
-            field_name = re.sub(r'_no$', '_num', field_name)
-            fields_builder[field_name] = field_match.group(
-                'value').rstrip()
+    for field_line in key_value_block.lstrip().split('\n'):
+        head, colon, value = field_line.partition(':')
+        if colon and head in _FIELD_KEYS:
+            field_name = _FIELD_KEYS[head]
+            fields_builder[field_name] = value.strip()
         elif field_name != 'unknown':
             # we have a line with leading spaces
-            fields_builder[field_name] += re.sub(r'^\s+', ' ', field_line)
+            stripped = field_line.lstrip()
+            fields_builder[field_name] += \
+                field_line if len(stripped) == len(field_line) else ' ' + stripped
     return fields_builder
 
 
@@ -0,0 +1,374 @@
+"""Binary snapshots of many `DocMetadata`.
+
+A snapshot file is a header, the records, a table of the strings that are
+used by many records, like category IDs and license URIs, and an index of
+the offset of each record by `arxiv_id_v`. `Snapshot` maps the file and
+decodes a record only when it is asked for, so opening a snapshot of
+yesterday's popular papers is quick however big it is.
+
+All integers are little endian. Format version 1 is:
+
+    header   8s magic, H version, H flags, I count, Q strings offset,
+             Q index offset
+    records  see `_Encoder`
+    strings  a record of just the strings
+    index    for each record Q offset, I length, H key length and UTF-8 key
+"""
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+from dateutil import tz
+
+from ..identifier import Identifier
+from ..license import License
+from ..taxonomy.definitions import ARCHIVES, CATEGORIES, GROUPS
+from .exceptions import SnapshotException
+from .metadata import AuthorList, DocMetadata, Submitter
+from .version import SourceFlag, VersionEntry
+
+MAGIC = b'arXivDM\0'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<8sHHIQQ')
+_INDEX_ENTRY = struct.Struct('<QIH')
+_RECORD_HEAD = struct.Struct('<IIII')
+_NONE = 0xFFFFFFFF
+"""Length or string number of None."""
+
+_STRING_FIELDS = ['raw_safe', 'arxiv_id', 'arxiv_id_v', 'title', 'abstract', 'categories',
+                  'journal_ref', 'report_num', 'doi', 'acm_class', 'msc_class', 'proxy',
+                  'comments']
+_FLAG_FIELDS = ['is_definitive', 'is_latest', 'private']
+
+
+def _tz_name(tzinfo: Optional[Any]) -> Optional[str]:
+    if tzinfo is None:
+        return None
+    if tzinfo is timezone.utc:
+        return 'utc'
+    if isinstance(tzinfo, tz.tzutc):
+        return 'dateutil.utc'
+    if isinstance(tzinfo, ZoneInfo) and tzinfo.key:
+        return f'zoneinfo:{tzinfo.key}'
+    if type(tzinfo) is timezone:
+        offset = tzinfo.utcoffset(None)
+        if tzinfo.tzname(None) == timezone(offset).tzname(None):
+            return f'offset:{offset // timedelta(microseconds=1)}'
+    raise SnapshotException(f"Cannot write datetime with tzinfo {tzinfo!r}")
+
+
+def _tz(name: Optional[str]) -> Optional[Any]:
+    if name is None:
+        return None
+    if name == 'utc':
+        return timezone.utc
+    if name == 'dateutil.utc':
+        return tz.UTC
+    kind, _, value = name.partition(':')
+    if kind == 'zoneinfo':
+        return ZoneInfo(value)
+    if kind == 'offset':
+        return timezone(timedelta(microseconds=int(value)))
+    raise SnapshotException(f"Unknown timezone {name!r} in snapshot")
+
+
+def _datetime_number(value: datetime) -> int:
+    number = value.year
+    for field, size in ((value.month, 13), (value.day, 32), (value.hour, 24),
+                        (value.minute, 60), (value.second, 60),
+                        (value.microsecond, 1_000_000), (value.fold, 2)):
+        number = number * size + field
+    return number
+
+
+def _datetime(number: int, tzinfo: Optional[Any]) -> datetime:
+    number, fold = divmod(number, 2)
+    number, microsecond = divmod(number, 1_000_000)
+    number, second = divmod(number, 60)
+    number, minute = divmod(number, 60)
+    number, hour = divmod(number, 24)
+    year, day = divmod(number, 32)
+    year, month = divmod(year, 13)
+    return datetime(year, month, day, hour, minute, second, microsecond, tzinfo, fold=fold)
+
+
+class _Encoder:
+    """Writes the fields of one record.
+
+    Fields are strings, numbers in the snapshot's string table for strings
+    many records have, and integers. A record is the counts of each in
+    `_RECORD_HEAD`, the length in characters of each string, the string
+    numbers, the integers and then all the strings as one UTF-8 text so they
+    are read with one decode. None is `_NONE` as a length or number.
+    Datetimes are an integer of their fields and the name of their timezone,
+    see `_tz_name()`.
+    """
+
+    def __init__(self, strings: Dict[str, int]):
+        self.strings = strings
+        self.texts: List[Optional[str]] = []
+        self.refs: List[int] = []
+        self.ints: List[int] = []
+
+    def text(self, value: Optional[str]) -> None:
+        self.texts.append(value)
+
+    def ref(self, value: Optional[str]) -> None:
+        self.refs.append(_NONE if value is None
+                         else self.strings.setdefault(value, len(self.strings)))
+
+    def integer(self, value: int) -> None:
+        self.ints.append(value)
+
+    def timestamp(self, value: datetime) -> None:
+        self.integer(_datetime_number(value))
+        self.ref(_tz_name(value.tzinfo))
+
+    def record(self) -> bytes:
+        lengths = [_NONE if text is None else len(text) for text in self.texts]
+        text = ''.join(text for text in self.texts if text is not None) \
+            .encode('utf-8', 'surrogatepass')
+        return (_RECORD_HEAD.pack(len(lengths), len(self.refs), len(self.ints), len(text))
+                + struct.pack(f'<{len(lengths) + len(self.refs)}I{len(self.ints)}q',
+                              *lengths, *self.refs, *self.ints)
+                + text)
+
+    def doc(self, doc: DocMetadata) -> bytes:
+        for name in _STRING_FIELDS:
+            self.text(getattr(doc, name))
+        self.text(doc.arxiv_identifier.ids)
+        self.timestamp(doc.modified)
+        self.text(doc.authors.raw)
+        self.text(doc.submitter.name)
+        self.text(doc.submitter.email)
+        self.ref(doc.primary_category.id if doc.primary_category else None)
+        self.ref(doc.primary_archive.id)
+        self.ref(doc.primary_group.id)
+        self.integer(len(doc.secondary_categories))
+        for category in doc.secondary_categories:
+            self.ref(category.id)
+        self.ref(doc.source_format)
+        self.integer(doc.version)
+        self.ref(doc.license.recorded_uri)
+        self.integer(len(doc.version_history))
+        for entry in doc.version_history:
+            self.integer(entry.version)
+            self.text(entry.raw)
+            self.timestamp(entry.submitted_date)
+            self.integer(entry.size_kilobytes)
+            self.ref(entry.source_flag.code)
+            self.ref(entry.source_format)
+            self.integer(entry.is_withdrawn | entry.is_current << 1)
+        self.integer(sum(getattr(doc, name) << n for n, name in enumerate(_FLAG_FIELDS)))
+        return self.record()
+
+
+class _Decoder:
+    """Reads the fields of a record written by `_Encoder` at `pos` in `data`."""
+
+    def __init__(self, data: mmap.mmap, strings: List[str], pos: int):
+        self.strings = strings
+        n_texts, n_refs, n_ints, size = _RECORD_HEAD.unpack_from(data, pos)
+        pos += _RECORD_HEAD.size
+        numbers = struct.unpack_from(f'<{n_texts + n_refs}I{n_ints}q', data, pos)
+        pos += 4 * (n_texts + n_refs) + 8 * n_ints
+        text = data[pos:pos + size].decode('utf-8', 'surrogatepass')
+        self.texts: List[Optional[str]] = []
+        start = 0
+        for length in numbers[:n_texts]:
+            if length == _NONE:
+                self.texts.append(None)
+            else:
+                self.texts.append(text[start:start + length])
+                start += length
+        self._texts = iter(self.texts)
+        self._refs = iter(numbers[n_texts:n_texts + n_refs])
+        self._ints = iter(numbers[n_texts + n_refs:])
+
+    def text(self) -> Optional[str]:
+        return next(self._texts)
+
+    def ref(self) -> Optional[str]:
+        number = next(self._refs)
+        return None if number == _NONE else self.strings[number]
+
+    def integer(self) -> int:
+        return next(self._ints)  # type: ignore
+
+    def timestamp(self) -> datetime:
+        number = self.integer()
+        return _datetime(number, _tz(self.ref()))
+
+    def doc(self) -> DocMetadata:
+        values: Dict[str, Any] = {name: self.text() for name in _STRING_FIELDS}
+        values['arxiv_identifier'] = Identifier(arxiv_id=self.text())  # type: ignore
+        values['modified'] = self.timestamp()
+        values['authors'] = AuthorList(self.text())  # type: ignore
+        values['submitter'] = Submitter(name=self.text(), email=self.text())  # type: ignore
+        primary = self.ref()
+        values['primary_category'] = None if primary is None else CATEGORIES[primary]
+        values['primary_archive'] = ARCHIVES[self.ref()]  # type: ignore
+        values['primary_group'] = GROUPS[self.ref()]  # type: ignore
+        values['secondary_categories'] = [CATEGORIES[self.ref()]  # type: ignore
+                                          for _ in range(self.integer())]
+        values['source_format'] = self.ref()
+        values['version'] = self.integer()
+        values['license'] = License(recorded_uri=self.ref())
+        history = []
+        for _ in range(self.integer()):
+            entry: Dict[str, Any] = {'version': self.integer(), 'raw': self.text(),
+                                     'submitted_date': self.timestamp(),
+                                     'size_kilobytes': self.integer(),
+                                     'source_flag': SourceFlag(code=self.ref()),  # type: ignore
+                                     'source_format': self.ref()}
+            flags = self.integer()
+            history.append(VersionEntry(is_withdrawn=bool(flags & 1),
+                                        is_current=bool(flags & 2), **entry))
+        values['version_history'] = history
+        flags = self.integer()
+        for n, name in enumerate(_FLAG_FIELDS):
+            values[name] = bool(flags >> n & 1)
+        return DocMetadata(**values)
+
+
+def write_snapshot(path: Union[str, Path], docs: Iterable[DocMetadata]) -> int:
+    """Writes `docs` to a snapshot file at `path` and returns how many.
+
+    The file is written next to `path` and then moved to it, so readers
+    never see a partial snapshot. Raises `ValueError` if two of `docs` have
+    the same `arxiv_id_v` and `SnapshotException` if a datetime has a
+    timezone that can't be written.
+    """
+    path = Path(path)
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".tmp-{path.name}.")
+    tmp = Path(name)
+    strings: Dict[str, int] = {}
+    index: List[Tuple[str, int, int]] = []
+    keys = set()
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0, 0, 0))
+            offset = _HEADER.size
+            for doc in docs:
+                if doc.arxiv_id_v in keys:
+                    raise ValueError(f"{doc.arxiv_id_v} is in the snapshot more than once")
+                keys.add(doc.arxiv_id_v)
+                record = _Encoder(strings).doc(doc)
+                fh.write(record)
+                index.append((doc.arxiv_id_v, offset, len(record)))
+                offset += len(record)
+
+            strings_offset = offset
+            table = _Encoder({})
+            for value in strings:
+                table.text(value)
+            data = table.record()
+            fh.write(data)
+            index_offset = strings_offset + len(data)
+            for key, record_offset, size in index:
+                data = key.encode('utf-8')
+                fh.write(_INDEX_ENTRY.pack(record_offset, size, len(data)))
+                fh.write(data)
+            fh.seek(0)
+            fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(index),
+                                  strings_offset, index_offset))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return len(index)
+
+
+class Snapshot:
+    """A snapshot file from `write_snapshot()`, mapped into memory.
+
+    Records are decoded when they are gotten with `get()`, `[]` or by
+    iterating, which yields them in the order they were written. The
+    `DocMetadata` are new each time, so they can be changed freely.
+
+    Raises `SnapshotException` if the file is not a snapshot or is a format
+    version this can't read.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as fh:
+            if os.fstat(fh.fileno()).st_size < _HEADER.size:
+                raise SnapshotException(f"{self.path} is too short to be a snapshot")
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_tables()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_tables(self) -> None:
+        magic, version, _, count, strings_offset, index_offset = \
+            _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise SnapshotException(f"{self.path} is not a snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotException(f"{self.path} is snapshot format version {version}, "
+                                    f"only {FORMAT_VERSION} is supported")
+        try:
+            self.strings: List[str] = _Decoder(self._mmap, [], strings_offset).texts  # type: ignore
+            self.index: Dict[str, Tuple[int, int]] = {}
+            pos = index_offset
+            for _ in range(count):
+                offset, size, key_size = _INDEX_ENTRY.unpack_from(self._mmap, pos)
+                pos += _INDEX_ENTRY.size
+                self.index[self._mmap[pos:pos + key_size].decode('utf-8')] = (offset, size)
+                pos += key_size
+        except (struct.error, UnicodeDecodeError) as ex:
+            raise SnapshotException(f"{self.path} has a bad string table or index") from ex
+
+    def get(self, arxiv_id_v: str) -> Optional[DocMetadata]:
+        """Gets the `DocMetadata` of `arxiv_id_v`, ex. `2401.12345v2`, or None."""
+        item = self.index.get(arxiv_id_v)
+        if item is None:
+            return None
+        return self._load(item[0])
+
+    def _load(self, offset: int) -> DocMetadata:
+        try:
+            return _Decoder(self._mmap, self.strings, offset).doc()
+        except (struct.error, UnicodeDecodeError, StopIteration, IndexError) as ex:
+            raise SnapshotException(f"{self.path} has a bad record at {offset}") from ex
+
+    def __getitem__(self, arxiv_id_v: str) -> DocMetadata:
+        doc = self.get(arxiv_id_v)
+        if doc is None:
+            raise KeyError(arxiv_id_v)
+        return doc
+
+    def __contains__(self, arxiv_id_v: object) -> bool:
+        return arxiv_id_v in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def keys(self) -> Iterable[str]:
+        return self.index.keys()
+
+    def __iter__(self) -> Iterator[DocMetadata]:
+        for offset, _ in self.index.values():
+            yield self._load(offset)
+
+    def close(self) -> None:
+        """Unmaps the file, `DocMetadata` already gotten can still be used."""
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<Snapshot {self.path} of {len(self)} records>"
@@ -0,0 +1,87 @@
+"""Synthetic `.abs` files shaped like real ones for tests and benchmarks."""
+import random
+from typing import Iterator, Tuple
+
+from arxiv.taxonomy.definitions import CATEGORIES_ACTIVE
+
+_DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+_MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+_WORDS = ('quantum field theory graph neural network boundary conditions manifold '
+          'estimator convergence lattice spectral entropy dark matter stochastic').split()
+_LICENSES = ['http://arxiv.org/licenses/nonexclusive-distrib/1.0/',
+             'http://creativecommons.org/licenses/by/4.0/', None]
+_OLD_ARCHIVES = ['hep-th', 'hep-ph', 'cond-mat', 'astro-ph', 'math', 'quant-ph']
+
+
+def _date(rng: random.Random, year: int) -> str:
+    return (f"{rng.choice(_DAYS)}, {rng.randint(1, 28)} {rng.choice(_MONTHS)} {year} "
+            f"{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02} GMT")
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(n))
+
+
+def make_abs(n: int, seed: int = 0, versions: int = 0) -> Tuple[str, str]:
+    """Gets the ID and text of the `n`th synthetic `.abs` file.
+
+    About a fifth have old style IDs. `versions` of 0 picks a random number
+    of versions, some with long histories.
+    """
+    rng = random.Random(seed * 1_000_003 + n)
+    old = n % 5 == 0
+    versions = versions or rng.choice([1, 1, 1, 2, 2, 3, 5, 12])
+    if old:
+        archive = rng.choice(_OLD_ARCHIVES)
+        year = rng.randint(1992, 2006)
+        arxiv_id = f"{archive}/{year % 100:02}{rng.randint(1, 12):02}{n % 999 + 1:03}"
+        first = f"Paper: {arxiv_id}"
+        cats = [c for c in CATEGORIES_ACTIVE if c.startswith(archive)][:3] or [archive]
+    else:
+        year = rng.randint(2008, 2024)
+        digits = 5 if year >= 2015 else 4
+        arxiv_id = f"{year % 100:02}{rng.randint(1, 12):02}.{n % 9999 + 1:0{digits}}"
+        first = f"arXiv:{arxiv_id}"
+        cats = rng.sample(sorted(CATEGORIES_ACTIVE), rng.randint(1, 3))
+    lines = ["-" * 78, "\\\\", first,
+             f"From: Author Number{n} <author{n}@example.org>"]
+    for version in range(1, versions + 1):
+        size = rng.randint(0 if version > 1 and rng.random() < 0.05 else 1, 9000)
+        flag = rng.choice(['', 'D', 'A', 'DA', 'I'] if version > 1 else ['', 'D', 'A'])
+        kb = f"({size}kb{',' + flag if flag else ''})"
+        date = _date(rng, min(year + version // 4, 2024))
+        if version == 1:
+            lines.append(f"Date: {date}   {kb}")
+        elif old and rng.random() < 0.3:
+            lines.append(f"replaced with revised version {date}   {kb}")
+        else:
+            lines.append(f"Date (revised v{version}): {date}   {kb}")
+    lines.append("")
+    lines.append(f"Title: {_words(rng, rng.randint(4, 12)).title()}")
+    if rng.random() < 0.3:
+        lines.append(f"  {_words(rng, 5)}")
+    authors = ', '.join(f"{chr(65 + i)}. Author{i}" for i in range(rng.randint(1, 8)))
+    lines.append(f"Authors: {authors}")
+    lines.append(f"Categories: {' '.join(cats)}")
+    if rng.random() < 0.7:
+        lines.append(f"Comments: {rng.randint(3, 60)} pages, {rng.randint(1, 9)} figures")
+    if rng.random() < 0.2:
+        lines.append(f"Journal-ref: Phys. Rev. D {rng.randint(1, 99)} ({year})")
+    if rng.random() < 0.2:
+        lines.append(f"DOI: 10.1103/PhysRevD.{rng.randint(1, 99)}.{rng.randint(1000, 9999)}")
+    if rng.random() < 0.1:
+        lines.append(f"MSC-class: {rng.randint(10, 99)}A{rng.randint(10, 99)}")
+    license = rng.choice(_LICENSES) if not old else None
+    if license:
+        lines.append(f"License: {license}")
+    lines.append("\\\\")
+    abstract = '\n'.join('  ' + _words(rng, 12) for _ in range(rng.randint(3, 12)))
+    lines.append(abstract)
+    lines.append("\\\\")
+    return arxiv_id, '\n'.join(lines) + '\n'
+
+
+def corpus(count: int, seed: int = 0) -> Iterator[Tuple[str, str]]:
+    """Gets `count` synthetic `.abs` files as (ID, text)."""
+    for n in range(1, count + 1):
+        yield make_abs(n, seed)
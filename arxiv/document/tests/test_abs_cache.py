@@ -0,0 +1,101 @@
+import os
+from dataclasses import replace
+
+import pytest
+
+from arxiv.document import abs_cache
+from arxiv.document.abs_cache import AbsCache, approx_size
+from arxiv.document.exceptions import AbsNotFoundException
+from arxiv.document.parse_abs import parse_abs_file
+from arxiv.files import FileDoesNotExist, LocalFileObj
+from arxiv.files.tar_index import DirectorySidecarStore
+
+from .abs_corpus import corpus
+
+
+@pytest.fixture
+def files(tmp_path):
+    files = []
+    for n, (_, raw) in enumerate(corpus(20)):
+        path = tmp_path / f"{n}.abs"
+        path.write_text(raw, encoding='latin-1')
+        files.append(LocalFileObj(path))
+    return files
+
+
+def test_abs_cache(files, mocker):
+    cache = AbsCache()
+    docs = [cache.parse(file) for file in files]
+    assert docs == [parse_abs_file(file) for file in files]
+    spy = mocker.patch('arxiv.document.abs_cache.parse_abs_file')
+    assert [cache.parse(LocalFileObj(file.item)) for file in files] == docs
+    assert spy.call_count == 0
+    assert cache.stats()['hits'] == 20 and cache.stats()['misses'] == 20
+
+    with pytest.raises(AbsNotFoundException):
+        cache.parse(FileDoesNotExist("nope.abs"))
+
+
+def test_abs_cache_changed_file(files):
+    cache = AbsCache()
+    first = cache.parse(files[0])
+    files[0].item.write_text(files[1].item.read_text(encoding='latin-1'), encoding='latin-1')
+    os.utime(files[0].item, (0, 0))
+    assert cache.parse(files[0]).arxiv_id != first.arxiv_id
+
+
+def test_abs_cache_bounds(files):
+    cache = AbsCache(max_entries=5)
+    for file in files:
+        cache.parse(file)
+    assert len(cache) == 5 and cache.stats()['evictions'] == 15
+
+    size = approx_size(parse_abs_file(files[0]))
+    cache = AbsCache(max_bytes=size * 3)
+    for file in files:
+        cache.parse(file)
+    assert cache.stats()['bytes'] <= size * 3
+    assert 0 < len(cache) < 5
+
+
+def test_abs_cache_shared(files, tmp_path, mocker):
+    shared = DirectorySidecarStore(tmp_path / 'shared')
+    first = AbsCache(shared=shared)
+    docs = [first.parse(file) for file in files]
+
+    spy = mocker.spy(abs_cache, 'parse_abs_file')
+    other_worker = AbsCache(shared=shared)
+    assert [other_worker.parse(file) for file in files] == docs
+    assert spy.call_count == 0
+    assert other_worker.stats()['shared_hits'] == 20
+
+
+class _BrokenStore:
+    def get(self, name):
+        raise OSError("shared tier unavailable")
+
+    def put(self, name, data):
+        raise FileNotFoundError(name)
+
+
+class _BrokenRemoteStore:
+    def get(self, name):
+        raise RuntimeError("503 from the shared tier")
+
+    def put(self, name, data):
+        raise ValueError(name)
+
+
+@pytest.mark.parametrize("shared", [_BrokenStore(), _BrokenRemoteStore()])
+def test_abs_cache_shared_errors(files, shared):
+    cache = AbsCache(shared=shared)
+    assert cache.parse(files[0]) == parse_abs_file(files[0])
+    assert cache.stats()['misses'] == 1
+
+
+def test_abs_cache_returns_shared_instances(files):
+    cache = AbsCache()
+    doc = cache.parse(files[0])
+    assert cache.parse(LocalFileObj(files[0].item)) is doc
+    changed = replace(doc, title="Changed")
+    assert cache.parse(files[0]).title == doc.title != changed.title
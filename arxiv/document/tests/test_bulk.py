@@ -0,0 +1,85 @@
+import os
+import time
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from arxiv.document.bulk import BulkParseError, parse_abs_files, parse_abs_prefix
+from arxiv.document.metadata import DocMetadata
+from arxiv.document.parse_abs import parse_abs, parse_abs_file
+from arxiv.files import FileDoesNotExist, LocalFileObj
+from arxiv.files.fake_store import InMemoryObjectStore
+
+from .abs_corpus import corpus
+
+
+@pytest.fixture
+def store():
+    store = InMemoryObjectStore()
+    for n, (arxiv_id, raw) in enumerate(corpus(300)):
+        store.put(f"ftp/abs/{n:05}.abs", raw.encode('latin-1'))
+    store.put("ftp/abs/99999.abs", b"not an abs file")
+    return store
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_parse_abs_files_ordered(store, processes):
+    files = list(store.list("ftp/abs/")) + [FileDoesNotExist("ftp/abs/missing.abs")]
+    progress = []
+    results = list(parse_abs_files(files, processes=processes, chunksize=16,
+                                   progress=lambda done, failed: progress.append((done, failed))))
+    assert len(results) == len(files)
+    for file, result in zip(files[:300], results):
+        assert isinstance(result, DocMetadata)
+        assert result == parse_abs(file.data.decode('latin-1'), file.updated)
+    assert [type(r) for r in results[300:]] == [BulkParseError, BulkParseError]
+    assert results[-1].name == "ftp/abs/missing.abs"
+    assert progress[-1] == (302, 2)
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+
+
+def test_parse_abs_prefix_unordered(store):
+    results = list(parse_abs_prefix(store, "ftp/abs/", processes=2, chunksize=10,
+                                    ordered=False, max_pending=2))
+    ids = sorted(r.arxiv_id for r in results if isinstance(r, DocMetadata))
+    assert ids == sorted(arxiv_id for arxiv_id, _ in corpus(300))
+
+
+def test_parse_abs_files_crlf(tmp_path):
+    raws = [raw.replace('\n', '\r\n').encode('latin-1') for _, raw in corpus(3, seed=9)]
+    store = InMemoryObjectStore()
+    for n, data in enumerate(raws):
+        store.put(f"ftp/abs/{n}.abs", data)
+        (tmp_path / f"{n}.abs").write_bytes(data)
+    results = list(parse_abs_files(store.list("ftp/abs/"), processes=0))
+    for n, result in enumerate(results):
+        assert isinstance(result, DocMetadata)
+        expected = parse_abs_file(LocalFileObj(tmp_path / f"{n}.abs"))
+        assert result == replace(expected, modified=result.modified)
+
+
+def test_parse_abs_files_bad_chunksize():
+    with pytest.raises(ValueError):
+        list(parse_abs_files([], chunksize=0))
+
+
+@pytest.mark.benchmark
+def test_benchmark_bulk_parse():
+    """Files per second parsing ARXIV_BENCHMARK_ABS synthetic files serially
+    and with a process per CPU."""
+    count = int(os.environ.get('ARXIV_BENCHMARK_ABS', 20_000))
+    store = InMemoryObjectStore()
+    for n, (_, raw) in enumerate(corpus(count)):
+        store.put(f"ftp/abs/{n:07}.abs", raw.encode('latin-1'))
+    files = list(store.list("ftp/abs/"))
+
+    start = time.perf_counter()
+    serial = sum(1 for _ in parse_abs_files(files, processes=0))
+    serial_rate = serial / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    parallel = sum(1 for _ in parse_abs_files(files, chunksize=256))
+    parallel_rate = parallel / (time.perf_counter() - start)
+    print(f"\nparse_abs_files: {serial_rate:.0f} files/s serial, "
+          f"{parallel_rate:.0f} files/s on {os.cpu_count()} processes")
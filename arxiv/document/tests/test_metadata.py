@@ -0,0 +1,113 @@
+import os
+import pickle
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+
+from arxiv.document.exceptions import AbsParsingException
+from arxiv.document.metadata import DocMetadata, LazyDocMetadata
+from arxiv.document.parse_abs import parse_abs
+
+from .abs_corpus import corpus, make_abs
+
+MODIFIED = datetime(2024, 1, 2, tzinfo=timezone.utc)
+LAZY_FIELDS = ['raw_safe', 'arxiv_identifier', 'version_history', 'license',
+               'secondary_categories']
+
+
+def test_lazy_equals_eager():
+    for _, raw in corpus(500, seed=5):
+        eager = parse_abs(raw, MODIFIED)
+        lazy = parse_abs(raw, MODIFIED, lazy=True)
+        assert isinstance(lazy, LazyDocMetadata)
+        assert lazy == eager
+        assert eager == lazy
+        assert lazy.get_browse_context_list() == eager.get_browse_context_list()
+
+
+def test_lazy_loads_on_first_use(mocker):
+    _, raw = make_abs(3, versions=4)
+    doc = parse_abs(raw, MODIFIED, lazy=True)
+    assert doc.title and doc.authors.raw and doc.primary_category and doc.version == 4
+    assert not any(name in vars(doc) for name in LAZY_FIELDS)
+    loader = mocker.Mock(wraps=doc._loaders['version_history'])
+    doc._loaders = {**doc._loaders, 'version_history': loader}
+    assert doc.version_history is doc.version_history
+    assert loader.call_count == 1
+    assert 'version_history' in vars(doc)
+    assert doc.get_version(2).version == 2
+
+
+def test_lazy_defers_errors():
+    _, raw = make_abs(4, versions=2)
+    raw = raw.replace("Date (revised v2): ", "Date (revised v2): Someday ", 1)
+    with pytest.raises(AbsParsingException):
+        parse_abs(raw, MODIFIED)
+    doc = parse_abs(raw, MODIFIED, lazy=True)
+    assert doc.title
+    for _ in range(2):
+        with pytest.raises(AbsParsingException):
+            doc.version_history
+    with pytest.raises(AttributeError):
+        doc.not_a_field
+
+
+def test_lazy_pickle():
+    _, raw = make_abs(5)
+    doc = pickle.loads(pickle.dumps(parse_abs(raw, MODIFIED, lazy=True)))
+    assert '_source' not in vars(doc)
+    assert all(name in vars(doc) for name in LAZY_FIELDS)
+    assert doc == parse_abs(raw, MODIFIED)
+
+
+def test_lazy_replace():
+    _, raw = make_abs(6, versions=3)
+    eager = parse_abs(raw, MODIFIED)
+    for changed in (replace(parse_abs(raw, MODIFIED, lazy=True), title="x"),
+                    parse_abs(raw, MODIFIED, lazy=True).__replace__(title="x")):
+        assert type(changed) is DocMetadata
+        assert changed == replace(eager, title="x")
+    doc = parse_abs(raw, MODIFIED, lazy=True).to_doc()
+    assert type(doc) is DocMetadata
+    assert doc == eager
+
+
+def test_lazy_loader_with_value():
+    with pytest.raises(ValueError):
+        LazyDocMetadata({}, {'journal_ref': lambda src: None}, None)
+    with pytest.raises(ValueError):
+        LazyDocMetadata({'license': None}, {'license': lambda src: None}, None)
+
+
+def _listing(raws, lazy):
+    docs = [parse_abs(raw, MODIFIED, lazy=lazy) for raw in raws]
+    rows = [(doc.arxiv_id, doc.title, doc.authors.raw, doc.primary_category) for doc in docs]
+    return docs, rows
+
+
+def _measure(raws, lazy):
+    start = time.perf_counter()
+    _listing(raws, lazy)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    docs, rows = _listing(raws, lazy)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(docs) == len(rows) == len(raws)
+    return seconds, memory
+
+
+@pytest.mark.benchmark
+def test_benchmark_lazy_listing():
+    """Time and memory held by the `DocMetadata` of a listing of
+    ARXIV_BENCHMARK_ABS synthetic files, eager and lazy."""
+    raws = [raw for _, raw in corpus(int(os.environ.get('ARXIV_BENCHMARK_ABS', 5000)))]
+    results = {lazy: _measure(raws, lazy) for lazy in (False, True)}
+    for lazy, (seconds, memory) in results.items():
+        print(f"\n{'lazy' if lazy else 'eager'}: {1e6 * seconds / len(raws):.1f}us "
+              f"and {memory / len(raws):.0f} bytes per listing entry", end='')
+    print()
+    assert results[True][1] < results[False][1]
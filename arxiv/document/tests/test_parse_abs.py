@@ -0,0 +1,227 @@
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import pytest
+from dateutil import parser
+from hypothesis import given, strategies as st
+
+from arxiv.document.exceptions import AbsParsingException
+from arxiv.document.parse_abs import NAMED_FIELDS, RE_ABS_COMPONENTS, \
+    RE_ARXIV_ID_FROM_PREHISTORY, RE_DATE_COMPONENTS, RE_FIELD_COMPONENTS, RE_FROM_FIELD, \
+    RE_REP_COMPONENTS, _raw_safe, _tokenize_top, date_fallbacks, parse_abs, parse_date, \
+    split_components
+
+from .abs_corpus import corpus, make_abs
+
+MODIFIED = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def _regex_top(raw):
+    """The top of the .abs as parsed with the regex splits `parse_abs_top()`
+    used before it had a tokenizer."""
+    prehistory, misc_fields = re.split(r'\n\n', raw)
+    fields = {}
+    field_name = 'unknown'
+    for field_line in re.split(r'\n', misc_fields.lstrip()):
+        field_match = RE_FIELD_COMPONENTS.match(field_line)
+        if field_match and field_match.group('field') in NAMED_FIELDS:
+            field_name = field_match.group('field').lower().replace('-', '_')
+            field_name = re.sub(r'_no$', '_num', field_name)
+            fields[field_name] = field_match.group('value').rstrip()
+        elif field_name != 'unknown':
+            fields[field_name] += re.sub(r'^\s+', ' ', field_line)
+    arxiv_id = RE_ARXIV_ID_FROM_PREHISTORY.match(prehistory).group('arxiv_id')
+    prehistory = re.sub(r'^.*\n', '', prehistory)
+    versions = [line for line in re.split(r'\n', prehistory)
+                if line.startswith("Date") or line.startswith("replaced with revised")]
+    from_match = RE_FROM_FIELD.match(prehistory)
+    if not from_match or not from_match.group('name'):
+        name, email = '', 'email-not-provided'
+    else:
+        name, email = from_match.group('name').rstrip(), from_match.group('email')
+    raw_safe = re.sub(RE_FROM_FIELD, r'\g<from>\g<name>', raw, 1)
+    return arxiv_id, versions, name, email, raw_safe, fields
+
+
+def _assert_same(raw):
+    doc = parse_abs(raw, MODIFIED)
+    top = RE_ABS_COMPONENTS.split(raw)[1]
+    arxiv_id, versions, name, email, raw_safe, fields = _regex_top(top)
+    assert doc.arxiv_id == arxiv_id
+    assert [v.raw for v in doc.version_history] == versions
+    assert (doc.submitter.name, doc.submitter.email) == (name, email)
+    assert doc.raw_safe == raw_safe
+    assert doc.title == fields['title']
+    assert doc.authors.raw == fields['authors']
+    assert doc.categories == fields.get('categories')
+    assert doc.comments == fields.get('comments')
+    assert doc.journal_ref == fields.get('journal_ref')
+    assert doc.report_num == fields.get('report_num')
+    assert doc.msc_class == fields.get('msc_class')
+    assert doc.doi == fields.get('doi')
+    assert doc.license.recorded_uri == fields.get('license', doc.license.recorded_uri)
+    return doc
+
+
+def test_tokenizer_matches_regex_parse():
+    for _, raw in corpus(2000, seed=3):
+        _assert_same(raw)
+
+
+@pytest.mark.parametrize("old, new", [
+    # from lines the submitter name can run on from
+    ("From: Author Number7 <author7@example.org>", "From: Author Number7"),
+    ("From: Author Number7 <author7@example.org>", "From: Author<author7@example.org>"),
+    ("From: Author Number7 <author7@example.org>", "From:   <author7@example.org>"),
+    ("From: Author Number7 <author7@example.org>", "From:Author <a@b.org> (and <c@d.org>)"),
+    ("From: Author Number7 <author7@example.org>", "From: Author <unclosed"),
+    # fields
+    ("Title: ", "Title :  Spaced Colon\nTitle: "),
+    ("Authors: ", "Report-no: CERN-TH-1\nAuthors: "),
+    ("Categories: ", "Comments: no indent\ncontinued: here\nCategories: "),
+    ("Categories: ", "Comments: tabbed\n\t\tcontinuation\nCategories: "),
+])
+def test_tokenizer_edge_cases(old, new):
+    _, raw = make_abs(7, versions=2)
+    raw = raw.replace(old, new, 1)
+    assert new in raw
+    _assert_same(raw)
+
+
+def test_tokenizer_extra_components():
+    _, raw = make_abs(8)
+    raw = raw.replace("\n\\\\\n  ", "\n\\\\\n  a \n\\\\\n  b ", 1)
+    doc = parse_abs(raw, MODIFIED)
+    assert doc.abstract.startswith("  a \n \\\\   b ")
+
+
+@pytest.mark.parametrize("raw", [
+    "just text",
+    "------\n\\\\\narXiv:2401.00001\nFrom: a <b>\n\\\\\n",
+    "------\n\\\\\narXiv:2401.00001\n\nTitle: x\n\nAuthors: y\n\\\\\n abs\n\\\\\n",
+])
+def test_tokenizer_malformed(raw):
+    with pytest.raises(AbsParsingException):
+        parse_abs(raw, MODIFIED)
+
+
+@given(st.lists(st.sampled_from(["\\\\\n", "\\\\", "\n", "a", "\\", " "]), max_size=30))
+def test_split_components(pieces):
+    raw = ''.join(pieces)
+    assert split_components(raw) == RE_ABS_COMPONENTS.split(raw)
+
+
+def _dates(count):
+    for _, raw in corpus(count):
+        for line in raw.splitlines():
+            match = RE_DATE_COMPONENTS.match(line) or RE_REP_COMPONENTS.match(line)
+            if match:
+                yield match.group('date')
+
+
+def test_parse_date_matches_dateutil():
+    before = date_fallbacks()
+    for date in _dates(300):
+        parsed = parse_date(date)
+        assert parsed == parser.parse(date)
+        assert parsed.tzinfo is parser.parse(date).tzinfo
+    assert date_fallbacks() == before
+
+
+@pytest.mark.parametrize("date", [
+    "2 Apr 2007 19:18:42 GMT",
+    "Mon, 2 Apr 2007 19:18:42",
+    "Mon, 02 Apr 2007 9:18:42 GMT",
+])
+def test_parse_date_fast_variants(date):
+    before = date_fallbacks()
+    assert parse_date(date) == parser.parse(date)
+    assert parse_date(date).tzinfo is parser.parse(date).tzinfo
+    assert date_fallbacks() == before
+
+
+@pytest.mark.parametrize("date", [
+    "Mon, 2 Apr 2007 19:18:42 EST",
+    "Mon, 2 apr 2007 19:18:42 GMT",
+    "2007-04-02 19:18:42",
+    "Mon, 2 Apr 07 19:18:42 GMT",
+    "Thu, 29 Feb 2007 19:18:42 GMT",
+    "Mon, 2 Apr 2007 19:18 GMT",
+    "Mon, 2 Apr 2007 19:18:4٢ GMT",
+])
+@pytest.mark.filterwarnings("ignore::dateutil.parser.UnknownTimezoneWarning")
+def test_parse_date_fallback(date):
+    before = date_fallbacks()
+    try:
+        expected = parser.parse(date)
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_date(date)
+    else:
+        assert parse_date(date) == expected
+    assert date_fallbacks() == before + 1
+
+
+@given(st.datetimes(min_value=datetime(1000, 1, 1)), st.booleans(), st.booleans())
+def test_parse_date_roundtrip(value, weekday, gmt):
+    value = value.replace(microsecond=0)
+    date = value.strftime(f"{'%a, ' if weekday else ''}%d %b %Y %H:%M:%S{' GMT' if gmt else ''}")
+    assert parse_date(date) == parser.parse(date)
+    assert parse_date(date).tzinfo is parser.parse(date).tzinfo
+
+
+@pytest.mark.benchmark
+def test_benchmark_parse_date():
+    """Dates per second from `parse_date()` and from dateutil."""
+    dates = list(_dates(int(os.environ.get('ARXIV_BENCHMARK_ABS', 5000))))
+    start = time.perf_counter()
+    for date in dates:
+        parse_date(date)
+    fast = time.perf_counter() - start
+    start = time.perf_counter()
+    for date in dates:
+        parser.parse(date)
+    slow = time.perf_counter() - start
+    print(f"\nparse_date: {len(dates) / fast:.0f} dates/s, dateutil {len(dates) / slow:.0f} dates/s")
+
+
+def _best_time(func, items, repeat=3):
+    """Fastest of `repeat` runs of `func` over `items`, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _tokenized_top(top):
+    tokens = _tokenize_top(top)
+    return _raw_safe(top, tokens.from_slice)
+
+
+MIN_SPEEDUP = 1.5
+"""How much faster than the regex splits the tokenizer has to be."""
+
+
+@pytest.mark.benchmark
+def test_benchmark_tokenizer():
+    """Tokenizes the tops of ARXIV_BENCHMARK_ABS synthetic files with
+    `_tokenize_top()` and `_raw_safe()` and with the old regex splits of
+    `_regex_top()`, and splits the files into components with
+    `split_components()` and `RE_ABS_COMPONENTS`."""
+    count = int(os.environ.get('ARXIV_BENCHMARK_ABS', 5000))
+    raws = [raw for _, raw in corpus(count)]
+    tops = [RE_ABS_COMPONENTS.split(raw)[1] for raw in raws]
+
+    regex = _best_time(_regex_top, tops)
+    tokenizer = _best_time(_tokenized_top, tops)
+    regex_split = _best_time(RE_ABS_COMPONENTS.split, raws)
+    split = _best_time(split_components, raws)
+    print(f"\ntops: tokenizer {count / tokenizer:.0f}/s, regex {count / regex:.0f}/s, "
+          f"{regex / tokenizer:.1f}x faster; components split {regex_split / split:.1f}x faster")
+    assert regex / tokenizer > MIN_SPEEDUP
+    assert regex_split / split > MIN_SPEEDUP
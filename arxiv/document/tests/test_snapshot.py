@@ -0,0 +1,125 @@
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, replace
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from dateutil import tz
+
+from arxiv.document.exceptions import SnapshotException
+from arxiv.document.metadata import DocMetadata
+from arxiv.document.parse_abs import parse_abs
+from arxiv.document.snapshot import FORMAT_VERSION, MAGIC, Snapshot, write_snapshot
+
+from .abs_corpus import corpus, make_abs
+
+MODIFIED = datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+
+
+def _assert_exact(loaded, doc):
+    assert type(loaded) is DocMetadata
+    assert loaded == doc
+    for field in fields(DocMetadata):
+        value = getattr(doc, field.name)
+        assert type(getattr(loaded, field.name)) is type(value)
+    dates = [(loaded.modified, doc.modified)] + [
+        (loaded_entry.submitted_date, entry.submitted_date)
+        for loaded_entry, entry in zip(loaded.version_history, doc.version_history)]
+    for loaded_date, date in dates:
+        assert type(loaded_date.tzinfo) is type(date.tzinfo)
+        assert loaded_date.tzinfo == date.tzinfo
+        assert loaded_date.fold == date.fold
+
+
+def test_snapshot_roundtrip(tmp_path):
+    docs = [parse_abs(raw, MODIFIED) for _, raw in corpus(1000, seed=7)]
+    assert write_snapshot(tmp_path / "abs.snap", docs) == 1000
+    with Snapshot(tmp_path / "abs.snap") as snapshot:
+        assert len(snapshot) == 1000
+        assert list(snapshot.keys()) == [doc.arxiv_id_v for doc in docs]
+        for doc in docs:
+            assert doc.arxiv_id_v in snapshot
+            _assert_exact(snapshot[doc.arxiv_id_v], doc)
+        for loaded, doc in zip(snapshot, docs):
+            _assert_exact(loaded, doc)
+        assert snapshot.get("2401.99999v1") is None
+        with pytest.raises(KeyError):
+            snapshot["2401.99999v1"]
+    assert not list(tmp_path.glob(".tmp-*"))
+
+
+def test_snapshot_lazy_and_odd_values(tmp_path):
+    _, raw = make_abs(1, versions=3)
+    lazy = parse_abs(raw, MODIFIED, lazy=True)
+    doc = parse_abs(raw, MODIFIED)
+    odd = [
+        replace(doc, arxiv_id_v=f"odd{n}", modified=modified, is_latest=True, proxy="\udcff",
+                source_format='pdftex')
+        for n, modified in enumerate([
+            datetime(1999, 12, 31, 23, 59, 59),
+            datetime(2024, 11, 3, 1, 30, fold=1, tzinfo=ZoneInfo("America/New_York")),
+            datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=-5, minutes=-30))),
+            datetime(2024, 1, 1, tzinfo=tz.UTC)])]
+    write_snapshot(tmp_path / "abs.snap", [lazy] + odd)
+    with Snapshot(tmp_path / "abs.snap") as snapshot:
+        _assert_exact(snapshot[doc.arxiv_id_v], doc)
+        for doc in odd:
+            _assert_exact(snapshot[doc.arxiv_id_v], doc)
+
+
+def test_snapshot_concurrent_writes(tmp_path):
+    docs = [parse_abs(raw, MODIFIED) for _, raw in corpus(50, seed=8)]
+    with ThreadPoolExecutor(4) as executor:
+        counts = list(executor.map(lambda _: write_snapshot(tmp_path / "abs.snap", docs),
+                                   range(20)))
+    assert counts == [50] * 20
+    with Snapshot(tmp_path / "abs.snap") as snapshot:
+        assert list(snapshot) == docs
+    assert [p.name for p in tmp_path.iterdir()] == ["abs.snap"]
+
+
+def test_snapshot_write_errors(tmp_path):
+    _, raw = make_abs(2)
+    doc = parse_abs(raw, MODIFIED)
+    with pytest.raises(ValueError):
+        write_snapshot(tmp_path / "abs.snap", [doc, doc])
+    with pytest.raises(SnapshotException):
+        write_snapshot(tmp_path / "abs.snap",
+                       [replace(doc, modified=datetime.now(tz.tzlocal()))])
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"not a snapshot" * 4,
+    struct.pack('<8sHHIQQ', MAGIC, FORMAT_VERSION + 1, 0, 0, 32, 36) + bytes(4),
+    struct.pack('<8sHHIQQ', MAGIC, FORMAT_VERSION, 0, 5, 32, 36) + bytes(4),
+])
+def test_snapshot_bad_files(tmp_path, data):
+    (tmp_path / "bad.snap").write_bytes(data)
+    with pytest.raises(SnapshotException):
+        Snapshot(tmp_path / "bad.snap")
+
+
+@pytest.mark.benchmark
+def test_benchmark_snapshot(tmp_path):
+    """Time to open a snapshot of ARXIV_BENCHMARK_ABS synthetic files and
+    load each record compared to parsing the .abs files."""
+    raws = [raw for _, raw in corpus(int(os.environ.get('ARXIV_BENCHMARK_ABS', 5000)))]
+    start = time.perf_counter()
+    docs = [parse_abs(raw, MODIFIED) for raw in raws]
+    parse = time.perf_counter() - start
+    write_snapshot(tmp_path / "abs.snap", docs)
+
+    start = time.perf_counter()
+    with Snapshot(tmp_path / "abs.snap") as snapshot:
+        opened = time.perf_counter() - start
+        loaded = [snapshot[doc.arxiv_id_v] for doc in docs]
+    load = time.perf_counter() - start
+    assert loaded == docs
+    size = (tmp_path / "abs.snap").stat().st_size
+    print(f"\nsnapshot of {len(docs)}: {size / len(docs):.0f} bytes per record, opened in "
+          f"{1e3 * opened:.1f}ms, loaded in {1e3 * load:.0f}ms, parsing took {1e3 * parse:.0f}ms")
@@ -1,14 +1,21 @@
 """FileObj for representing a file."""
 
 import gzip
-import tarfile
 import io
+import mmap
+import os
 from abc import ABC, abstractmethod
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from types import TracebackType
 import typing
-from typing import BinaryIO, Optional, Union
+from typing import BinaryIO, Literal, Optional, Union, TYPE_CHECKING
+
+from ..util.cache import TTLCache
+
+if TYPE_CHECKING:
+    from .tar_index import TarIndex, TarIndexCache
 
 class BinaryMinimalFile(typing.Protocol):
     """A minimal file `Protocol` for a python binary file."""
@@ -44,6 +51,64 @@ class BinaryMinimalFile(typing.Protocol):
         """Iterator of bytes for the file."""
         pass
 
+class RangeRaw(io.RawIOBase):
+    """Reads up to `size` bytes of `fh` from `start`, or to its end if `size`
+    is `None`.
+
+    `fh` must already be positioned at `start`. Closing this closes the files
+    in `closing`.
+    """
+
+    def __init__(self, fh: typing.Any, start: int, size: Optional[int],
+                 closing: typing.List[typing.Any]):
+        self._fh = fh
+        self._start = start
+        self._size = size
+        self._pos = 0
+        self._closing = closing
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        n = len(buffer) if self._size is None else min(len(buffer), self._size - self._pos)
+        if n <= 0:
+            return 0
+        data = self._fh.read(n)
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            if self._size is None:
+                raise io.UnsupportedOperation("range has no known end")
+            pos += self._size
+        pos = max(0, pos if self._size is None else min(pos, self._size))
+        self._fh.seek(self._start + pos)
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            for fh in self._closing:
+                fh.close()
+        super().close()
+
+
+def _check_range(start: int, end: Optional[int]) -> None:
+    if start < 0 or (end is not None and end < start):
+        raise ValueError(f"bad range {start} to {end}")
+
+
 class FileObj(ABC):
     """FileObj is a subset of the methods on GS `Blob`.
 
@@ -92,6 +157,33 @@ class FileObj(ABC):
     def updated(self) -> datetime:
         """Datetime object of last modified."""
 
+    def open_range(self, start: int, end: Optional[int] = None) -> BinaryIO:
+        """Opens the bytes from `start` up to but not including `end`.
+
+        `end` of `None` is the end of the file. A range past the end of the
+        file is cut short. Use `object_store.open_range()` when the object may
+        be a GS `Blob`, since it lacks this method.
+
+        The cost depends on how the object can seek:
+
+        - `LocalFileObj`: a seek, nothing before `start` is read.
+        - `Blob`: ranged downloads of only the bytes in the range.
+        - `UngzippedFileObj`: the gzip file is decompressed up to `start`,
+          so the cost grows with `start`.
+        - `FileFromTar`: a seek for an uncompressed tar. For a gzipped tar
+          it is decompressed up to the member and then up to `start`.
+        - `FileTransform`: the transformed data is read up to `start`.
+        """
+        _check_range(start, end)
+        fh = self.open('rb')
+        try:
+            fh.seek(start)
+        except BaseException:
+            fh.close()
+            raise
+        size = None if end is None else end - start
+        return io.BufferedReader(RangeRaw(fh, start, size, [fh]))
+
 
 class FileDoesNotExist(FileObj):
     """Represents a file that does not exist."""
@@ -146,6 +238,27 @@ class LocalFileObj(FileObj):
     def open(self, *args, **kwargs) -> BinaryIO:  # type: ignore
         return self.item.open(*args, **kwargs)  # type: ignore
 
+    def open_fd(self) -> int:
+        """Opens the file read only and returns the OS file descriptor.
+
+        The caller must close it with `os.close()`. Use this with
+        `os.sendfile()` to send the file without copying it into Python.
+        """
+        return os.open(self.item, os.O_RDONLY)
+
+    def mmap(self) -> mmap.mmap:
+        """Maps the file read only into memory.
+
+        Slices of a `memoryview` of the map are not copied. The caller must
+        close the map. Raises `ValueError` for an empty file since those
+        can't be mapped.
+        """
+        fd = self.open_fd()
+        try:
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
     @property
     def etag(self) -> str:
         return "FAKE_ETAG"
@@ -203,12 +316,48 @@ class MockStringFileObj(FileObj):
         return f"<MockFileObj name={self.name}>"
 
 
+def version_key(fileobj: FileObj) -> str:
+    """String that changes when the contents of `fileobj` change.
+
+    Made of the name, etag, size and updated. The etag alone is not enough
+    since `LocalFileObj` has a fake etag.
+    """
+    updated = fileobj.updated.isoformat() if isinstance(fileobj.updated, datetime) else ''
+    return f"{fileobj.name}\0{fileobj.etag}\0{fileobj.size}\0{updated}"
+
+
+GzipSizeStrategy = Literal['trailer', 'stream']
+"""How `UngzippedFileObj` gets the uncompressed size.
+
+`trailer` reads the ISIZE field in the last 4 bytes of the gzip file. That is
+the uncompressed size modulo 4 GiB, so it is only used when the compressed
+file is smaller than 4 GiB and it is assumed that the uncompressed size is
+also; otherwise `stream` is used. For a gzip file of several members the
+ISIZE is just the size of the last member, so `stream` is also used when the
+ISIZE is less than the compressed size, which it usually is then, or when the
+first member has an extra field, as the members of multi-member formats like
+BGZF do. Concatenated members where the last one holds most of the data are
+not detected; use `stream` for such files.
+
+`stream` decompresses the whole file, with constant memory, and counts the
+bytes.
+"""
+
+_ISIZE_LIMIT = 2 ** 32
+_FEXTRA = 0x04
+
+_gzip_sizes: TTLCache[str, int] = TTLCache(maxsize=10_000, ttl=24 * 60 * 60)
+"""Uncompressed sizes by `version_key()` of the gzipped file."""
+
+
 class UngzippedFileObj(FileObj):
     """File object backed by different file object and un-gzipped."""
 
-    def __init__(self, gzipped_file: FileObj):
+    def __init__(self, gzipped_file: FileObj,
+                 size_strategy: GzipSizeStrategy = 'trailer'):
         self._fileobj = gzipped_file
         self._size = -1
+        self.size_strategy = size_strategy
 
     @property
     def name(self) -> str:
@@ -233,17 +382,40 @@ class UngzippedFileObj(FileObj):
 
     @property
     def size(self) -> int:
+        """Uncompressed size, see `GzipSizeStrategy`.
+
+        This is cached by etag so it is only worked out once per file.
+        """
         if self._size >= 0:
             return self._size
-        else:
-            # Seems gzip files will have the size as the last 4 bytes of the
-            # file.  That won't record file sizes larger than 4Gb and there may
-            # be other quirks.  So for now we get it by reading and unzipping
-            # the whole file.
-            with self._fileobj.open("rb") as unzip_f:
-                size = unzip_f.seek(0, io.SEEK_END)
-                self._size = size
-            return self._size
+        key = version_key(self._fileobj)
+        size = _gzip_sizes.get(key)
+        if size is None:
+            if self.size_strategy == 'trailer' and self._fileobj.size < _ISIZE_LIMIT:
+                size = self._trailer_size()
+            if size is None:
+                size = self._streamed_size()
+            _gzip_sizes.set(key, size)
+        self._size = size
+        return self._size
+
+    def _trailer_size(self) -> Optional[int]:
+        """ISIZE from the trailer or None if it may be of just the last member."""
+        with self._fileobj.open("rb") as fh:
+            header = fh.read(10)
+            if len(header) < 10 or header[3] & _FEXTRA:
+                return None
+            fh.seek(-4, io.SEEK_END)
+            size = int.from_bytes(fh.read(4), 'little')
+        return None if size < self._fileobj.size else size
+
+    def _streamed_size(self) -> int:
+        size = 0
+        buffer = bytearray(1024 * 1024)
+        with self.open("rb") as unzip_f:
+            while n := unzip_f.readinto(buffer):  # type: ignore
+                size += n
+        return size
 
     @property
     def updated(self) -> datetime:
@@ -261,25 +433,34 @@ class FileNotFound(Exception):
 
 
 class FileFromTar(FileObj):
-    """Single file from a tar `FileObj`."""
+    """Single file from a tar `FileObj`.
+
+    Members are found with a `TarIndex` from `index_cache`, by default
+    `default_tar_index_cache`, so the tar is only scanned once for any number
+    of `FileFromTar` of it.
+    """
 
-    def __init__(self, tar_file: FileObj, path: str):
+    def __init__(self, tar_file: FileObj, path: str,
+                 index_cache: Optional['TarIndexCache'] = None):
         self._fileobj = tar_file
         self._path = path
         self._size = -1
         self._path_exists: Optional[bool] = None
-        self._tarinfo: Optional[tarfile.TarInfo] = None
+        self._index_cache = index_cache
 
     @property
     def name(self) -> str:
         return self._path
 
+    def _index(self) -> 'TarIndex':
+        from .tar_index import default_tar_index_cache
+        return (self._index_cache or default_tar_index_cache).get(self._fileobj)
+
     def exists(self) -> bool:
         """Returns `True` if `tar_file` exists and a member exists at `path` in
         the tar.
 
-        This extracts and saves the tarinfo. That records the offset
-        into the tar file. So it should not be too inefficient.
+        This gets the index of the tar, which is only built once per tar.
         """
         if self._path_exists is not None:
             return self._path_exists
@@ -288,34 +469,20 @@ class FileFromTar(FileObj):
             self._path_exists = False
             return False
 
-        with self._fileobj.open("rb") as fh:
-            with tarfile.open(fileobj=fh, mode="r") as tar:  # type: ignore
-                try:
-                    self._tarinfo = tar.getmember(self._path)
-                    self._path_exists = True
-                    self._size = self._tarinfo.size
-                    return True
-                except KeyError:
-                    self._path_exists = False
-                    return False
+        entry = self._index().members.get(self._path)
+        self._path_exists = entry is not None
+        if entry is not None:
+            self._size = entry.size
+        return self._path_exists
 
     def open(self, mode:str) -> BinaryMinimalFile:
-        # Why does this not use `with`? Because after the return it would be out of the with scope
-        # and the file will be closed and unusable.
-        fh = self._fileobj.open(mode)
-        tfh = tarfile.open(fileobj=fh, mode="r")  # type: ignore
+        index = self._index()
         try:
-            if self._tarinfo is None:
-                member = tfh.getmember(self._path)
-            else:
-                member = self._tarinfo
+            fh = index.open_member(self._fileobj, self._path)
         except KeyError:
             raise FileNotFound(f"could not find {self._path} in tar")
-        ef = tfh.extractfile(member)
-        if ef:
-            return typing.cast(BinaryMinimalFile, ef)
-        else:
-            raise FileNotFound(f"could not extract {self._path} in tar")
+        self._size = index.members[self._path].size
+        return typing.cast(BinaryMinimalFile, fh)
 
     @property
     def etag(self) -> str:
@@ -341,59 +508,137 @@ class FileFromTar(FileObj):
 DEFAULT_IO_SIZE = 8 * 1024 * 1024
 
 
+Transform = typing.Callable[[bytes], bytes]
+"""Function from bytes to bytes, it is called with one line at a time."""
+
+Transforms = Union[Transform, typing.Sequence[Transform]]
+
+
+def _compose(transforms: Transforms) -> Transform:
+    if callable(transforms):
+        return transforms
+    funcs = tuple(transforms)
+    if len(funcs) == 1:
+        return funcs[0]
+
+    def chained(data: bytes) -> bytes:
+        for func in funcs:
+            data = func(data)
+        return data
+    return chained
+
+
 class BinaryMinimalFileTransformed(BinaryMinimalFile):
-    """A file like object that includes a transform."""
+    """A file like object that includes a transform.
+
+    Each line of `inner_io` is passed through `transform`, or through each of
+    a sequence of transforms in order. The transformed lines are kept in a
+    deque and the bytes are only copied once, into what is returned, so
+    reading is linear in the size of the data.
+
+    `read()` without a size returns at most `DEFAULT_IO_SIZE` bytes.
+    `readline()` returns the line with its newline, like `io` files, so an
+    empty result is the end of the file. Lines that transform to nothing are
+    skipped by `read()` and `readline()`, but iterating yields the transformed
+    line for each line of `inner_io`, even if it is empty.
+    """
 
-    def __init__(self, inner_io: BinaryMinimalFile, transform: typing.Callable[[bytes], bytes]):
-        self.transform = transform
+    def __init__(self, inner_io: BinaryMinimalFile, transform: Transforms):
+        self.transform = _compose(transform)
         self.io = inner_io
-        self.buffer = b""
+        self._chunks: typing.Deque[bytes] = deque()
+        self._offset = 0
+        """Offset of the unread data in `self._chunks[0]`."""
+        self._eof = False
         self.at_start = True
         super().__init__()
 
+    def _fill(self) -> bool:
+        """Adds the next non-empty transformed line to the chunks.
+
+        Returns `False` at the end of `inner_io`.
+        """
+        while not self._eof:
+            data = self.io.readline(DEFAULT_IO_SIZE)
+            if not data:
+                self._eof = True
+                break
+            out = self.transform(data)
+            if out:
+                self._chunks.append(out)
+                return True
+        return False
+
+    def _take_line(self, limit: int, out: bytearray) -> None:
+        """Moves up to `limit` bytes to `out`, stopping after a newline."""
+        self.at_start = False
+        while len(out) < limit:
+            if not self._chunks and not self._fill():
+                return
+            chunk = self._chunks[0]
+            stop = min(len(chunk), self._offset + limit - len(out))
+            newline = chunk.find(b"\n", self._offset, stop)
+            if newline >= 0:
+                stop = newline + 1
+            out += memoryview(chunk)[self._offset:stop]
+            if stop == len(chunk):
+                self._chunks.popleft()
+                self._offset = 0
+            else:
+                self._offset = stop
+            if newline >= 0:
+                return
+
     def readline(self, size: Optional[int] = -1) -> bytes:
         if size is None or size <= 0:
             size = DEFAULT_IO_SIZE
-        if not self.buffer:
-            data = self.read(size)
-            self.buffer = data + self.buffer
-
-        lines = self.buffer.split(b"\n")
-        line = lines[0]
-        self.buffer = b"\n".join(lines[1:])
-        return line
+        out = bytearray()
+        self._take_line(size, out)
+        return bytes(out)
 
     def read(self, size: Optional[int] = -1) -> bytes:
         if size is None or size <= 0:
             size = DEFAULT_IO_SIZE
-
         self.at_start = False
-        while True:
-            data = self.io.readline(size)
-            self.buffer = self.buffer + self.transform(data)
-            if not data or len(self.buffer) >= size:
+        parts: typing.List[typing.Any] = []
+        n = 0
+        while n < size:
+            if not self._chunks and not self._fill():
                 break
-
-        if len(self.buffer) <= size:
-            to_return = self.buffer
-            self.buffer = b""
-            return to_return
-        else:
-            to_return = self.buffer[:size]
-            self.buffer = self.buffer[size:]
-            return to_return
+            chunk = self._chunks.popleft()
+            start, self._offset = self._offset, 0
+            end = min(len(chunk), start + size - n)
+            if end < len(chunk):
+                self._chunks.appendleft(chunk)
+                self._offset = end
+            parts.append(chunk if start == 0 and end == len(chunk) else memoryview(chunk)[start:end])
+            n += end - start
+        return b"".join(parts)
+
+    def readinto(self, buffer: typing.Any) -> int:
+        view = memoryview(buffer).cast('B')
+        data = self.read(len(view))
+        view[:len(data)] = data
+        return len(data)
 
     def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
         if not self.at_start:
             raise RuntimeError("Cannot seek after reading")
         if whence != io.SEEK_SET:
             raise ValueError("whence is not supported")
-        data = self.read(pos)
-        return len(data)
+        skipped = 0
+        while skipped < pos:
+            data = self.read(min(pos - skipped, DEFAULT_IO_SIZE))
+            if not data:
+                break
+            skipped += len(data)
+        return skipped
 
     def close(self) -> None:
         self.io.close()
-        self.buffer = b""
+        self._chunks.clear()
+        self._offset = 0
+        self._eof = False
         self.at_start = True
 
     def __enter__(self) -> 'BinaryMinimalFile':
@@ -406,18 +651,19 @@ class BinaryMinimalFileTransformed(BinaryMinimalFile):
         self.close()
 
     def __iter__(self) -> typing.Iterator[bytes]:
+        if self._chunks:  # left from read() or readline()
+            yield self.read(sum(map(len, self._chunks)) - self._offset)
         for line in self.io:
             yield self.transform(line)
 
 
-
-
 class FileTransform(FileObj):
-    """A `FileObj` that applies a transform to the original data."""
+    """A `FileObj` that applies a transform, or a sequence of transforms, to
+    the original data."""
 
-    def __init__(self, file: FileObj, transform: typing.Callable[[bytes], bytes]):
+    def __init__(self, file: FileObj, transform: Transforms):
         self.fileobj = file
-        self.transform = transform
+        self.transform = _compose(transform)
 
     @property
     def name(self) -> str:
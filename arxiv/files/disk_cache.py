@@ -0,0 +1,228 @@
+"""`ObjectStore` that keeps copies of objects on local disk."""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Literal, Optional, Tuple, Union
+
+from . import BinaryMinimalFile, FileDoesNotExist, FileObj
+from .object_store import ObjectStore
+
+logger = logging.getLogger(__name__)
+
+_TMP_PREFIX = '.tmp-'
+_COPY_SIZE = 1024 * 1024
+
+
+class DiskCachingObjectStore(ObjectStore):
+    """Read through cache of the contents of objects on local disk.
+
+    `to_obj()` still gets the object from the wrapped store, to get its
+    etag, so wrapping a `MetadataCachingObjectStore` is a good idea. The
+    contents are only fetched when the returned `FileObj` is opened. They
+    are saved in `cache_dir` under a name made from the key, etag and
+    updated. The updated is used since `LocalFileObj` has a fake etag.
+
+    At most `max_bytes` are kept and the least recently used files are
+    deleted when that is exceeded. Objects larger than `max_bytes` are not
+    cached. When several threads open the same uncached object at the same
+    time it is only fetched once.
+
+    Files already in `cache_dir` are reused so the cache survives restarts.
+    """
+
+    def __init__(self, store: ObjectStore, cache_dir: Union[str, Path],
+                 max_bytes: int = 1024 * 1024 * 1024):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.store = store
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = Lock()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for item in self.cache_dir.iterdir():
+            if item.name.startswith(_TMP_PREFIX):
+                item.unlink(missing_ok=True)
+            elif item.is_file():
+                stat = item.stat()
+                entries.append((stat.st_atime, item.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self.total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used files until under `max_bytes`.
+
+        Must be called with the lock held.
+        """
+        while self.total_bytes > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            (self.cache_dir / name).unlink(missing_ok=True)
+
+    def _forget(self, name: str) -> None:
+        with self._lock:
+            size = self._index.pop(name, None)
+            if size is not None:
+                self.total_bytes -= size
+
+    @staticmethod
+    def cache_name(key: str, obj: FileObj) -> str:
+        """Name of the file in the cache for `obj` at `key`."""
+        updated = obj.updated.isoformat() if isinstance(obj.updated, datetime) else ''
+        digest = hashlib.sha256(f"{key}\0{obj.etag}\0{updated}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def fetch(self, key: str, obj: FileObj) -> Optional[Path]:
+        """Gets the path of the cached copy of `obj`, fetching it if needed.
+
+        Returns `None` if `obj` is too large to cache.
+        """
+        name = self.cache_name(key, obj)
+        with self._lock:
+            if name in self._index:
+                self._index.move_to_end(name)
+                self.hits += 1
+                return self.cache_dir / name
+            future = self._inflight.get(name)
+            leader = future is None
+            if future is None:
+                if obj.size > self.max_bytes:
+                    return None
+                self.misses += 1
+                future = Future()
+                self._inflight[name] = future
+        if not leader:
+            return future.result()  # type: ignore
+
+        try:
+            path = self._download(obj, name)
+            future.set_result(path)
+            return path
+        except BaseException as ex:
+            future.set_exception(ex)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[name]
+
+    def _download(self, obj: FileObj, name: str) -> Path:
+        path = self.cache_dir / name
+        fd, tmp = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=self.cache_dir)
+        try:
+            with obj.open('rb') as src, os.fdopen(fd, 'wb') as dst:
+                shutil.copyfileobj(src, dst, _COPY_SIZE)  # type: ignore
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._index[name] = size
+            self.total_bytes += size
+            self._index.move_to_end(name)
+            self._evict()
+        return path
+
+    def to_obj(self, key: str) -> FileObj:
+        """Gets a `FileObj` that reads from the disk cache."""
+        obj = self.store.to_obj(key)
+        if isinstance(obj, FileDoesNotExist):
+            return obj
+        return DiskCachedFileObj(self, key, obj)
+
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        return {key: obj if isinstance(obj, FileDoesNotExist) else DiskCachedFileObj(self, key, obj)
+                for key, obj in self.store.to_objs(keys).items()}
+
+    def stats(self) -> Dict[str, int]:
+        """Hits, misses, evictions and bytes used."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'files': len(self._index),
+                    'bytes': self.total_bytes,
+                    'max_bytes': self.max_bytes}
+
+    def list(self, prefix: str) -> Iterable[FileObj]:
+        return self.store.list(prefix)
+
+    def status(self) -> Tuple[Literal["GOOD", "BAD"], str]:
+        return self.store.status()
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<DiskCachingObjectStore {self.cache_dir} {self.store}>"
+
+
+class DiskCachedFileObj(FileObj):
+    """`FileObj` that opens the copy in a `DiskCachingObjectStore`.
+
+    The metadata is from the `FileObj` of the wrapped store.
+    """
+
+    def __init__(self, cache: DiskCachingObjectStore, key: str, obj: FileObj):
+        self.cache = cache
+        self.key = key
+        self.fileobj = obj
+
+    @property
+    def name(self) -> str:
+        return self.fileobj.name
+
+    def exists(self) -> bool:
+        return True
+
+    def open(self, mode: str = 'rb', **kwargs) -> BinaryMinimalFile:  # type: ignore
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError("DiskCachedFileObj can only be opened for reading")
+        for _ in range(2):
+            path = self.cache.fetch(self.key, self.fileobj)
+            if path is None:
+                return self.fileobj.open(mode, **kwargs)  # type: ignore
+            try:
+                return path.open(mode, **kwargs)  # type: ignore
+            except FileNotFoundError:
+                # evicted or removed between fetch and open
+                self.cache._forget(path.name)
+        raise FileNotFoundError(f"could not open cached copy of {self.key}")
+
+    @property
+    def etag(self) -> str:
+        return self.fileobj.etag
+
+    @property
+    def size(self) -> int:
+        return self.fileobj.size
+
+    @property
+    def updated(self) -> datetime:
+        return self.fileobj.updated
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<DiskCachedFileObj fileobj={self.fileobj}>"
@@ -0,0 +1,242 @@
+"""Fake `ObjectStore`s for tests and benchmarks."""
+import hashlib
+import io
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, Literal, Optional, Tuple
+
+from google.api_core.exceptions import ServiceUnavailable, TooManyRequests
+
+from . import BinaryMinimalFile, FileDoesNotExist, FileObj
+from .object_store import ObjectStore, concurrent_to_objs
+
+
+class LatencyObjectStore(ObjectStore):
+    """Wraps an `ObjectStore` and adds `latency` seconds to each request.
+
+    Use to measure how features that cut or overlap requests, like
+    `to_objs()`, would do against a remote store like GCS. `to_objs()` runs
+    concurrently on up to `max_workers` threads like `GsObjectStore`.
+    """
+
+    def __init__(self, store: ObjectStore, latency: float = 0.05, max_workers: int = 8):
+        self.store = store
+        self.latency = latency
+        self.requests = 0
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="LatencyObjectStore")
+
+    def _request(self) -> None:
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+
+    def to_obj(self, key: str) -> FileObj:
+        self._request()
+        return self.store.to_obj(key)
+
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        return concurrent_to_objs(self.to_obj, keys, self._executor)
+
+    def list(self, prefix: str) -> Iterable[FileObj]:
+        self._request()
+        return self.store.list(prefix)
+
+    def status(self) -> Tuple[Literal["GOOD", "BAD"], str]:
+        return self.store.status()
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<LatencyObjectStore {self.latency}s {self.store}>"
+
+
+Latency = Callable[[random.Random], float]
+"""Gets a latency in seconds using the given random number generator."""
+
+
+def constant(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float = 0.5) -> Latency:
+    """Latency with a long tail like GCS, `median` is in seconds."""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+@dataclass
+class Behavior:
+    """How an `InMemoryObjectStore` acts for keys with a prefix.
+
+    `error_rate` is the chance each request raises `ServiceUnavailable`,
+    which like a GCS 503 should be retried. `max_rate` limits the requests
+    per second with a token bucket that holds up to `burst` requests, ones
+    over the limit raise `TooManyRequests` like a GCS 429.
+    """
+
+    latency: Latency = constant(0.0)
+    error_rate: float = 0.0
+    max_rate: Optional[float] = None
+    burst: int = 10
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class InMemoryObjectStore(ObjectStore):
+    """`ObjectStore` that holds objects in memory and can act like a remote
+    store.
+
+    `behaviors` sets the latency, transient errors and throttling for keys
+    by prefix, the longest matching prefix is used. Keys with no matching
+    prefix use `Behavior()` which has none of them. The behavior applies to
+    `to_obj()`, `list()` and opening objects. `seed` makes the latencies and
+    errors repeatable.
+
+    Counts of `requests`, `errors` and `throttled` are kept.
+    """
+
+    def __init__(self, objects: Optional[Dict[str, bytes]] = None,
+                 behaviors: Optional[Dict[str, Behavior]] = None,
+                 seed: Optional[int] = None, max_workers: int = 8):
+        self.objects: Dict[str, InMemoryFileObj] = {}
+        self.behaviors = behaviors or {}
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="InMemoryObjectStore")
+        for key, data in (objects or {}).items():
+            self.put(key, data)
+
+    def put(self, key: str, data: bytes, updated: Optional[datetime] = None) -> None:
+        """Adds or replaces the object at `key`."""
+        self.objects[key] = InMemoryFileObj(self, key, data,
+                                            updated or datetime.now(tz=timezone.utc))
+
+    def delete(self, key: str) -> None:
+        self.objects.pop(key, None)
+
+    def _request(self, key: str) -> None:
+        """Counts a request and acts out the behavior for `key`."""
+        prefix = max((p for p in self.behaviors if key.startswith(p)), key=len, default=None)
+        behavior = self.behaviors[prefix] if prefix is not None else _NO_BEHAVIOR
+        with self._lock:
+            self.requests += 1
+            latency = behavior.latency(self._rng)
+            fail = behavior.error_rate > 0 and self._rng.random() < behavior.error_rate
+            allowed = True
+            if behavior.max_rate is not None and prefix is not None:
+                bucket = self._buckets.get(prefix)
+                if bucket is None:
+                    bucket = self._buckets[prefix] = _TokenBucket(behavior.max_rate, behavior.burst)
+                allowed = bucket.take()
+            if not allowed:
+                self.throttled += 1
+            elif fail:
+                self.errors += 1
+        if latency > 0:
+            time.sleep(latency)
+        if not allowed:
+            raise TooManyRequests(f"rate limit for {prefix}")
+        if fail:
+            raise ServiceUnavailable(f"transient error for {key}")
+
+    def to_obj(self, key: str) -> FileObj:
+        self._request(key)
+        obj = self.objects.get(key)
+        if obj is None:
+            return FileDoesNotExist("mem://" + key)
+        return obj
+
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        return concurrent_to_objs(self.to_obj, keys, self._executor)
+
+    def list(self, prefix: str) -> Iterator[FileObj]:
+        """Gets the objects with keys that start with `prefix` in key order,
+        like `Client.list_blobs()`."""
+        self._request(prefix)
+        return iter([self.objects[key] for key in sorted(self.objects) if key.startswith(prefix)])
+
+    def status(self) -> Tuple[Literal["GOOD", "BAD"], str]:
+        return ("GOOD", "")
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<InMemoryObjectStore {len(self.objects)} objects>"
+
+
+_NO_BEHAVIOR = Behavior()
+
+
+class InMemoryFileObj(FileObj):
+    """Object in an `InMemoryObjectStore`, opening it is a request."""
+
+    def __init__(self, store: InMemoryObjectStore, key: str, data: bytes, updated: datetime):
+        self.store = store
+        self.key = key
+        self.data = data
+        self._updated = updated
+        self._etag = hashlib.md5(data).hexdigest()
+
+    @property
+    def name(self) -> str:
+        return self.key
+
+    def exists(self) -> bool:
+        return self.store.objects.get(self.key) is self
+
+    def open(self, mode: str = 'rb') -> BinaryMinimalFile:
+        """Opens the data, as text decoded as UTF-8 if `mode` does not have `b`
+        like `Blob.open()`."""
+        self.store._request(self.key)
+        if 'b' in mode:
+            return io.BytesIO(self.data)
+        return io.TextIOWrapper(io.BytesIO(self.data), encoding='utf-8')  # type: ignore
+
+    @property
+    def etag(self) -> str:
+        return self._etag
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def updated(self) -> datetime:
+        return self._updated
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<InMemoryFileObj key={self.key}>"
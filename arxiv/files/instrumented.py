@@ -0,0 +1,362 @@
+"""`ObjectStore` and `FileObj` wrappers that measure requests.
+
+`InstrumentedObjectStore` times `to_obj()`, `to_objs()` and `list()` and wraps
+the objects it returns in `InstrumentedFileObj`, which times `open()`, the
+first byte read and the whole read, and counts the bytes read. Errors are
+counted for each operation. Each measurement is an `Observation` tagged with
+the key prefix, ex. `ps_cache/`, and is given to a sink:
+
+- `MetricsRegistry` keeps latency histograms and counters and renders them in
+  the Prometheus text format.
+- `LoggingSink` logs each observation.
+- `CallbackSink` calls a function with each observation.
+
+With a sink of `None` the store returns the objects of the wrapped store
+unchanged, so the cost when disabled is one attribute check per call.
+"""
+import bisect
+import logging
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, \
+    NamedTuple, Optional, Protocol, Sequence, Tuple
+
+from . import BinaryMinimalFile, FileDoesNotExist, FileObj
+from .object_store import ObjectStore, open_range
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIXES = ('ps_cache/', 'ftp/', 'orig/')
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+"""Upper bounds in seconds of the latency histogram buckets."""
+
+Operation = Literal['to_obj', 'to_objs', 'list', 'open', 'first_byte', 'read']
+
+
+class Observation(NamedTuple):
+    """One measured operation."""
+
+    op: Operation
+    prefix: str
+    seconds: float
+    bytes: int = 0
+    """Bytes read, only for `read`."""
+
+    error: bool = False
+
+
+class Sink(Protocol):
+    """Receives `Observation`s."""
+
+    def observe(self, observation: Observation) -> None:
+        pass
+
+
+class Histogram:
+    """Counts of values at or below each bucket bound, with their sum."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Gets (bound, count at or below) for each bucket and +Inf."""
+        out, total = [], 0
+        for bound, count in zip((*self.buckets, float('inf')), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+class MetricsRegistry:
+    """Sink that keeps a latency histogram per operation and prefix, bytes
+    read per prefix and errors per operation and prefix."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 namespace: str = 'arxiv_object_store'):
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.bytes_read: Dict[str, int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self._lock = Lock()
+
+    def observe(self, observation: Observation) -> None:
+        op, prefix = observation.op, observation.prefix
+        with self._lock:
+            hist = self.latency.get((op, prefix))
+            if hist is None:
+                hist = self.latency[(op, prefix)] = Histogram(self.buckets)
+            hist.observe(observation.seconds)
+            if observation.bytes:
+                self.bytes_read[prefix] = self.bytes_read.get(prefix, 0) + observation.bytes
+            if observation.error:
+                self.errors[(op, prefix)] = self.errors.get((op, prefix), 0) + 1
+
+    def prometheus_text(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        ns = self.namespace
+        lines = [f"# HELP {ns}_seconds Latency of object store operations.",
+                 f"# TYPE {ns}_seconds histogram"]
+        with self._lock:
+            for (op, prefix), hist in sorted(self.latency.items()):
+                labels = f'op="{op}",prefix="{prefix}"'
+                for bound, count in hist.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{ns}_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f'{ns}_seconds_sum{{{labels}}} {hist.sum!r}')
+                lines.append(f'{ns}_seconds_count{{{labels}}} {hist.count}')
+            lines += [f"# HELP {ns}_read_bytes_total Bytes read from objects.",
+                      f"# TYPE {ns}_read_bytes_total counter"]
+            lines += [f'{ns}_read_bytes_total{{prefix="{prefix}"}} {count}'
+                      for prefix, count in sorted(self.bytes_read.items())]
+            lines += [f"# HELP {ns}_errors_total Object store operations that raised.",
+                      f"# TYPE {ns}_errors_total counter"]
+            lines += [f'{ns}_errors_total{{op="{op}",prefix="{prefix}"}} {count}'
+                      for (op, prefix), count in sorted(self.errors.items())]
+        return "\n".join(lines) + "\n"
+
+
+class LoggingSink:
+    """Sink that logs each observation at `level`."""
+
+    def __init__(self, log: logging.Logger = logger, level: int = logging.DEBUG):
+        self.log = log
+        self.level = level
+
+    def observe(self, observation: Observation) -> None:
+        if self.log.isEnabledFor(self.level):
+            self.log.log(self.level, "%s %s %.6fs bytes=%d error=%s", *observation)
+
+
+class CallbackSink:
+    """Sink that calls `callback` with each observation."""
+
+    def __init__(self, callback: Callable[[Observation], None]):
+        self.callback = callback
+
+    def observe(self, observation: Observation) -> None:
+        self.callback(observation)
+
+
+class MultiSink:
+    """Sink that gives each observation to each of `sinks`."""
+
+    def __init__(self, *sinks: Sink):
+        self.sinks = sinks
+
+    def observe(self, observation: Observation) -> None:
+        for sink in self.sinks:
+            sink.observe(observation)
+
+
+def key_prefix(key: str, prefixes: Sequence[str] = DEFAULT_PREFIXES) -> str:
+    """Gets the first of `prefixes` that `key` starts with or `other`."""
+    for prefix in prefixes:
+        if key.startswith(prefix):
+            return prefix
+    return 'other'
+
+
+class InstrumentedObjectStore(ObjectStore):
+    """Wraps an `ObjectStore` and gives measurements of it to `sink`.
+
+    Set `sink` to `None` to turn measuring off. `prefixes` are the key
+    prefixes measurements are tagged with, keys with none of them are
+    tagged `other`.
+    """
+
+    def __init__(self, store: ObjectStore, sink: Optional[Sink],
+                 prefixes: Sequence[str] = DEFAULT_PREFIXES):
+        self.store = store
+        self.sink = sink
+        self.prefixes = tuple(prefixes)
+
+    def _timed(self, op: Operation, prefix: str, func: Callable[[], Any]) -> Any:
+        sink = self.sink
+        start = time.perf_counter()
+        try:
+            result = func()
+        except BaseException:
+            sink.observe(Observation(op, prefix, time.perf_counter() - start, error=True))  # type: ignore
+            raise
+        sink.observe(Observation(op, prefix, time.perf_counter() - start))  # type: ignore
+        return result
+
+    def _wrap(self, key: str, obj: FileObj) -> FileObj:
+        if isinstance(obj, FileDoesNotExist):
+            return obj
+        return InstrumentedFileObj(obj, key_prefix(key, self.prefixes), self.sink)  # type: ignore
+
+    def to_obj(self, key: str) -> FileObj:
+        if self.sink is None:
+            return self.store.to_obj(key)
+        prefix = key_prefix(key, self.prefixes)
+        return self._wrap(key, self._timed('to_obj', prefix, lambda: self.store.to_obj(key)))
+
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        if self.sink is None:
+            return self.store.to_objs(keys)
+        # a batch for each prefix so each is measured under its own
+        groups: Dict[str, List[str]] = {}
+        for key in keys:
+            groups.setdefault(key_prefix(key, self.prefixes), []).append(key)
+        objs: Dict[str, FileObj] = {}
+        for prefix, group in groups.items():
+            found = self._timed('to_objs', prefix, lambda: self.store.to_objs(group))
+            objs.update((key, self._wrap(key, obj)) for key, obj in found.items())
+        return objs
+
+    def list(self, prefix: str) -> Iterable[FileObj]:
+        if self.sink is None:
+            return self.store.list(prefix)
+        # listings are lazy so the time is to the end of iterating
+        return self._timed_list(prefix)
+
+    def _timed_list(self, prefix: str) -> Iterator[FileObj]:
+        sink = self.sink
+        tag = key_prefix(prefix, self.prefixes)
+        start = time.perf_counter()
+        try:
+            for obj in self.store.list(prefix):
+                yield InstrumentedFileObj(obj, tag, sink)  # type: ignore
+        except GeneratorExit:
+            raise
+        except BaseException:
+            sink.observe(Observation('list', tag, time.perf_counter() - start, error=True))  # type: ignore
+            raise
+        sink.observe(Observation('list', tag, time.perf_counter() - start))  # type: ignore
+
+    def status(self) -> Tuple[Literal["GOOD", "BAD"], str]:
+        return self.store.status()
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<InstrumentedObjectStore {self.store}>"
+
+
+class InstrumentedFileObj(FileObj):
+    """Wraps a `FileObj` and measures opening and reading it."""
+
+    def __init__(self, fileobj: FileObj, prefix: str, sink: Sink):
+        self.fileobj = fileobj
+        self.prefix = prefix
+        self.sink = sink
+
+    @property
+    def name(self) -> str:
+        return self.fileobj.name
+
+    def exists(self) -> bool:
+        return self.fileobj.exists()
+
+    def open(self, mode: str = 'rb', **kwargs) -> BinaryMinimalFile:  # type: ignore
+        return self._measure(lambda: self.fileobj.open(mode, **kwargs))  # type: ignore
+
+    def open_range(self, start: int, end: Optional[int] = None) -> Any:
+        return self._measure(lambda: open_range(self.fileobj, start, end))
+
+    def _measure(self, opener: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            fh = opener()
+        except BaseException:
+            self.sink.observe(Observation('open', self.prefix, time.perf_counter() - start,
+                                          error=True))
+            raise
+        self.sink.observe(Observation('open', self.prefix, time.perf_counter() - start))
+        return InstrumentedReader(fh, self.prefix, self.sink, start)
+
+    @property
+    def etag(self) -> str:
+        return self.fileobj.etag
+
+    @property
+    def size(self) -> int:
+        return self.fileobj.size
+
+    @property
+    def updated(self) -> datetime:
+        return self.fileobj.updated
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<InstrumentedFileObj fileobj={self.fileobj}>"
+
+
+class InstrumentedReader:
+    """Wraps an open file to measure the time to the first byte and the time
+    and bytes of the whole read, which is given to the sink on close."""
+
+    def __init__(self, fh: Any, prefix: str, sink: Sink, start: float):
+        self._fh = fh
+        self._prefix = prefix
+        self._sink = sink
+        self._start = start
+        self._first = True
+        self._bytes = 0
+        self._error = False
+        self._closed = False
+
+    def _read(self, func: Callable[..., Any], *args: Any) -> Any:
+        try:
+            data = func(*args)
+        except BaseException:
+            self._error = True
+            raise
+        n = data if isinstance(data, int) else len(data)
+        if n and self._first:
+            self._first = False
+            self._sink.observe(Observation('first_byte', self._prefix,
+                                           time.perf_counter() - self._start))
+        self._bytes += n
+        return data
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        return self._read(self._fh.read, size)  # type: ignore
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        return self._read(self._fh.readline, size)  # type: ignore
+
+    def readinto(self, buffer: Any) -> int:
+        return self._read(self._fh.readinto, buffer)  # type: ignore
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        return self._fh.seek(pos, whence)  # type: ignore
+
+    def tell(self) -> int:
+        return self._fh.tell()  # type: ignore
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._fh.close()
+            self._sink.observe(Observation('read', self._prefix, time.perf_counter() - self._start,
+                                           self._bytes, self._error))
+
+    def __enter__(self) -> 'InstrumentedReader':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while line := self.readline():
+            yield line
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._fh, name)
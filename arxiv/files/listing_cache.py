@@ -0,0 +1,106 @@
+"""`ObjectStore` that caches the results of `list`."""
+import bisect
+import re
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Tuple
+
+from . import FileObj
+from .object_store import ObjectStore
+from ..util.cache import TTLCache
+
+_YYMM_DIR = re.compile(r'^(?P<dir>.*/\d{4}/)(?P<file>[^/]*)$')
+"""Prefix in a yymm directory, ex. `orig/arxiv/papers/2401/2401.12345v`."""
+
+
+def _relative_name(directory: str, obj: FileObj) -> str:
+    # Blob names are the whole key, LocalFileObj names are just the file name
+    return obj.name[len(directory):] if obj.name.startswith(directory) else obj.name
+
+
+class _DirIndex:
+    """Objects in a directory sorted by their names relative to it.
+
+    Listings of blobs include the objects in subdirectories, ex.
+    `ps_cache/arxiv/html/2401/2401.12345v1/index.html`, so those are kept
+    with the subdirectory in their name and found by a prefix the same as
+    with a listing of the prefix.
+    """
+
+    def __init__(self, directory: str, objs: Iterable[FileObj]):
+        items = sorted(((_relative_name(directory, obj), obj) for obj in objs),
+                       key=lambda item: item[0])
+        self.names = [name for name, _ in items]
+        self.objs = [obj for _, obj in items]
+
+    def starting_with(self, file_prefix: str) -> List[FileObj]:
+        start = bisect.bisect_left(self.names, file_prefix)
+        end = start
+        while end < len(self.names) and self.names[end].startswith(file_prefix):
+            end += 1
+        return self.objs[start:end]
+
+
+class ListingCachingObjectStore(ObjectStore):
+    """Caches the results of `list()` of another `ObjectStore` by prefix.
+
+    Listings are kept for `ttl` seconds. With `prefetch`, a prefix in a yymm
+    directory like `orig/arxiv/papers/2401/2401.12345v` is answered from one
+    listing of the whole directory, `orig/arxiv/papers/2401/`, which is kept
+    as a sorted index. That is one listing request per directory per `ttl`
+    instead of one per paper.
+
+    Listings are lists so they are held in memory, with at most `maxsize`
+    prefixes or directories. `to_obj()` is not cached.
+    """
+
+    def __init__(self, store: ObjectStore, maxsize: int = 1000, ttl: float = 60.0,
+                 prefetch: bool = False, timer: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.prefetch = prefetch
+        self.listings: TTLCache[str, List[FileObj]] = TTLCache(maxsize, ttl, timer)
+        self.directories: TTLCache[str, _DirIndex] = TTLCache(maxsize, ttl, timer)
+
+    def to_obj(self, key: str) -> FileObj:
+        return self.store.to_obj(key)
+
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        return self.store.to_objs(keys)
+
+    def list(self, prefix: str) -> Iterator[FileObj]:
+        """Gets the objects with keys starting with `prefix`, from the cache
+        if possible."""
+        match = _YYMM_DIR.match(prefix) if self.prefetch else None
+        if match and match['file']:
+            index = self.directories.get(match['dir'])
+            if index is None:
+                index = _DirIndex(match['dir'], self.store.list(match['dir']))
+                self.directories.set(match['dir'], index)
+            return iter(index.starting_with(match['file']))
+
+        listing = self.listings.get(prefix)
+        if listing is None:
+            listing = list(self.store.list(prefix))
+            self.listings.set(prefix, listing)
+        return iter(listing)
+
+    def invalidate(self, prefix: str) -> None:
+        """Removes the listing of `prefix` and of its yymm directory, ex. after
+        an object was added."""
+        self.listings.pop(prefix)
+        match = _YYMM_DIR.match(prefix)
+        if match:
+            self.directories.pop(match['dir'])
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hits, misses, evictions, expirations and sizes of the caches."""
+        return {'listings': self.listings.stats(),
+                'directories': self.directories.stats()}
+
+    def status(self) -> Tuple[Literal["GOOD", "BAD"], str]:
+        return self.store.status()
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<ListingCachingObjectStore {self.store}>"
@@ -0,0 +1,95 @@
+"""`ObjectStore` that caches the results of `to_obj`."""
+import time
+from typing import Callable, Dict, Iterable, Literal, Tuple
+
+from . import FileDoesNotExist, FileObj
+from .object_store import ObjectStore
+from ..util.cache import TTLCache
+
+
+class MetadataCachingObjectStore(ObjectStore):
+    """Caches the `FileObj` from `to_obj()` of another `ObjectStore`.
+
+    For a `GsObjectStore` the cached object is the `Blob`, which holds the
+    name, size, etag and updated, so those are then available without a
+    request to GCS. The contents of objects are not cached.
+
+    Objects that exist and ones that do not are cached separately with their
+    own size and TTL. The TTL for objects that do not exist is usually shorter
+    so new objects are found quickly.
+
+    `list()` and `status()` are not cached.
+    """
+
+    def __init__(self, store: ObjectStore,
+                 maxsize: int = 10_000, ttl: float = 300.0,
+                 negative_maxsize: int = 10_000, negative_ttl: float = 30.0,
+                 timer: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.positive: TTLCache[str, FileObj] = TTLCache(maxsize, ttl, timer)
+        self.negative: TTLCache[str, FileObj] = TTLCache(negative_maxsize, negative_ttl, timer)
+
+    def to_obj(self, key: str) -> FileObj:
+        """Gets a `FileObj` from the cache or from the wrapped store."""
+        obj = self.positive.get(key)
+        if obj is not None:
+            return obj
+        obj = self.negative.get(key)
+        if obj is not None:
+            return obj
+
+        obj = self.store.to_obj(key)
+        if isinstance(obj, FileDoesNotExist):
+            self.negative.set(key, obj)
+        else:
+            self.positive.set(key, obj)
+        return obj
+
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        """Gets `FileObj`s from the cache and the rest in one call to the
+        wrapped store's `to_objs()`."""
+        found: Dict[str, FileObj] = {}
+        missing = []
+        for key in keys:
+            obj = self.positive.get(key)
+            if obj is None:
+                obj = self.negative.get(key)
+            if obj is None:
+                missing.append(key)
+            else:
+                found[key] = obj
+        if missing:
+            for key, obj in self.store.to_objs(missing).items():
+                if isinstance(obj, FileDoesNotExist):
+                    self.negative.set(key, obj)
+                else:
+                    self.positive.set(key, obj)
+                found[key] = obj
+        return found
+
+    def invalidate(self, key: str) -> None:
+        """Removes `key` from the cache, ex. after it was written."""
+        self.positive.pop(key)
+        self.negative.pop(key)
+
+    def clear(self) -> None:
+        """Removes everything from the cache."""
+        self.positive.clear()
+        self.negative.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hits, misses, evictions, expirations and sizes of the caches."""
+        return {'positive': self.positive.stats(),
+                'negative': self.negative.stats()}
+
+    def list(self, prefix: str) -> Iterable[FileObj]:
+        return self.store.list(prefix)
+
+    def status(self) -> Tuple[Literal["GOOD", "BAD"], str]:
+        return self.store.status()
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __str__(self) -> str:
+        return f"<MetadataCachingObjectStore {self.store}>"
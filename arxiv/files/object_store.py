@@ -1,15 +1,18 @@
 """The object store service to access local or cloud files."""
 
+import io
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, \
-    Literal, Tuple, Iterator
+from threading import Lock
+from typing import BinaryIO, Callable, Dict, Iterable, \
+    Literal, Optional, Tuple, Iterator
 
 from google.cloud.storage.blob import Blob
 from google.cloud.storage.bucket import Bucket
 from google.cloud.storage.retry import DEFAULT_RETRY
 
-from . import FileObj
+from . import DEFAULT_IO_SIZE, FileDoesNotExist, FileObj, RangeRaw, _check_range
 
 GCS_RETRY = DEFAULT_RETRY \
     .with_deadline(12) \
@@ -43,6 +46,29 @@ class ObjectStore(ABC):
         """
         pass
 
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        """Gets a `FileObj` for each of `keys`.
+
+        This does them one at a time. Stores where each `to_obj()` is a
+        network request should override this to do them concurrently.
+        """
+        return {key: self.to_obj(key) for key in keys}
+
+    def exists_many(self, keys: Iterable[str]) -> Dict[str, bool]:
+        """Gets if there is an object for each of `keys`."""
+        return {key: not isinstance(obj, FileDoesNotExist)
+                for key, obj in self.to_objs(keys).items()}
+
+
+def concurrent_to_objs(to_obj: Callable[[str], FileObj],
+                       keys: Iterable[str],
+                       executor: Executor) -> Dict[str, FileObj]:
+    """Runs `to_obj` for each of `keys` on `executor`."""
+    unique = list(dict.fromkeys(keys))
+    if len(unique) < 2:
+        return {key: to_obj(key) for key in unique}
+    return dict(zip(unique, executor.map(to_obj, unique)))
+
 ##########################################################################
 ###### Local Object Store
 ##########################################################################
@@ -100,11 +126,37 @@ class LocalObjectStore(ObjectStore):
 
 FileObj.register(Blob)
 
+
+def open_range(fileobj: FileObj, start: int, end: Optional[int] = None) -> BinaryIO:
+    """Opens the bytes of `fileobj` from `start` up to but not including `end`.
+
+    This is `FileObj.open_range()` that also works for a GS `Blob`, which
+    is only a virtual subclass of `FileObj`. For a `Blob` only the bytes in
+    the range are downloaded, in requests of at most `DEFAULT_IO_SIZE`.
+    """
+    if not isinstance(fileobj, Blob):
+        return fileobj.open_range(start, end)
+    _check_range(start, end)
+    size = None if end is None else end - start
+    chunk_size = DEFAULT_IO_SIZE if size is None else max(1, min(size, DEFAULT_IO_SIZE))
+    reader = fileobj.open('rb', chunk_size=chunk_size, retry=GCS_RETRY)
+    try:
+        reader.seek(start)
+    except BaseException:
+        reader.close()
+        raise
+    return io.BufferedReader(RangeRaw(reader, start, size, [reader]))
+
+
 class GsObjectStore(ObjectStore):
-    def __init__(self, bucket: Bucket):
+    def __init__(self, bucket: Bucket, max_workers: int = 8):
+        """`max_workers` is the most threads used by `to_objs()`."""
         if not bucket:
             raise ValueError("Must set a bucket")
         self.bucket = bucket
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = Lock()
 
     def to_obj(self, key: str) -> FileObj:
         """Gets the `Blob` fom google-cloud-storage.
@@ -120,6 +172,17 @@ class GsObjectStore(ObjectStore):
         else:
             return blob  # type: ignore
 
+    def to_objs(self, keys: Iterable[str]) -> Dict[str, FileObj]:
+        """Gets the `Blob` for each of `keys` with concurrent requests.
+
+        Keys with no object get a `FileDoesNotExist`.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers,
+                                                    thread_name_prefix="GsObjectStore")
+        return concurrent_to_objs(self.to_obj, keys, self._executor)
+
     def list(self, prefix: str) -> Iterator[FileObj]:
         """Gets listing of keys with prefix.
 
@@ -0,0 +1,141 @@
+"""Finds the keys of the dissemination files of a paper version.
+
+Which files exist for a version depends on how it was submitted, ex. a
+PDF only submission has its PDF in `ftp` or `orig` but a TeX submission has
+it in `ps_cache`. `DisseminationResolver` works out every key that could
+hold each format, checks them all with one `ObjectStore.to_objs()`, and the
+HTML directory with `ObjectStore.list()`, and caches what was found.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from . import FileDoesNotExist, FileObj
+from .key_patterns import abs_path_current, abs_path_current_parent, abs_path_orig, \
+    abs_path_orig_parent, current_pdf_path, current_ps_path, ps_cache_html_path, \
+    ps_cache_pdf_path, ps_cache_ps_path, previous_pdf_path, previous_ps_path
+from .object_store import ObjectStore
+from ..document.version import SourceFlag
+from ..formats import VALID_SOURCE_EXTENSIONS, formats_from_source_flag
+from ..identifier import Identifier
+from ..util.cache import TTLCache
+
+_Key = Tuple[str, int, bool, Tuple[str, ...]]
+"""ID, version, is current and the formats looked for."""
+
+def candidate_keys(arxiv_id: Identifier, version: int, is_current: bool,
+                   formats: List[str]) -> Dict[str, List[str]]:
+    """Gets the keys that could hold each format, in order of preference.
+
+    `abs` is always included. Of `formats` only `pdf`, `ps`, `html` and `src`
+    are used. The `html` key is the directory in `ps_cache`, ending in `/`.
+    It is not an object in stores like GCS, so it exists if there are any
+    objects under it.
+    """
+    vid = Identifier(f"{arxiv_id.id}v{version}")
+    candidates: Dict[str, List[str]] = {
+        'abs': [abs_path_current(vid) if is_current else abs_path_orig(vid)]}
+    if 'pdf' in formats:
+        candidates['pdf'] = [ps_cache_pdf_path(vid),
+                             current_pdf_path(vid) if is_current else previous_pdf_path(vid)]
+    if 'ps' in formats:
+        candidates['ps'] = [ps_cache_ps_path(vid),
+                            current_ps_path(vid) if is_current else previous_ps_path(vid)]
+    if 'html' in formats:
+        candidates['html'] = [ps_cache_html_path(vid)]
+    if 'src' in formats:
+        if is_current:
+            stem = f"{abs_path_current_parent(vid)}/{vid.filename}"
+        else:
+            stem = f"{abs_path_orig_parent(vid)}/{vid.filename}v{version}"
+        candidates['src'] = [stem + ext for ext, _ in VALID_SOURCE_EXTENSIONS]
+    return candidates
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """The files found for a version of a paper."""
+
+    arxiv_id: str
+    version: int
+    found: Dict[str, FileObj] = field(default_factory=dict)
+    """The first existing `FileObj` for each format, for `html` the first
+    object in its directory."""
+
+    missing: List[str] = field(default_factory=list)
+    """Formats with no existing key."""
+
+    def get(self, format: str) -> Optional[FileObj]:
+        return self.found.get(format)
+
+
+class DisseminationResolver:
+    """Finds and caches the files of each format for paper versions.
+
+    All the candidate keys for a version are checked at once with
+    `store.to_objs()`, which is concurrent for a `GsObjectStore`. Results are
+    cached per (ID, version, is current, formats of the source flag) for
+    `ttl` seconds. Formats that were
+    missing are checked again after `negative_ttl` seconds, so files that are
+    still being built are found soon.
+    """
+
+    def __init__(self, store: ObjectStore, maxsize: int = 10_000,
+                 ttl: float = 300.0, negative_ttl: float = 30.0,
+                 timer: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.cache: TTLCache[_Key, Resolution] = TTLCache(maxsize, ttl, timer)
+        self.checked: TTLCache[_Key, bool] = TTLCache(maxsize, negative_ttl, timer)
+        """Versions whose missing formats were checked recently."""
+
+    def resolve(self, arxiv_id: Identifier, source_flag: Union[str, SourceFlag],
+                version: int = 0, is_current: bool = True) -> Resolution:
+        """Finds the files for `version` of `arxiv_id`, by default its version.
+
+        `is_current` is if it is the latest version, which decides if the
+        files are looked for in `ftp` or `orig`.
+
+        Raises `ValueError` if there is no version.
+        """
+        version = version or arxiv_id.version
+        if version < 1:
+            raise ValueError(f"{arxiv_id.id} needs a version to be resolved")
+        formats = formats_from_source_flag(source_flag)
+        cache_key = (arxiv_id.id, version, is_current, tuple(sorted(formats)))
+        cached = self.cache.get(cache_key)
+        if cached is not None and (not cached.missing or cache_key in self.checked):
+            return cached
+
+        candidates = candidate_keys(arxiv_id, version, is_current, formats)
+        found: Dict[str, FileObj] = {}
+        if cached is not None:
+            found.update(cached.found)
+            candidates = {format: keys for format, keys in candidates.items()
+                          if format in cached.missing}
+        keys = [key for keys in candidates.values() for key in keys]
+        objs = self.store.to_objs(key for key in keys if not key.endswith('/'))
+        for key in keys:
+            if key.endswith('/'):
+                objs[key] = next(iter(self.store.list(key)), FileDoesNotExist(key))
+        missing: List[str] = []
+        for format, keys in candidates.items():
+            obj = next((objs[key] for key in keys
+                        if not isinstance(objs[key], FileDoesNotExist)), None)
+            if obj is None:
+                missing.append(format)
+            else:
+                found[format] = obj
+
+        resolution = Resolution(arxiv_id.id, version, found, missing)
+        self.cache.set(cache_key, resolution)
+        if missing:
+            self.checked.set(cache_key, True)
+        return resolution
+
+    def invalidate(self, arxiv_id: Identifier) -> None:
+        """Removes all cached versions of `arxiv_id`, ex. after a new version
+        is announced."""
+        for key in self.cache.keys():
+            if key[0] == arxiv_id.id:
+                self.cache.pop(key)
+                self.checked.pop(key)
@@ -0,0 +1,276 @@
+"""Index of the members of a tar `FileObj`.
+
+`tarfile.open(...).getmember()` reads the tar from the start on every
+lookup, which for a large gzipped source tarball is a full decompression.
+A `TarIndex` is made with one pass over the tar and records where each member
+is, so a member of an uncompressed tar can be opened with a seek and a member
+of a gzipped tar with at most one partial streaming pass.
+
+Indexes are cached in memory by `TarIndexCache` and may also be saved to a
+`SidecarStore` so other processes can reuse them.
+"""
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, \
+    Literal, NamedTuple, Optional, Protocol, Tuple, Union
+
+from . import RangeRaw, version_key
+from ..util.cache import TTLCache
+
+if TYPE_CHECKING:
+    from . import FileObj
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+_DIRECT_TYPES = (tarfile.REGTYPE, tarfile.AREGTYPE, tarfile.CONTTYPE)
+"""Member types whose data is stored contiguously after the header."""
+
+
+class TarIndexEntry(NamedTuple):
+    """Location of a member in a tar."""
+
+    offset: int
+    """Offset of the header in the uncompressed tar."""
+
+    offset_data: int
+    """Offset of the data in the uncompressed tar."""
+
+    size: int
+    """Size of the data in bytes."""
+
+    type: str
+    """The `tarfile` member type, ex. `tarfile.REGTYPE` or `tarfile.DIRTYPE`."""
+
+    @property
+    def isfile(self) -> bool:
+        return self.type.encode('latin-1') in tarfile.REGULAR_TYPES
+
+
+class TarIndex:
+    """Members of a tar by name."""
+
+    def __init__(self, members: Dict[str, TarIndexEntry],
+                 compression: Literal['none', 'gz', 'other']):
+        self.members = members
+        self.compression = compression
+
+    @staticmethod
+    def build(tar: 'FileObj') -> 'TarIndex':
+        """Makes an index with one pass over `tar`.
+
+        For an uncompressed tar only the headers are read. For a gzipped tar
+        the data of members is decompressed but skipped over, it is never
+        held in memory.
+        """
+        return TarIndex._build(tar)[0]
+
+    @staticmethod
+    def _build(tar: 'FileObj') -> Tuple['TarIndex', int]:
+        members: Dict[str, TarIndexEntry] = {}
+        with tar.open('rb') as raw:
+            fh = _CountingFile(raw)
+            magic = fh.read(2)
+            fh.seek(0)
+            compression: Literal['none', 'gz', 'other'] = \
+                'gz' if magic == b'\x1f\x8b' else 'none'
+            with tarfile.open(fileobj=fh, mode='r') as tf:  # type: ignore
+                if compression == 'none' and tf.fileobj is not fh:
+                    compression = 'other'  # bz2, xz etc.
+                for info in tf:
+                    members[info.name] = TarIndexEntry(info.offset, info.offset_data,
+                                                       info.size, info.type.decode('latin-1'))
+        return TarIndex(members, compression), fh.bytes_read
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    def open_member(self, tar: 'FileObj', name: str) -> BinaryIO:
+        """Opens member `name` of `tar`, which must be what this index is of.
+
+        Raises `KeyError` if there is no member `name`.
+        """
+        entry = self.members[name]
+        if self.compression == 'other' or entry.type.encode('latin-1') not in _DIRECT_TYPES:
+            return _open_with_tarfile(tar, name)
+
+        fh = tar.open('rb')
+        try:
+            if self.compression == 'gz':
+                inner: Any = gzip.GzipFile(fileobj=fh, mode='rb')
+                inner.seek(entry.offset_data)  # decompresses up to the member
+                closing = [inner, fh]
+            else:
+                fh.seek(entry.offset_data)
+                inner, closing = fh, [fh]
+        except BaseException:
+            fh.close()
+            raise
+        return io.BufferedReader(RangeRaw(inner, entry.offset_data, entry.size, closing))
+
+    def to_json(self) -> str:
+        return json.dumps({'version': INDEX_FORMAT_VERSION,
+                           'compression': self.compression,
+                           'members': [[name, *entry] for name, entry in self.members.items()]})
+
+    @staticmethod
+    def from_json(data: Union[str, bytes]) -> 'TarIndex':
+        """Loads an index saved with `to_json()`.
+
+        Raises `ValueError` if it is not a supported version.
+        """
+        obj = json.loads(data)
+        if obj.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"unsupported tar index version {obj.get('version')}")
+        return TarIndex({m[0]: TarIndexEntry(*m[1:]) for m in obj['members']},
+                        obj['compression'])
+
+
+class _CountingFile:
+    """Wraps a file and counts the bytes read from it."""
+
+    def __init__(self, fh: Any):
+        self._fh = fh
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fh.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        return self._fh.seek(pos, whence)  # type: ignore
+
+    def tell(self) -> int:
+        return self._fh.tell()  # type: ignore
+
+    def seekable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass  # closed by the owner of the wrapped file
+
+
+def _open_with_tarfile(tar: 'FileObj', name: str) -> BinaryIO:
+    fh = tar.open('rb')
+    tf = tarfile.open(fileobj=fh, mode='r')  # type: ignore
+    ef = tf.extractfile(name)
+    if ef is None:
+        tf.close()
+        fh.close()
+        raise KeyError(name)
+    return ef  # type: ignore
+
+
+class SidecarStore(Protocol):
+    """Minimal key value store for saving tar indexes."""
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Gets the data saved at `name` or `None`."""
+        pass
+
+    def put(self, name: str, data: bytes) -> None:
+        """Saves `data` at `name`."""
+        pass
+
+
+class DirectorySidecarStore:
+    """`SidecarStore` that uses files in a directory."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, name: str) -> Optional[bytes]:
+        try:
+            return (self.directory / name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, name: str, data: bytes) -> None:
+        # a temp file per writer so concurrent puts of a name don't collide
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".tmp-{name}.")
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp, self.directory / name)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+def cache_key(tar: 'FileObj') -> str:
+    """Key for the index of `tar`, changes when its contents do."""
+    return hashlib.sha256(version_key(tar).encode('utf-8')).hexdigest()
+
+
+class TarIndexCache:
+    """Gets `TarIndex`es from memory, then the sidecar store, then by building.
+
+    Indexes are keyed by name, etag, size and updated of the tar. The number
+    of builds and the bytes of tars read to build them are in `stats()`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 24 * 60 * 60,
+                 sidecar: Optional[SidecarStore] = None):
+        self.memory: TTLCache[str, TarIndex] = TTLCache(maxsize, ttl)
+        self.sidecar = sidecar
+        self.builds = 0
+        self.sidecar_hits = 0
+        self.bytes_read = 0
+
+    def get(self, tar: 'FileObj') -> TarIndex:
+        return self.get_counted(tar)[0]
+
+    def get_counted(self, tar: 'FileObj') -> Tuple[TarIndex, int]:
+        """Gets the index of `tar` and the bytes of `tar` read to get it,
+        which is 0 unless it had to be built."""
+        key = cache_key(tar)
+        index = self.memory.get(key)
+        if index is not None:
+            return index, 0
+
+        bytes_read = 0
+        if self.sidecar is not None:
+            data = self.sidecar.get(f"{key}.tarindex.json")
+            if data is not None:
+                try:
+                    index = TarIndex.from_json(data)
+                    self.sidecar_hits += 1
+                except ValueError:
+                    logger.warning("ignoring bad tar index sidecar for %s", tar.name)
+        if index is None:
+            index, bytes_read = TarIndex._build(tar)
+            self.builds += 1
+            self.bytes_read += bytes_read
+            if self.sidecar is not None:
+                try:
+                    self.sidecar.put(f"{key}.tarindex.json", index.to_json().encode('utf-8'))
+                except Exception:
+                    logger.warning("could not save tar index sidecar for %s", tar.name,
+                                   exc_info=True)
+
+        self.memory.set(key, index)
+        return index, bytes_read
+
+    def stats(self) -> Dict[str, int]:
+        """Builds, sidecar hits, bytes read and the memory cache counts."""
+        return {'builds': self.builds,
+                'sidecar_hits': self.sidecar_hits,
+                'bytes_read': self.bytes_read,
+                **self.memory.stats()}
+
+
+default_tar_index_cache = TarIndexCache()
+"""Cache used by `FileFromTar` when it is not given one."""
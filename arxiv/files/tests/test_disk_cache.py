@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from arxiv.files import FileDoesNotExist, MockStringFileObj
+from arxiv.files.object_store import LocalObjectStore, ObjectStore
+from arxiv.files.disk_cache import DiskCachingObjectStore
+
+
+class SlowMockStore(ObjectStore):
+    """Store of `MockStringFileObj` that counts and slows down opens."""
+
+    def __init__(self, data):
+        self.data = data
+        self.opens = 0
+        self.lock = threading.Lock()
+
+    def to_obj(self, key):
+        if key not in self.data:
+            return FileDoesNotExist(key)
+        store = self
+
+        class Slow(MockStringFileObj):
+            def open(self, mode):
+                with store.lock:
+                    store.opens += 1
+                time.sleep(0.05)
+                return super().open(mode)
+
+        return Slow(key, self.data[key])
+
+    def list(self, prefix):
+        return []
+
+    def status(self):
+        return ("GOOD", "")
+
+
+def test_disk_cache(tmp_path):
+    src = tmp_path / 'src'
+    (src / 'ftp').mkdir(parents=True)
+    (src / 'ftp' / 'a.abs').write_text('abs file')
+    store = DiskCachingObjectStore(LocalObjectStore(str(src)), tmp_path / 'cache')
+
+    obj = store.to_obj('ftp/a.abs')
+    assert obj.size == 8
+    with obj.open('rb') as fh:
+        assert fh.read() == b'abs file'
+    with store.to_obj('ftp/a.abs').open('r', encoding='latin-1') as fh:
+        assert fh.read() == 'abs file'
+    assert store.stats()['misses'] == 1 and store.stats()['hits'] == 1
+    assert isinstance(store.to_obj('ftp/nope'), FileDoesNotExist)
+
+    # survives restart
+    again = DiskCachingObjectStore(LocalObjectStore(str(src)), tmp_path / 'cache')
+    assert again.stats()['files'] == 1 and again.stats()['bytes'] == 8
+
+
+def test_eviction(tmp_path):
+    inner = SlowMockStore({'a': 'a' * 40, 'b': 'b' * 40, 'c': 'c' * 40, 'big': 'x' * 200})
+    store = DiskCachingObjectStore(inner, tmp_path, max_bytes=100)
+    for key in ['a', 'b', 'a', 'c']:
+        with store.to_obj(key).open('rb') as fh:
+            assert fh.read() == key.encode() * 40
+    stats = store.stats()
+    assert stats['evictions'] == 1 and stats['bytes'] == 80
+    with store.to_obj('big').open('rb') as fh:
+        assert len(fh.read()) == 200
+    assert store.stats()['files'] == 2
+    store.to_obj('a').open('rb').close()
+    assert store.stats()['hits'] == 2, "a should have been kept as recently used"
+
+
+def test_single_flight(tmp_path):
+    inner = SlowMockStore({'a': 'data'})
+    store = DiskCachingObjectStore(inner, tmp_path)
+
+    def read(_):
+        with store.to_obj('a').open('rb') as fh:
+            return fh.read()
+
+    with ThreadPoolExecutor(8) as pool:
+        assert set(pool.map(read, range(16))) == {b'data'}
+    assert inner.opens == 1
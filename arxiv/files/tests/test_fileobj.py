@@ -1,11 +1,21 @@
+import gzip
+import io
+import os
+import time
+
+import pytest
 from hypothesis import given
-from hypothesis.strategies import text, binary
+from hypothesis.strategies import text, binary, integers
 
 from arxiv.files import (
     BinaryMinimalFile,
+    BinaryMinimalFileTransformed,
+    DEFAULT_IO_SIZE,
     FileDoesNotExist,
     MockStringFileObj,
     FileTransform,
+    LocalFileObj,
+    UngzippedFileObj,
 )
 
 class BinaryMinimalFileExample(BinaryMinimalFile):
@@ -69,3 +79,151 @@ def test_filetransform_fakeurls(data: str) -> None:
     transformed_data = new_file.open('rb').read()
     assert transformed_data == expected
 
+
+
+def _gzipped(tmp_path, data: bytes) -> LocalFileObj:
+    path = tmp_path / "file.txt.gz"
+    path.write_bytes(gzip.compress(data))
+    return LocalFileObj(path)
+
+
+@pytest.mark.parametrize("strategy", ["trailer", "stream"])
+def test_ungzipped_size(tmp_path, strategy) -> None:
+    data = b"arXiv " * 100_000
+    ungz = UngzippedFileObj(_gzipped(tmp_path, data), size_strategy=strategy)
+    assert ungz.size == len(data)
+    assert ungz.name.endswith("file.txt")
+
+
+def test_ungzipped_size_cached_by_version(tmp_path, mocker) -> None:
+    gz = _gzipped(tmp_path, b"a" * 1000)
+    assert UngzippedFileObj(gz).size == 1000
+    spy = mocker.spy(UngzippedFileObj, "_trailer_size")
+    assert UngzippedFileObj(LocalFileObj(gz.item)).size == 1000
+    assert spy.call_count == 0
+
+    # new contents, with a different mtime, are not served from the cache
+    gz.item.write_bytes(gzip.compress(b"b" * 2000))
+    os.utime(gz.item, (0, 0))
+    assert UngzippedFileObj(LocalFileObj(gz.item)).size == 2000
+    assert spy.call_count == 1
+
+
+@pytest.mark.parametrize("members", [
+    [b"arXiv " * 100_000, b"end\n"],
+    [b"", b""],
+    [os.urandom(50_000)],
+])
+def test_ungzipped_size_falls_back_to_stream(tmp_path, mocker, members) -> None:
+    path = tmp_path / "members.gz"
+    path.write_bytes(b"".join(gzip.compress(member) for member in members))
+    spy = mocker.spy(UngzippedFileObj, "_streamed_size")
+    assert UngzippedFileObj(LocalFileObj(path)).size == sum(map(len, members))
+    assert spy.call_count == 1
+
+
+def test_ungzipped_size_extra_field(tmp_path) -> None:
+    member = bytearray(gzip.compress(b"x" * 1000))
+    member[3] |= 0x04
+    member[10:10] = b"\x02\x00ab"
+    path = tmp_path / "extra.gz"
+    path.write_bytes(bytes(member) * 3)
+    assert UngzippedFileObj(LocalFileObj(path)).size == 3000
+
+
+def _lines(data: str) -> MockStringFileObj:
+    return MockStringFileObj("no_name.data", data=data)
+
+
+@given(text(), integers(min_value=1, max_value=50))
+def test_transformed_read_sizes(data: str, size: int) -> None:
+    expected = data.encode("utf-8").upper()
+    with FileTransform(_lines(data), bytes.upper).open('rb') as fh:
+        chunks = []
+        while chunk := fh.read(size):
+            assert len(chunk) <= size
+            chunks.append(chunk)
+    assert b"".join(chunks) == expected
+
+
+@given(text())
+def test_transformed_readline(data: str) -> None:
+    expected = [line + b"\n" for line in data.encode("utf-8").upper().split(b"\n")]
+    expected[-1] = expected[-1][:-1]
+    expected = [line for line in expected if line]
+    with FileTransform(_lines(data), bytes.upper).open('rb') as fh:
+        assert list(fh) == expected
+
+
+def test_transformed_readline_size_and_readinto() -> None:
+    fh = FileTransform(_lines("abcdef\nxyz\n"), bytes.upper).open('rb')
+    assert fh.readline(4) == b"ABCD"
+    assert fh.readline() == b"EF\n"
+    buffer = bytearray(10)
+    assert fh.readinto(buffer) == 4  # type: ignore
+    assert buffer[:4] == b"XYZ\n"
+    assert fh.read() == b""
+
+
+def test_transformed_empty_lines() -> None:
+    def drop_b(data: bytes) -> bytes:
+        return b"" if data.startswith(b"b") else data
+
+    with FileTransform(_lines("a\nb\nc\n"), drop_b).open('rb') as fh:
+        assert list(fh) == [b"a\n", b"", b"c\n"]
+    with FileTransform(_lines("a\nb\nc\n"), drop_b).open('rb') as fh:
+        assert [fh.readline(), fh.readline(), fh.readline()] == [b"a\n", b"c\n", b""]
+    with FileTransform(_lines("abc\nb\nc\n"), drop_b).open('rb') as fh:
+        assert fh.read(2) == b"ab"
+        assert list(fh) == [b"c\n", b"", b"c\n"]
+
+
+def test_chained_transforms() -> None:
+    def drop_b(data: bytes) -> bytes:
+        return data.replace(b"b", b"")
+
+    fh = FileTransform(_lines("abc\nbbb\ncba\n"), [drop_b, bytes.upper]).open('rb')
+    assert fh.read() == b"AC\n\nCA\n"
+
+
+class _QuadraticTransformed:
+    """How `BinaryMinimalFileTransformed.read` worked before, to compare."""
+
+    def __init__(self, inner_io, transform):
+        self.io, self.transform, self.buffer = inner_io, transform, b""
+
+    def read(self, size):
+        while True:
+            data = self.io.readline(size)
+            self.buffer = self.buffer + self.transform(data)
+            if not data or len(self.buffer) >= size:
+                break
+        to_return, self.buffer = self.buffer[:size], self.buffer[size:]
+        return to_return
+
+
+@pytest.mark.benchmark
+def test_benchmark_transformed() -> None:
+    """Throughput reading ARXIV_BENCHMARK_MB with `DEFAULT_IO_SIZE` reads.
+
+    The previous implementation is only run on 2MB with 256KB reads since it
+    is quadratic in the read size.
+    """
+    line = b"see https://arxiv.org/abs/2301.00001 and hep-th/9901001\n"
+
+    def rate(cls, mb: int, read_size: int) -> float:
+        data = line * (mb * 1024 * 1024 // len(line))
+        fh = cls(io.BytesIO(data), bytes.upper)
+        start = time.perf_counter()
+        n = 0
+        while chunk := fh.read(read_size):
+            n += len(chunk)
+        assert n == len(data)
+        return n / (1024 * 1024) / (time.perf_counter() - start)
+
+    size = int(os.environ.get('ARXIV_BENCHMARK_MB', 256))
+    new = rate(BinaryMinimalFileTransformed, size, DEFAULT_IO_SIZE)
+    new_small = rate(BinaryMinimalFileTransformed, 2, 256 * 1024)
+    old_small = rate(_QuadraticTransformed, 2, 256 * 1024)
+    print(f"\nBinaryMinimalFileTransformed: {new:.0f}MB/s on {size}MB, "
+          f"on 2MB {new_small:.0f}MB/s vs previous {old_small:.0f}MB/s")
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from arxiv.files import FileDoesNotExist, LocalFileObj
+from arxiv.files.instrumented import CallbackSink, Histogram, InstrumentedObjectStore, \
+    MetricsRegistry, MultiSink, key_prefix
+from arxiv.files.object_store import LocalObjectStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    for key in ['ps_cache/arxiv/pdf/2401/2401.00001v1.pdf', 'ftp/arxiv/papers/2401/2401.00001.abs']:
+        path = tmp_path / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'line\n' * 100)
+    return LocalObjectStore(str(tmp_path))
+
+
+def test_key_prefix():
+    assert key_prefix('ps_cache/arxiv/pdf/2401/x.pdf') == 'ps_cache/'
+    assert key_prefix('orig/arxiv/papers/2401/x.abs') == 'orig/'
+    assert key_prefix('data/x') == 'other'
+
+
+def test_histogram():
+    hist = Histogram([0.1, 1.0])
+    for value in [0.05, 0.1, 0.5, 5]:
+        hist.observe(value)
+    assert hist.cumulative() == [(0.1, 2), (1.0, 3), (float('inf'), 4)]
+    assert hist.count == 4 and hist.sum == pytest.approx(5.65)
+
+
+def test_instrumented(store):
+    registry = MetricsRegistry()
+    observed = []
+    instrumented = InstrumentedObjectStore(store, MultiSink(registry, CallbackSink(observed.append)))
+
+    obj = instrumented.to_obj('ps_cache/arxiv/pdf/2401/2401.00001v1.pdf')
+    with obj.open('rb') as fh:
+        assert fh.read(5) == b'line\n'
+        assert len(list(fh)) == 99
+    with obj.open_range(10, 20) as fh:
+        assert fh.read() == (b'line\n' * 4)[10:20]
+    assert isinstance(instrumented.to_obj('ftp/nope.abs'), FileDoesNotExist)
+    assert len(list(instrumented.list('ftp/arxiv/papers/2401/'))) == 1
+    objs = instrumented.to_objs(['ftp/arxiv/papers/2401/2401.00001.abs'])
+    assert objs['ftp/arxiv/papers/2401/2401.00001.abs'].size == 500
+
+    ops = [(o.op, o.prefix) for o in observed]
+    assert ops.count(('open', 'ps_cache/')) == 2
+    assert ops.count(('first_byte', 'ps_cache/')) == 2
+    assert ('to_obj', 'ftp/') in ops and ('list', 'ftp/') in ops and ('to_objs', 'ftp/') in ops
+    assert registry.bytes_read == {'ps_cache/': 510}
+
+    text = registry.prometheus_text()
+    assert 'arxiv_object_store_seconds_count{op="read",prefix="ps_cache/"} 2' in text
+    assert 'arxiv_object_store_seconds_bucket{op="to_obj",prefix="ftp/",le="+Inf"} 1' in text
+    assert 'arxiv_object_store_read_bytes_total{prefix="ps_cache/"} 510' in text
+
+
+def test_instrumented_mixed_batch(store):
+    observed = []
+    instrumented = InstrumentedObjectStore(store, CallbackSink(observed.append))
+    keys = ['ftp/arxiv/papers/2401/2401.00001.abs', 'ps_cache/arxiv/pdf/2401/2401.00001v1.pdf',
+            'orig/arxiv/papers/2401/2401.00001v1.abs', 'ftp/arxiv/papers/2401/2401.00002.abs']
+    objs = instrumented.to_objs(keys)
+    assert set(objs) == set(keys)
+    assert objs['ps_cache/arxiv/pdf/2401/2401.00001v1.pdf'].size == 500
+    assert isinstance(objs['orig/arxiv/papers/2401/2401.00001v1.abs'], FileDoesNotExist)
+    assert sorted((o.op, o.prefix) for o in observed) == \
+        [('to_objs', 'ftp/'), ('to_objs', 'orig/'), ('to_objs', 'ps_cache/')]
+
+
+def test_instrumented_errors(store):
+    registry = MetricsRegistry()
+    instrumented = InstrumentedObjectStore(store, registry)
+    obj = instrumented.to_obj('ftp/arxiv/papers/2401/2401.00001.abs')
+    obj.fileobj.item.unlink()
+    with pytest.raises(FileNotFoundError):
+        obj.open('rb')
+    assert registry.errors == {('open', 'ftp/'): 1}
+    assert 'arxiv_object_store_errors_total{op="open",prefix="ftp/"} 1' in registry.prometheus_text()
+
+
+def test_disabled(store):
+    instrumented = InstrumentedObjectStore(store, None)
+    assert isinstance(instrumented.to_obj('ftp/arxiv/papers/2401/2401.00001.abs'), LocalFileObj)
+
+
+@pytest.mark.benchmark
+def test_benchmark_disabled_overhead():
+    """Per call cost of a disabled `InstrumentedObjectStore.to_obj()`."""
+    class NullStore(LocalObjectStore):
+        def to_obj(self, key):
+            return None
+
+    inner = NullStore('/')
+    instrumented = InstrumentedObjectStore(inner, None)
+    n = 1_000_000
+    start = time.perf_counter()
+    for _ in range(n):
+        inner.to_obj('ftp/x')
+    base = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(n):
+        instrumented.to_obj('ftp/x')
+    wrapped = time.perf_counter() - start
+    overhead = (wrapped - base) / n * 1e6
+    print(f"\ndisabled overhead {overhead:.3f}us per to_obj")
+    assert overhead < 1.0
@@ -0,0 +1,74 @@
+from arxiv.files.fake_store import InMemoryObjectStore
+from arxiv.files.listing_cache import ListingCachingObjectStore
+from arxiv.files.object_store import LocalObjectStore
+
+KEYS = [f'orig/arxiv/papers/2401/2401.{n:05}v{v}.abs' for n in range(1, 50) for v in (1, 2)]
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_listing_cache():
+    inner = InMemoryObjectStore({key: b'abs' for key in KEYS})
+    timer = FakeTimer()
+    store = ListingCachingObjectStore(inner, ttl=60, timer=timer)
+    prefix = 'orig/arxiv/papers/2401/2401.00001v'
+    names = [obj.name for obj in store.list(prefix)]
+    assert names == KEYS[:2]
+    assert [obj.name for obj in store.list(prefix)] == names
+    assert inner.requests == 1
+
+    inner.put(prefix + '3.abs', b'abs')
+    assert len(list(store.list(prefix))) == 2
+    timer.now = 61
+    assert len(list(store.list(prefix))) == 3
+    assert inner.requests == 2
+
+
+def test_listing_cache_prefetch():
+    inner = InMemoryObjectStore({key: b'abs' for key in KEYS})
+    inner.put('orig/arxiv/papers/2401/sub/2401.00001v9.abs', b'not under the prefix')
+    store = ListingCachingObjectStore(inner, prefetch=True)
+    for n in range(1, 50):
+        listed = [obj.name for obj in store.list(f'orig/arxiv/papers/2401/2401.{n:05}v')]
+        assert listed == [f'orig/arxiv/papers/2401/2401.{n:05}v1.abs',
+                          f'orig/arxiv/papers/2401/2401.{n:05}v2.abs']
+    assert list(store.list('orig/arxiv/papers/2401/2401.99999v')) == []
+    assert inner.requests == 1
+    assert store.stats()['directories']['hits'] == 49
+
+    inner.put('orig/arxiv/papers/2401/2401.00001v3.abs', b'abs')
+    store.invalidate('orig/arxiv/papers/2401/2401.00001v')
+    assert len(list(store.list('orig/arxiv/papers/2401/2401.00001v'))) == 3
+    assert inner.requests == 2
+
+
+def test_listing_cache_prefetch_nested():
+    keys = KEYS + [f'ps_cache/arxiv/html/2401/2401.{n:05}v1/{name}'
+                   for n in range(1, 5) for name in ('index.html', 'img/fig1.png')]
+    keys += ['ps_cache/arxiv/html/2401/2401.00001v1.tar', 'ps_cache/arxiv/html/2401.00001v1']
+    inner = InMemoryObjectStore({key: b'x' for key in keys})
+    plain = ListingCachingObjectStore(inner)
+    prefetched = ListingCachingObjectStore(inner, prefetch=True)
+    for prefix in ['orig/arxiv/papers/2401/2401.00001v', 'orig/arxiv/papers/2401/2401.0000',
+                   'ps_cache/arxiv/html/2401/2401.00001v', 'ps_cache/arxiv/html/2401/2401.00001v1/',
+                   'ps_cache/arxiv/html/2401/2401.00002v1/img/', 'ps_cache/arxiv/html/2401/24']:
+        listed = [obj.name for obj in prefetched.list(prefix)]
+        assert listed == [obj.name for obj in plain.list(prefix)]
+        assert listed == sorted(key for key in keys if key.startswith(prefix))
+    assert len(list(prefetched.list('ps_cache/arxiv/html/2401/2401.00001v1/'))) == 2
+
+
+def test_listing_cache_prefetch_local(tmp_path):
+    papers = tmp_path / 'orig/arxiv/papers/2401'
+    papers.mkdir(parents=True)
+    for name in ['2401.00001v1.abs', '2401.00001v2.abs', '2401.00002v1.abs']:
+        (papers / name).write_text('abs')
+    store = ListingCachingObjectStore(LocalObjectStore(str(tmp_path)), prefetch=True)
+    assert [obj.name for obj in store.list('orig/arxiv/papers/2401/2401.00001v')] == \
+        ['2401.00001v1.abs', '2401.00001v2.abs']
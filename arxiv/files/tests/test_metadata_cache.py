@@ -0,0 +1,60 @@
+from arxiv.files import FileDoesNotExist
+from arxiv.files.object_store import LocalObjectStore
+from arxiv.files.metadata_cache import MetadataCachingObjectStore
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingStore(LocalObjectStore):
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.calls = 0
+
+    def to_obj(self, key):
+        self.calls += 1
+        return super().to_obj(key)
+
+
+def test_metadata_cache(tmp_path):
+    (tmp_path / 'ftp').mkdir()
+    (tmp_path / 'ftp' / 'a.abs').write_text('abs')
+    inner = CountingStore(str(tmp_path))
+    timer = FakeTimer()
+    store = MetadataCachingObjectStore(inner, ttl=60, negative_ttl=5, timer=timer)
+
+    first = store.to_obj('ftp/a.abs')
+    assert first.exists() and first.size == 3
+    assert store.to_obj('ftp/a.abs') is first
+    assert isinstance(store.to_obj('ftp/b.abs'), FileDoesNotExist)
+    assert isinstance(store.to_obj('ftp/b.abs'), FileDoesNotExist)
+    assert inner.calls == 2
+
+    (tmp_path / 'ftp' / 'b.abs').write_text('new')
+    timer.now = 10  # negative expired, positive not
+    assert store.to_obj('ftp/b.abs').exists()
+    assert store.to_obj('ftp/a.abs') is first
+    assert inner.calls == 3
+
+    stats = store.stats()
+    assert stats['positive']['hits'] == 2
+    assert stats['negative']['hits'] == 1
+    assert stats['negative']['expirations'] == 1
+
+    store.invalidate('ftp/a.abs')
+    assert store.to_obj('ftp/a.abs') is not first
+    assert inner.calls == 4
+
+
+def test_metadata_cache_eviction(tmp_path):
+    inner = CountingStore(str(tmp_path))
+    store = MetadataCachingObjectStore(inner, negative_maxsize=2)
+    for key in ['a', 'b', 'c', 'a']:
+        store.to_obj(key)
+    assert inner.calls == 4
+    assert store.stats()['negative']['evictions'] == 2
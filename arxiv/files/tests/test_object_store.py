@@ -0,0 +1,111 @@
+import random
+import time
+
+import pytest
+from google.api_core.exceptions import ServiceUnavailable, TooManyRequests
+
+from arxiv.files import FileDoesNotExist
+from arxiv.files.object_store import LocalObjectStore, ObjectStore
+from arxiv.files.fake_store import Behavior, InMemoryObjectStore, LatencyObjectStore, \
+    constant, lognormal, uniform
+from arxiv.files.metadata_cache import MetadataCachingObjectStore
+
+KEYS = [f'ftp/arxiv/papers/2401/2401.0000{n}.abs' for n in range(8)]
+
+
+def _store(tmp_path) -> LocalObjectStore:
+    (tmp_path / 'ftp/arxiv/papers/2401').mkdir(parents=True)
+    for key in KEYS[::2]:
+        (tmp_path / key).write_text('abs')
+    return LocalObjectStore(str(tmp_path))
+
+
+def test_to_objs(tmp_path):
+    store = _store(tmp_path)
+    objs = store.to_objs(KEYS)
+    assert list(objs) == KEYS
+    assert [not isinstance(obj, FileDoesNotExist) for obj in objs.values()] == [True, False] * 4
+    assert store.exists_many(KEYS) == {key: n % 2 == 0 for n, key in enumerate(KEYS)}
+
+
+def test_to_objs_concurrent(tmp_path):
+    store = LatencyObjectStore(_store(tmp_path), latency=0.05, max_workers=8)
+    start = time.perf_counter()
+    serial = ObjectStore.to_objs(store, KEYS)
+    serial_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = store.to_objs(KEYS)
+    concurrent_secs = time.perf_counter() - start
+
+    assert list(concurrent) == list(serial) == KEYS
+    assert store.exists_many(KEYS) == {key: n % 2 == 0 for n, key in enumerate(KEYS)}
+    assert concurrent_secs < serial_secs / 2
+
+
+def test_to_objs_metadata_cache(tmp_path):
+    inner = LatencyObjectStore(_store(tmp_path), latency=0)
+    store = MetadataCachingObjectStore(inner)
+    store.to_obj(KEYS[0])
+    store.to_obj(KEYS[1])
+    assert inner.requests == 2
+    assert store.exists_many(KEYS) == {key: n % 2 == 0 for n, key in enumerate(KEYS)}
+    assert inner.requests == 8
+    store.to_objs(KEYS)
+    assert inner.requests == 8
+
+
+def test_gs_to_objs():
+    from unittest.mock import MagicMock
+    from arxiv.files.object_store import GsObjectStore
+
+    bucket = MagicMock()
+    bucket.name = 'bucket'
+    bucket.get_blob.side_effect = lambda key, retry: key if key.endswith('1') else None
+    store = GsObjectStore(bucket, max_workers=4)
+    objs = store.to_objs(['a1', 'b2', 'a1', 'c1'])
+    assert list(objs) == ['a1', 'b2', 'c1']
+    assert objs['a1'] == 'a1' and isinstance(objs['b2'], FileDoesNotExist)
+    assert bucket.get_blob.call_count == 3
+
+
+def test_in_memory_store():
+    store = InMemoryObjectStore({key: b'abs' for key in KEYS[::2]})
+    objs = store.to_objs(KEYS)
+    assert [not isinstance(obj, FileDoesNotExist) for obj in objs.values()] == [True, False] * 4
+    obj = store.to_obj(KEYS[0])
+    assert obj.exists() and obj.size == 3 and obj.etag
+    assert obj.open('rb').read() == b'abs'
+    with obj.open('r') as fh:
+        assert fh.read() == 'abs'
+    assert [o.name for o in store.list('ftp/arxiv/papers/2401/2401.0000')] == KEYS[::2]
+    assert store.requests == 8 + 4
+    store.delete(KEYS[0])
+    assert not obj.exists()
+
+
+def test_in_memory_store_behaviors():
+    store = InMemoryObjectStore({'ps_cache/a.pdf': b'pdf', 'ftp/a.abs': b'abs'},
+                                behaviors={'ps_cache/': Behavior(error_rate=1.0),
+                                           'ftp/': Behavior(max_rate=0.001, burst=2),
+                                           'ftp/slow/': Behavior(latency=constant(0.05))},
+                                seed=1)
+    with pytest.raises(ServiceUnavailable):
+        store.to_obj('ps_cache/a.pdf')
+    assert store.to_obj('ftp/a.abs').exists()
+    store.to_obj('ftp/b.abs')
+    with pytest.raises(TooManyRequests):
+        store.to_obj('ftp/a.abs')
+    assert (store.errors, store.throttled) == (1, 1)
+
+    start = time.perf_counter()
+    store.to_obj('ftp/slow/x')  # longest prefix so not throttled
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_latency_distributions():
+    rng = random.Random(0)
+    assert constant(0.1)(rng) == 0.1
+    assert all(0.1 <= uniform(0.1, 0.2)(rng) <= 0.2 for _ in range(100))
+    samples = sorted(lognormal(0.02)(rng) for _ in range(1001))
+    assert 0.015 < samples[500] < 0.025
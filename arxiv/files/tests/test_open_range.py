@@ -0,0 +1,94 @@
+import gzip
+import io
+import tarfile
+from unittest.mock import MagicMock
+
+import pytest
+from google.cloud.storage.blob import Blob
+
+from arxiv.files import FileFromTar, FileTransform, LocalFileObj, UngzippedFileObj
+from arxiv.files.object_store import open_range
+from arxiv.files.tar_index import TarIndexCache
+
+DATA = bytes(range(256)) * 1000
+
+RANGES = [(0, 10), (100, 356), (255_990, None), (1000, 1000), (255_000, 300_000), (300_000, None)]
+
+
+@pytest.fixture
+def local(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(DATA)
+    return LocalFileObj(path)
+
+
+@pytest.fixture
+def ungzipped(tmp_path):
+    path = tmp_path / "file.bin.gz"
+    path.write_bytes(gzip.compress(DATA))
+    return UngzippedFileObj(LocalFileObj(path))
+
+
+def _from_tar(path, compression):
+    with tarfile.open(path, f'w:{compression}') as tf:
+        info = tarfile.TarInfo('file.bin')
+        info.size = len(DATA)
+        tf.addfile(info, io.BytesIO(DATA))
+    return FileFromTar(LocalFileObj(path), 'file.bin', TarIndexCache())
+
+
+@pytest.fixture
+def from_tar(tmp_path):
+    return _from_tar(tmp_path / 'src.tar', '')
+
+
+@pytest.fixture
+def from_tar_gz(tmp_path):
+    return _from_tar(tmp_path / 'src.tar.gz', 'gz')
+
+
+@pytest.mark.parametrize("start,end", RANGES)
+@pytest.mark.parametrize("fixture", ["local", "ungzipped", "from_tar", "from_tar_gz"])
+def test_open_range(request, fixture, start, end):
+    fileobj = request.getfixturevalue(fixture)
+    with open_range(fileobj, start, end) as fh:
+        assert fh.read() == DATA[start:end]
+
+
+def test_open_range_read_and_seek(local):
+    with local.open_range(10, 20) as fh:
+        assert fh.read(4) == DATA[10:14]
+        assert fh.seek(0, io.SEEK_END) == 10
+        assert fh.read() == b""
+        fh.seek(2)
+        assert fh.read() == DATA[12:20]
+
+
+def test_open_range_transform(local):
+    with FileTransform(local, bytes.upper).open_range(100, 200) as fh:
+        assert fh.read() == DATA.upper()[100:200]
+
+
+def test_open_range_bad(local):
+    with pytest.raises(ValueError):
+        local.open_range(-1, 10)
+    with pytest.raises(ValueError):
+        local.open_range(10, 5)
+
+
+def test_open_range_blob():
+    blob = Blob("file.bin", bucket=MagicMock())
+    blob._properties['size'] = str(len(DATA))
+    requested = []
+
+    def download_as_bytes(start=0, end=None, **kwargs):
+        requested.append((start, end))
+        if start >= len(DATA):
+            return b""
+        return DATA[start:None if end is None else end + 1]
+
+    blob.download_as_bytes = download_as_bytes  # type: ignore
+    with open_range(blob, 1000, 5000) as fh:
+        assert fh.read() == DATA[1000:5000]
+    assert requested[0][0] == 1000
+    assert all(end is not None and end - start <= 4000 for start, end in requested)
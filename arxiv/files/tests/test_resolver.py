@@ -0,0 +1,116 @@
+import pytest
+
+from arxiv.files.fake_store import InMemoryObjectStore
+from arxiv.files.object_store import LocalObjectStore
+from arxiv.files.resolver import DisseminationResolver, candidate_keys
+from arxiv.identifier import Identifier
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingStore(LocalObjectStore):
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.keys = []
+
+    def to_obj(self, key):
+        self.keys.append(key)
+        return super().to_obj(key)
+
+
+def _touch(root, key):
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('x')
+
+
+def test_candidate_keys():
+    keys = candidate_keys(Identifier('hep-th/9901001'), 2, False, ['pdf', 'ps', 'src', 'other'])
+    assert keys['abs'] == ['orig/hep-th/papers/9901/9901001v2.abs']
+    assert keys['pdf'] == ['ps_cache/hep-th/pdf/9901/9901001v2.pdf',
+                           'orig/hep-th/papers/9901/9901001v2.pdf']
+    assert 'orig/hep-th/papers/9901/9901001v2.tar.gz' in keys['src']
+    assert 'html' not in keys and 'other' not in keys
+
+    keys = candidate_keys(Identifier('2401.00001'), 1, True, ['html'])
+    assert keys == {'abs': ['ftp/arxiv/papers/2401/2401.00001.abs'],
+                    'html': ['ps_cache/arxiv/html/2401/2401.00001v1/']}
+
+
+def test_resolve(tmp_path):
+    _touch(tmp_path, 'ftp/arxiv/papers/2401/2401.00001.abs')
+    _touch(tmp_path, 'ftp/arxiv/papers/2401/2401.00001.tar.gz')
+    _touch(tmp_path, 'ps_cache/arxiv/pdf/2401/2401.00001v3.pdf')
+    store = CountingStore(str(tmp_path))
+    timer = FakeTimer()
+    resolver = DisseminationResolver(store, ttl=300, negative_ttl=30, timer=timer)
+    arxiv_id = Identifier('2401.00001v3')
+
+    res = resolver.resolve(arxiv_id, '')
+    assert res.get('pdf').item.name == '2401.00001v3.pdf'
+    assert res.get('src').item.name == '2401.00001.tar.gz'
+    assert res.get('abs') is not None
+    assert res.missing == ['ps']
+    probes = len(store.keys)
+
+    assert resolver.resolve(arxiv_id, '') is res
+    assert len(store.keys) == probes
+
+    _touch(tmp_path, 'ps_cache/arxiv/ps/2401/2401.00001v3.ps')
+    timer.now = 31  # only the missing ps is checked again
+    res = resolver.resolve(arxiv_id, '')
+    assert res.missing == [] and res.get('ps') is not None
+    assert store.keys[probes:] == ['ps_cache/arxiv/ps/2401/2401.00001v3.ps',
+                                   'ftp/arxiv/papers/2401/2401.00001.ps']
+
+    resolver.invalidate(arxiv_id)
+    resolver.resolve(arxiv_id, '')
+    assert len(store.keys) > probes + 2
+
+
+def test_resolve_by_source_flag(tmp_path):
+    _touch(tmp_path, 'ftp/arxiv/papers/2401/2401.00002.abs')
+    _touch(tmp_path, 'ps_cache/arxiv/pdf/2401/2401.00002v1.pdf')
+    _touch(tmp_path, 'ps_cache/arxiv/html/2401/2401.00002v1/index.html')
+    resolver = DisseminationResolver(CountingStore(str(tmp_path)), timer=FakeTimer())
+    arxiv_id = Identifier('2401.00002v1')
+
+    html = resolver.resolve(arxiv_id, 'H')
+    assert set(html.found) == {'abs', 'html'} and html.missing == []
+    tex = resolver.resolve(arxiv_id, '')
+    assert tex.get('pdf') is not None and tex.get('html') is None
+    assert resolver.resolve(arxiv_id, 'H') is html
+    assert resolver.resolve(arxiv_id, 'S') is tex
+
+    resolver.invalidate(arxiv_id)
+    assert resolver.resolve(arxiv_id, 'H') is not html
+
+
+def test_resolve_html_without_directory_objects():
+    store = InMemoryObjectStore({
+        'ftp/arxiv/papers/2401/2401.00003.abs': b'abs',
+        'ps_cache/arxiv/html/2401/2401.00003v1/2401.00003v1.html': b'html',
+        'ps_cache/arxiv/html/2401/2401.00003v1/x1.png': b'png'})
+    timer = FakeTimer()
+    resolver = DisseminationResolver(store, timer=timer)
+    res = resolver.resolve(Identifier('2401.00003v1'), 'H')
+    assert res.missing == []
+    assert res.get('html').name == 'ps_cache/arxiv/html/2401/2401.00003v1/2401.00003v1.html'
+
+    res = resolver.resolve(Identifier('2401.00004v1'), 'H')
+    assert res.missing == ['abs', 'html']
+    requests = store.requests
+    timer.now = 31
+    resolver.resolve(Identifier('2401.00004v1'), 'H')
+    assert store.requests == requests + 2
+
+
+def test_resolve_needs_version(tmp_path):
+    with pytest.raises(ValueError):
+        DisseminationResolver(LocalObjectStore(str(tmp_path))).resolve(Identifier('2401.00001'), '')
@@ -0,0 +1,138 @@
+import io
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from arxiv.files import FileFromTar, FileNotFound, LocalFileObj
+from arxiv.files.tar_index import DirectorySidecarStore, TarIndex, TarIndexCache
+from arxiv.formats import list_ancillary_files
+
+MEMBERS = {'main.tex': b'\\documentclass{article}\n' * 100,
+           'anc/data.csv': b'a,b\n1,2\n',
+           'anc/big.bin': bytes(range(256)) * 400}
+
+
+@pytest.fixture(params=['', 'gz'])
+def tar_path(tmp_path, request):
+    path = tmp_path / f'2401.00001.tar{"." + request.param if request.param else ""}'
+    with tarfile.open(path, f'w:{request.param}') as tf:
+        dir_info = tarfile.TarInfo('anc')
+        dir_info.type = tarfile.DIRTYPE
+        tf.addfile(dir_info)
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_index(tar_path):
+    index = TarIndex.build(LocalFileObj(tar_path))
+    assert index.compression == ('gz' if tar_path.suffix == '.gz' else 'none')
+    assert set(index.members) == {'anc', *MEMBERS}
+    assert index.members['anc/big.bin'].size == len(MEMBERS['anc/big.bin'])
+    assert not index.members['anc'].isfile and index.members['main.tex'].isfile
+    assert TarIndex.from_json(index.to_json()).members == index.members
+
+
+def test_open_member(tar_path):
+    index = TarIndex.build(LocalFileObj(tar_path))
+    for name, data in MEMBERS.items():
+        with index.open_member(LocalFileObj(tar_path), name) as fh:
+            assert fh.read() == data
+    with index.open_member(LocalFileObj(tar_path), 'anc/big.bin') as fh:
+        fh.seek(1000)
+        assert fh.read(10) == MEMBERS['anc/big.bin'][1000:1010]
+        assert fh.readline()  # does not fail
+    with pytest.raises(KeyError):
+        index.open_member(LocalFileObj(tar_path), 'nope')
+
+
+def test_file_from_tar(tar_path, tmp_path):
+    sidecar = DirectorySidecarStore(tmp_path / 'sidecar')
+    cache = TarIndexCache(sidecar=sidecar)
+    tar = LocalFileObj(tar_path)
+    for name, data in MEMBERS.items():
+        member = FileFromTar(tar, name, index_cache=cache)
+        assert member.exists()
+        assert member.size == len(data)
+        with member.open('rb') as fh:
+            assert fh.read() == data
+    assert cache.builds == 1
+
+    assert not FileFromTar(tar, 'nope', index_cache=cache).exists()
+    with pytest.raises(FileNotFound):
+        FileFromTar(tar, 'nope', index_cache=cache).open('rb')
+
+    other_process = TarIndexCache(sidecar=sidecar)
+    assert FileFromTar(tar, 'main.tex', index_cache=other_process).exists()
+    assert other_process.builds == 0
+
+
+def test_directory_sidecar_concurrent_puts(tmp_path):
+    sidecar = DirectorySidecarStore(tmp_path / 'sidecar')
+
+    def put(n):
+        for i in range(300):
+            sidecar.put('same.json', f'{n}-{i}'.encode() * 100)
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(put, range(4)))
+    assert sidecar.get('same.json').endswith(b'-299')
+    assert [p.name for p in (tmp_path / 'sidecar').iterdir()] == ['same.json']
+
+
+class _FailingSidecar:
+    def get(self, name):
+        return None
+
+    def put(self, name, data):
+        raise OSError("disk full")
+
+
+def test_sidecar_put_error_is_ignored(tar_path):
+    cache = TarIndexCache(sidecar=_FailingSidecar())
+    assert FileFromTar(LocalFileObj(tar_path), 'main.tex', index_cache=cache).exists()
+    assert cache.builds == 1
+
+
+def test_file_from_tar_default_cache(tar_path):
+    member = FileFromTar(LocalFileObj(tar_path), 'anc/data.csv')
+    assert member.exists()
+    assert member.open('rb').read() == MEMBERS['anc/data.csv']
+
+
+def test_list_ancillary_files(tar_path, tmp_path):
+    if tar_path.suffix != '.gz':
+        assert list_ancillary_files(LocalFileObj(tar_path)) == []
+        return
+    expected = [{'name': 'big.bin', 'size_bytes': len(MEMBERS['anc/big.bin'])},
+                {'name': 'data.csv', 'size_bytes': len(MEMBERS['anc/data.csv'])}]
+    sidecar = DirectorySidecarStore(tmp_path / 'sidecar')
+    cache = TarIndexCache(sidecar=sidecar)
+    tar = LocalFileObj(tar_path)
+    assert list_ancillary_files(tar, cache) == expected
+    assert list_ancillary_files(tar, cache) == expected
+    stats = cache.stats()
+    assert stats['builds'] == 1 and stats['hits'] == 1
+    assert stats['bytes_read'] > 0
+
+    other_process = TarIndexCache(sidecar=sidecar)
+    assert list_ancillary_files(tar, other_process) == expected
+    assert other_process.stats()['sidecar_hits'] == 1
+    assert other_process.stats()['bytes_read'] == 0
+
+
+def test_index_skips_member_data(tmp_path):
+    """Only the headers of an uncompressed tar are read."""
+    path = tmp_path / 'big.tar'
+    with tarfile.open(path, 'w') as tf:
+        for n in range(3):
+            info = tarfile.TarInfo(f'anc/payload{n}.bin')
+            info.size = 1024 * 1024
+            tf.addfile(info, io.BytesIO(bytes(info.size)))
+    cache = TarIndexCache()
+    index, bytes_read = cache.get_counted(LocalFileObj(path))
+    assert len(index.members) == 3
+    assert bytes_read < 64 * 1024
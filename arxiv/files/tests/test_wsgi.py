@@ -0,0 +1,94 @@
+import io
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import FileWrapper
+
+import pytest
+
+from arxiv.files import LocalFileObj, MockStringFileObj
+from arxiv.files.wsgi import FileIterable, sendfile, wsgi_file
+
+DATA = bytes(range(256)) * 4000
+
+
+@pytest.fixture
+def local(tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(DATA)
+    return LocalFileObj(path)
+
+
+def test_wsgi_file_wrapper(local):
+    body = wsgi_file({'wsgi.file_wrapper': FileWrapper}, local)
+    assert isinstance(body, FileWrapper)
+    assert body.filelike.fileno() >= 0  # the real file, so it can be sendfile'd
+    assert b"".join(body) == DATA
+    body.close()
+
+
+def test_wsgi_file_range(local):
+    body = wsgi_file({}, local, 1000, 2000, block_size=100)
+    assert isinstance(body, FileIterable)
+    chunks = list(body)
+    body.close()
+    assert len(chunks) == 10
+    assert b"".join(chunks) == DATA[1000:2000]
+
+
+def test_wsgi_file_not_local():
+    body = wsgi_file({'wsgi.file_wrapper': FileWrapper}, MockStringFileObj("a.txt", "hello"), 1)
+    assert b"".join(body) == b"ello"
+
+
+def test_sendfile_socket(local):
+    left, right = socket.socketpair()
+    with left, right:
+        right.settimeout(5)
+        assert sendfile(local, left, 10, 5000) == 4990
+        received = b""
+        while len(received) < 4990:
+            received += right.recv(65536)
+    assert received == DATA[10:5000]
+
+
+def test_sendfile_socket_timeout(local):
+    left, right = socket.socketpair()
+    with left, right:
+        # with a timeout the socket is non-blocking, os.sendfile() would
+        # raise BlockingIOError once its buffer is full
+        left.settimeout(5)
+        right.settimeout(5)
+        left.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        with ThreadPoolExecutor(1) as executor:
+            sent = executor.submit(sendfile, local, left, 10)
+            received = b""
+            while len(received) < len(DATA) - 10:
+                received += right.recv(65536)
+            assert sent.result() == len(DATA) - 10
+        assert sendfile(local, left, 100, 100) == 0
+    assert received == DATA[10:]
+
+
+def test_sendfile_file(local, tmp_path):
+    with open(tmp_path / "out", "wb") as out:
+        assert sendfile(local, out, 100) == len(DATA) - 100
+    assert (tmp_path / "out").read_bytes() == DATA[100:]
+
+    buffer = io.BytesIO()
+    assert sendfile(MockStringFileObj("a.txt", "hello"), buffer) == 5
+    assert buffer.getvalue() == b"hello"
+
+
+def test_mmap(local, tmp_path):
+    with local.mmap() as mapped:
+        assert memoryview(mapped)[256:512] == DATA[256:512]
+    empty = tmp_path / "empty"
+    empty.touch()
+    with pytest.raises(ValueError):
+        LocalFileObj(empty).mmap()
+
+
+def test_sendfile_no_fileno(local):
+    buffer = io.BytesIO()
+    assert sendfile(local, buffer, 0, 300) == 300
+    assert buffer.getvalue() == DATA[:300]
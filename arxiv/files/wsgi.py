@@ -0,0 +1,105 @@
+"""Sending the contents of `FileObj`s from WSGI apps and to sockets."""
+import os
+import socket
+from typing import Any, Iterable, Iterator, Mapping, Optional
+
+from . import FileObj, LocalFileObj
+from .object_store import open_range
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+class FileIterable:
+    """WSGI response body that reads `fh` in blocks and closes it.
+
+    Same as `wsgiref.util.FileWrapper`, used when the server does not offer
+    a `wsgi.file_wrapper`.
+    """
+
+    def __init__(self, fh: Any, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.fh = fh
+        self.block_size = block_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        while data := self.fh.read(self.block_size):
+            yield data
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+def wsgi_file(environ: Mapping[str, Any], fileobj: FileObj,
+              start: int = 0, end: Optional[int] = None,
+              block_size: int = DEFAULT_BLOCK_SIZE) -> Iterable[bytes]:
+    """Gets a WSGI response body of `fileobj` from `start` up to `end`.
+
+    The caller sets the status and headers, including the `Content-Length`.
+
+    The file is given to the server's `wsgi.file_wrapper` when it has one.
+    For a whole `LocalFileObj` it is the real file, so servers like gunicorn
+    send it with `os.sendfile()` and the data is never copied into Python.
+    Ranges and other `FileObj`s are read in blocks of `block_size`.
+    """
+    if start == 0 and end is None and isinstance(fileobj, LocalFileObj):
+        fh: Any = fileobj.open('rb', buffering=0)
+    else:
+        fh = open_range(fileobj, start, end)
+    wrapper = environ.get('wsgi.file_wrapper')
+    if wrapper is not None:
+        return wrapper(fh, block_size)  # type: ignore
+    return FileIterable(fh, block_size)
+
+
+def sendfile(fileobj: FileObj, out: Any, start: int = 0, end: Optional[int] = None) -> int:
+    """Writes `fileobj` from `start` up to `end` to `out` and returns the
+    number of bytes written.
+
+    `out` is a socket or file. When `fileobj` is a `LocalFileObj` the kernel
+    copies the data, with `socket.sendfile()` when `out` is a socket, so it
+    works with timeouts and non-blocking sockets, and with `os.sendfile()`
+    for other `out` with a `fileno()`. Otherwise the data is copied with
+    `read()` and `write()`, or `sendall()` for a socket.
+    """
+    if isinstance(fileobj, LocalFileObj) and isinstance(out, socket.socket):
+        return _socket_sendfile(fileobj, out, start, end)
+    if isinstance(fileobj, LocalFileObj) and hasattr(os, 'sendfile'):
+        try:
+            out_fd = out.fileno()
+        except (AttributeError, OSError):  # io.UnsupportedOperation is an OSError
+            out_fd = None
+        if out_fd is not None:
+            if hasattr(out, 'flush'):
+                out.flush()
+            return _sendfile(fileobj, out_fd, start, end)
+
+    write = out.sendall if hasattr(out, 'sendall') else out.write
+    sent = 0
+    with open_range(fileobj, start, end) as fh:
+        while data := fh.read(DEFAULT_BLOCK_SIZE):
+            write(data)
+            sent += len(data)
+    return sent
+
+
+def _socket_sendfile(fileobj: LocalFileObj, out: socket.socket,
+                     start: int, end: Optional[int]) -> int:
+    if end is not None and end <= start:
+        return 0
+    with fileobj.open('rb', buffering=0) as fh:
+        return out.sendfile(fh, start, None if end is None else end - start)
+
+
+def _sendfile(fileobj: LocalFileObj, out_fd: int, start: int, end: Optional[int]) -> int:
+    fd = fileobj.open_fd()
+    try:
+        size = os.fstat(fd).st_size
+        stop = size if end is None else min(end, size)
+        offset = start
+        while offset < stop:
+            sent = os.sendfile(out_fd, fd, offset, stop - offset)
+            if sent == 0:
+                break
+            offset += sent
+        return max(0, offset - start)
+    finally:
+        os.close(fd)
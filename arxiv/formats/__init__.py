@@ -3,13 +3,13 @@ import re
 from typing import List, Optional, Union
 
 import logging
-import tarfile
 from operator import itemgetter
 from tarfile import CompressionError, ReadError
 from typing import Dict
 
 from ..document.version import SourceFlag
 from ..files import FileObj
+from ..files.tar_index import TarIndexCache, default_tar_index_cache
 
 logger = logging.getLogger(__name__)
 
@@ -136,21 +136,26 @@ def has_ancillary_files(source_flag: str) -> bool:
     return re.search('A', source_flag, re.IGNORECASE) is not None
 
 
-def list_ancillary_files(tarball: Optional[FileObj]) -> List[Dict]:
-    """Return a list of ancillary files in a tarball (.tar.gz file)."""
+def list_ancillary_files(tarball: Optional[FileObj],
+                         index_cache: Optional[TarIndexCache] = None) -> List[Dict]:
+    """Return a list of ancillary files in a tarball (.tar.gz file).
+
+    The members are from the `TarIndex` of the tarball in `index_cache`, by
+    default `default_tar_index_cache`, so the tarball is only read once per
+    etag. Give the cache a sidecar store to share the indexes, or to use ones
+    made ahead of time. The bytes of the tarball read for each listing are
+    logged at debug and the totals are in `index_cache.stats()`.
+    """
     if not tarball or not tarball.name.endswith('.tar.gz') or not tarball.exists():
         return []
 
-    anc_files = []
     try:
-        with tarball.open(mode='rb') as fh:
-            tf = tarfile.open(fileobj=fh, mode='r')  # type: ignore
-            for member in \
-                    (m for m in tf if re.search(r'^anc\/', m.name) and m.isfile()):
-                name = re.sub(r'^anc\/', '', member.name)
-                size_bytes = member.size
-                anc_files.append({'name': name, 'size_bytes': size_bytes})
+        index, bytes_read = (index_cache or default_tar_index_cache).get_counted(tarball)
     except (ReadError, CompressionError) as ex:
         raise Exception(f"Problem while working with tar {tarball}") from ex
+    logger.debug("listed ancillary files of %s reading %d bytes", tarball.name, bytes_read)
 
+    anc_files = [{'name': name[4:], 'size_bytes': entry.size}
+                 for name, entry in index.members.items()
+                 if name.startswith('anc/') and entry.isfile]
     return sorted(anc_files, key=itemgetter('name'))
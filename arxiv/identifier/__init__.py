@@ -2,13 +2,15 @@
 # pylint: disable=C0330
 
 import json
+from collections import OrderedDict
 from re import RegexFlag
-from typing import Match, Optional, Union, Tuple, Callable, List
+from threading import Lock
+from typing import Match, Optional, Union, Tuple, Callable, List, Dict
 import re
 
 from arxiv.taxonomy.definitions import ARCHIVES, CATEGORIES
 
-__all__ = ('parse_arxiv_id', 'Identifier', )
+__all__ = ('parse_arxiv_id', 'Identifier', 'IdentifierCache', )
 
 _archive = '|'.join([re.escape(key) for key in ARCHIVES.keys()])
 """string for use in Regex for all arXiv archives"""
@@ -106,6 +108,30 @@ SUBSTITUTIONS: Sub_type = [
     (r'([^a\-])(ph|ex|th|qc|mat|lat|sci)(\/|$)', r'\g<1>-\g<2>\g<3>', 1, 0)
 ]
 
+
+def _apply_substitutions(arxiv_id: str) -> str:
+    for subtup in SUBSTITUTIONS:
+        arxiv_id = re.sub(subtup[0],
+                          subtup[1],
+                          arxiv_id,
+                          count=subtup[2],
+                          flags=subtup[3])
+    return arxiv_id
+
+
+_canonical_archives = '|'.join(
+    re.escape(key) for key in ARCHIVES.keys()
+    if _apply_substitutions(f'{key}/0001001') == f'{key}/0001001')
+
+RE_CANONICAL_ID = re.compile(
+    r'^(?:\d{4}\.\d{4,5}|(?:%s)/\d{7})(?:v[1-9]\d*)?$' % _canonical_archives)
+"""IDs that `SUBSTITUTIONS` would leave unchanged, e.g. 2401.12345v2 or
+hep-th/9901001.
+
+Used by `Identifier` to skip the substitution chain for already
+canonical input.
+"""
+
 class Identifier:
     """Class for arXiv identifiers of published papers."""
 
@@ -137,12 +163,8 @@ class Identifier:
             self.arxiv_prefix = True
             arxiv_id = arxiv_id.removeprefix("arxiv:")
 
-        for subtup in SUBSTITUTIONS:
-            arxiv_id = re.sub(subtup[0],
-                              subtup[1],
-                              arxiv_id,
-                              count=subtup[2],
-                              flags=subtup[3])
+        if not RE_CANONICAL_ID.match(arxiv_id):
+            arxiv_id = _apply_substitutions(arxiv_id)
 
         self.version = 0
         parse_actions = ((RE_ARXIV_OLD_ID, self._parse_old_id),
@@ -281,6 +303,19 @@ class Identifier:
             return False
 
 
+    @staticmethod
+    def parse(arxiv_id: str) -> 'Identifier':
+        """Get a shared, immutable `Identifier` for `arxiv_id`.
+
+        Instances are interned in a bounded LRU cache so hot IDs are
+        only parsed once. Since the same instance is handed to every
+        caller, setting attributes on it raises `AttributeError`. Use
+        `Identifier(arxiv_id)` to get a private, mutable instance.
+
+        Raises `IdentifierException` for invalid IDs, these are not cached.
+        """
+        return identifier_cache.get(arxiv_id)
+
     @staticmethod
     def is_mostly_safe(idin: Optional[str]) -> bool:
         """Checks that the input could reasonably be parsed as an ID.
@@ -294,3 +329,81 @@ class Identifier:
         if len(idin) > 200:
             return False
         return bool(re.match(re.compile(r"^[./0-9a-zA-Z:-]{8}"), idin))
+
+
+
+class _SharedIdentifier(Identifier):
+    """An `Identifier` that is shared via `IdentifierCache` and so is read only.
+
+    Compares equal to an `Identifier` parsed from the same string.
+    """
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(
+            f"Identifier {self.ids} is shared and cannot be modified")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(
+            f"Identifier {self.ids} is shared and cannot be modified")
+
+
+class IdentifierCache:
+    """Thread safe, bounded LRU cache of parsed `Identifier` instances.
+
+    Keyed on the ID string exactly as passed in. Invalid IDs are not
+    cached.
+    """
+
+    def __init__(self, maxsize: int = 8192) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[str, Identifier] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, arxiv_id: str) -> Identifier:
+        """Get the shared `Identifier` for `arxiv_id`, parsing it on a miss."""
+        with self._lock:
+            ident = self._cache.get(arxiv_id)
+            if ident is not None:
+                self._cache.move_to_end(arxiv_id)
+                self.hits += 1
+                return ident
+            self.misses += 1
+
+        # Parse outside of the lock, a race just parses the same ID twice.
+        ident = Identifier(arxiv_id)
+        ident.__class__ = _SharedIdentifier
+
+        with self._lock:
+            existing = self._cache.get(arxiv_id)
+            if existing is not None:
+                return existing
+            self._cache[arxiv_id] = ident
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return ident
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit and miss counts and current size of the cache."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'size': len(self._cache),
+                    'maxsize': self.maxsize}
+
+    def clear(self) -> None:
+        """Empty the cache and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+identifier_cache = IdentifierCache()
+"""Cache used by `Identifier.parse`."""
@@ -0,0 +1,109 @@
+"""Compact, immutable representation of arXiv identifiers.
+
+`Identifier` keeps around twenty attributes in a per-instance `__dict__`
+and has no hash or ordering. `CompactIdentifier` stores only the four
+values needed to rebuild an ID, so it is cheap to keep millions of them
+in sets, dicts or sorted lists.
+"""
+from dataclasses import dataclass
+
+from . import Identifier, IdentifierException
+
+
+@dataclass(frozen=True, slots=True, order=True)
+class CompactIdentifier:
+    """Slotted, frozen arXiv ID that hashes and sorts chronologically.
+
+    Ordering is by (year and month, number, archive, version). The `extra` and
+    `arxiv_prefix` of an `Identifier` are not kept.
+    """
+
+    yyyymm: int
+    """Four digit year and month, ex. 200704 for 0704.0001."""
+
+    num: int
+    """Number of the paper in the month."""
+
+    archive: str
+    """Archive for old style IDs, `arxiv` for new style IDs."""
+
+    version: int = 0
+    """Version, 0 if the ID has no version."""
+
+    def __post_init__(self) -> None:
+        if self.version < 0:
+            raise IdentifierException(f'invalid version {self.version}')
+
+    @staticmethod
+    def from_identifier(arxiv_id: Identifier) -> 'CompactIdentifier':
+        """Make a `CompactIdentifier` from an `Identifier`."""
+        if arxiv_id.year is None or arxiv_id.month is None \
+           or arxiv_id.num is None or arxiv_id.archive is None:
+            raise IdentifierException(f'incomplete arXiv identifier {arxiv_id.ids}')
+        return CompactIdentifier(yyyymm=arxiv_id.year * 100 + arxiv_id.month,
+                                 num=arxiv_id.num,
+                                 archive=arxiv_id.archive,
+                                 version=arxiv_id.version)
+
+    @staticmethod
+    def parse(arxiv_id: str) -> 'CompactIdentifier':
+        """Parse a string to a `CompactIdentifier`.
+
+        Raises `IdentifierException` if `arxiv_id` is not valid.
+        """
+        return CompactIdentifier.from_identifier(Identifier.parse(arxiv_id))
+
+    def to_identifier(self) -> Identifier:
+        """Make a full `Identifier`."""
+        return Identifier(self.idv)
+
+    @property
+    def is_old_id(self) -> bool:
+        return self.archive != 'arxiv'
+
+    @property
+    def year(self) -> int:
+        return self.yyyymm // 100
+
+    @property
+    def month(self) -> int:
+        return self.yyyymm % 100
+
+    @property
+    def yymm(self) -> str:
+        return f'{self.yyyymm % 10000:04d}'
+
+    @property
+    def has_version(self) -> bool:
+        return self.version > 0
+
+    @property
+    def filename(self) -> str:
+        if self.is_old_id:
+            return f'{self.yymm}{self.num:03d}'
+        elif self.year >= 2015:
+            return f'{self.yymm}.{self.num:05d}'
+        else:
+            return f'{self.yymm}.{self.num:04d}'
+
+    @property
+    def id(self) -> str:
+        if self.is_old_id:
+            return f'{self.archive}/{self.filename}'
+        else:
+            return self.filename
+
+    @property
+    def idv(self) -> str:
+        return f'{self.id}v{self.version}' if self.version else self.id
+
+    @property
+    def squashed(self) -> str:
+        return self.id.replace('/', '')
+
+    @property
+    def squashedv(self) -> str:
+        return self.idv.replace('/', '')
+
+    def __str__(self) -> str:
+        return self.idv
@@ -0,0 +1,184 @@
+"""Pack arXiv IDs into sortable 64-bit integers.
+
+The integer for an ID is laid out as, from the most significant bit:
+
+=======  ====  ====================================================
+bits     size  value
+=======  ====  ====================================================
+39-54    16    months since 1991-01
+19-38    20    number of the paper in the month
+12-18    7     index of the archive in `OLD_STYLE_ARCHIVES`, 0 for new style
+0-11     12    version, 0 for no version
+=======  ====  ====================================================
+
+So the integers sort in the same order as `CompactIdentifier`, which is
+arXiv chronology, and all the IDs of a month fall in a contiguous range. That
+allows range queries on sorted arrays with `numpy.searchsorted` and
+`month_range()`.
+
+The bulk functions `encode_many()`, `split_many()` and `decode_many()` need
+`numpy`, which is installed with the `numpy` extra of arxiv-base. The rest of
+this module does not.
+"""
+import re
+from typing import Any, Iterable, List, Sequence, Tuple, Union, cast, TYPE_CHECKING
+
+from . import Identifier, IdentifierException
+from .compact import CompactIdentifier
+
+if TYPE_CHECKING:
+    import numpy as np
+
+OLD_STYLE_ARCHIVES: Tuple[str, ...] = (
+    'arxiv', 'acc-phys', 'adap-org', 'alg-geom', 'ao-sci', 'astro-ph',
+    'atom-ph', 'bayes-an', 'chao-dyn', 'chem-ph', 'cmp-lg', 'comp-gas',
+    'cond-mat', 'cs', 'dg-ga', 'funct-an', 'gr-qc', 'hep-ex', 'hep-lat',
+    'hep-ph', 'hep-th', 'math', 'math-ph', 'mtrl-th', 'nlin', 'nucl-ex',
+    'nucl-th', 'patt-sol', 'physics', 'plasm-ph', 'q-alg', 'q-bio',
+    'quant-ph', 'solv-int', 'supr-con', 'test',
+)
+"""Archives that have old style IDs, in sorted order after `arxiv`.
+
+Old style IDs stopped being issued in 2007-03 so this list is fixed. The index
+in this tuple is stored in the encoded integers so it must never be reordered.
+"""
+
+_ARCHIVE_INDEX = {archive: idx for idx, archive in enumerate(OLD_STYLE_ARCHIVES)}
+
+VERSION_BITS = 12
+ARCHIVE_BITS = 7
+NUM_BITS = 20
+MONTH_BITS = 16
+
+_ARCHIVE_SHIFT = VERSION_BITS
+_NUM_SHIFT = _ARCHIVE_SHIFT + ARCHIVE_BITS
+_MONTH_SHIFT = _NUM_SHIFT + NUM_BITS
+
+_FIRST_YEAR = 1991
+
+_RE_NEW = re.compile(r'^(\d\d)(\d\d)\.(\d{4,5})(?:v([1-9]\d*))?$')
+
+
+def _pack(year: int, month: int, num: int, archive: str, version: int) -> int:
+    archive_idx = _ARCHIVE_INDEX.get(archive)
+    if archive_idx is None:
+        raise IdentifierException(f'cannot encode archive {archive}')
+    if version >= 1 << VERSION_BITS:
+        raise IdentifierException(f'cannot encode version {version}')
+    return (((year - _FIRST_YEAR) * 12 + month - 1) << _MONTH_SHIFT) \
+        | (num << _NUM_SHIFT) \
+        | (archive_idx << _ARCHIVE_SHIFT) \
+        | version
+
+
+def encode(arxiv_id: Union[str, Identifier, CompactIdentifier]) -> int:
+    """Encode an arXiv ID as an integer.
+
+    Raises `IdentifierException` if `arxiv_id` is not a valid ID.
+    """
+    if isinstance(arxiv_id, str):
+        match = _RE_NEW.match(arxiv_id)
+        if match and match.group(1) >= '07':
+            # Fast path for canonical new style IDs, the common case
+            yy, mm, num, version = match.groups()
+            year, month = 2000 + int(yy), int(mm)
+            if 1 <= month <= 12 and (year, month) >= (2007, 4) \
+               and len(num) == (5 if year >= 2015 else 4) and int(num) > 0:
+                return _pack(year, month, int(num), 'arxiv',
+                             int(version) if version else 0)
+        arxiv_id = CompactIdentifier.parse(arxiv_id)
+    elif isinstance(arxiv_id, Identifier):
+        arxiv_id = CompactIdentifier.from_identifier(arxiv_id)
+
+    return _pack(arxiv_id.year, arxiv_id.month, arxiv_id.num,
+                 arxiv_id.archive, arxiv_id.version)
+
+
+def decode(value: int) -> CompactIdentifier:
+    """Decode an integer made with `encode()`."""
+    months, num, archive_idx, version = _split(value)
+    if archive_idx >= len(OLD_STYLE_ARCHIVES):
+        raise IdentifierException(f'invalid encoded arXiv ID {value}')
+    return CompactIdentifier(yyyymm=(_FIRST_YEAR + months // 12) * 100 + months % 12 + 1,
+                             num=num,
+                             archive=OLD_STYLE_ARCHIVES[archive_idx],
+                             version=version)
+
+
+def _split(value: int) -> Tuple[int, int, int, int]:
+    return (value >> _MONTH_SHIFT,
+            (value >> _NUM_SHIFT) & ((1 << NUM_BITS) - 1),
+            (value >> _ARCHIVE_SHIFT) & ((1 << ARCHIVE_BITS) - 1),
+            value & ((1 << VERSION_BITS) - 1))
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as ex:
+        raise ImportError("numpy is needed for the bulk arXiv ID encoding, "
+                          "install arxiv-base[numpy]") from ex
+    return numpy
+
+
+def encode_many(arxiv_ids: Iterable[str]) -> "np.ndarray":
+    """Encode arXiv IDs to an `int64` array.
+
+    Raises `IdentifierException` on the first invalid ID.
+    """
+    numpy = _numpy()
+    count = len(arxiv_ids) if isinstance(arxiv_ids, Sequence) else -1
+    encoded: "np.ndarray" = numpy.fromiter(map(encode, arxiv_ids), dtype=numpy.int64,
+                                           count=count)
+    return encoded
+
+
+def split_many(values: "np.ndarray") \
+        -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Split encoded IDs into arrays of their parts.
+
+    Returns arrays of year and month as YYYYMM, number, archive index into
+    `OLD_STYLE_ARCHIVES` and version.
+    """
+    numpy = _numpy()
+    months, num, archive_idx, version = cast(Tuple[Any, Any, Any, Any],
+                                             _split(numpy.asarray(values, dtype=numpy.int64)))
+    return ((_FIRST_YEAR + months // 12) * 100 + months % 12 + 1,
+            num, archive_idx, version)
+
+
+def decode_many(values: "np.ndarray") -> List[str]:
+    """Decode an array of encoded IDs to ID strings with version if any."""
+    yyyymm, num, archive_idx, version = split_many(values)
+    if len(archive_idx) and archive_idx.max() >= len(OLD_STYLE_ARCHIVES):
+        raise IdentifierException('invalid encoded arXiv ID in values')
+    out = []
+    for ym, n, aidx, v in zip(yyyymm.tolist(), num.tolist(),
+                              archive_idx.tolist(), version.tolist()):
+        yymm = ym % 10000
+        if aidx:
+            arxiv_id = f'{OLD_STYLE_ARCHIVES[aidx]}/{yymm:04d}{n:03d}'
+        elif ym >= 201501:
+            arxiv_id = f'{yymm:04d}.{n:05d}'
+        else:
+            arxiv_id = f'{yymm:04d}.{n:04d}'
+        out.append(f'{arxiv_id}v{v}' if v else arxiv_id)
+    return out
+
+
+def yymm_to_months(yymm: str) -> int:
+    """Months since 1991-01 for a four digit `yymm` like `0704`."""
+    yy, mm = int(yymm[:2]), int(yymm[2:4])
+    year = yy + (1900 if yy >= 91 else 2000)
+    return (year - _FIRST_YEAR) * 12 + mm - 1
+
+
+def month_range(start_yymm: str, end_yymm: str) -> Tuple[int, int]:
+    """Range of encoded values for IDs from `start_yymm` through `end_yymm`.
+
+    The start is inclusive and the end is exclusive, so with a sorted array
+    `arr`, `arr[np.searchsorted(arr, start):np.searchsorted(arr, end)]` are
+    the IDs of those months.
+    """
+    return (yymm_to_months(start_yymm) << _MONTH_SHIFT,
+            (yymm_to_months(end_yymm) + 1) << _MONTH_SHIFT)
@@ -1,8 +1,11 @@
 """Iterator for arxiv IDs."""
 
-from typing import Optional, List
+from itertools import islice
+from typing import Iterator, Optional, List, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
 
 from ..db import Session
 from ..db.models import Metadata
@@ -11,40 +14,108 @@ from ..taxonomy.category import Category
 from ..document.version import SOURCE_FORMAT
 
 
+def category_filter(category_id: str) -> ColumnElement[bool]:
+    """Filter for `Metadata.abs_categories` having exactly `category_id`.
+
+    `abs_categories` is a space separated list so a plain `LIKE '%cs.A%'`
+    would also match `cs.AI`.
+    """
+    return or_(Metadata.abs_categories == category_id,
+               Metadata.abs_categories.like(f'{category_id} %'),
+               Metadata.abs_categories.like(f'% {category_id}'),
+               Metadata.abs_categories.like(f'% {category_id} %'))
+
+
 class arXivIDIterator:
-    """Iterator for arxiv ids."""
+    """Iterator for arxiv ids.
+
+    This is lazy, the IDs are fetched from the DB in pages of `page_size`
+    using keyset pagination on `(paper_id, version)` so memory use does not
+    depend on how many IDs are in the range.
+
+    `start_yymm` and `end_yymm` may also be full IDs without version, ex.
+    `2401.01234`, to iterate over the IDs between them, inclusive.
+    """
 
     def __init__ (self,
                   start_yymm: str,
                   end_yymm: str,
                   categories: Optional[List[Category]] = None,
                   source_formats: Optional[List[SOURCE_FORMAT]] = None,
-                  only_latest_version: bool = False):
-        
+                  only_latest_version: bool = False,
+                  page_size: int = 1000):
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.start_yymm = start_yymm
+        self.end_yymm = end_yymm
+        self.categories = categories
+        self.source_formats = source_formats
+        self.only_latest_version = only_latest_version
+        self.page_size = page_size
+
+        self._last: Optional[Tuple[str, int]] = None
+        self._page: List[Tuple[str, int]] = []
+        self._index = 0
+        self._done = False
+
+    def filter_query(self, query: Query) -> Query:
+        """Adds the range and filters of this iterator to a query on `Metadata`."""
+        query = query \
+            .filter(Metadata.paper_id >= self.start_yymm) \
+            .filter(Metadata.paper_id < f'{self.end_yymm}.999999')
+        if self.categories:
+            query = query.filter(or_(*[category_filter(category.id) for category in self.categories]))
+        if self.source_formats:
+            query = query.filter(Metadata.source_format.in_(self.source_formats))
+        if self.only_latest_version:
+            query = query.filter(Metadata.is_current == 1)
+        return query
+
+    def _fetch_page(self) -> List[Tuple[str, int]]:
         with Session() as session:
-            self.query = session.query(Metadata.paper_id, Metadata.version) \
-                .filter(Metadata.paper_id >= start_yymm) \
-                .filter(Metadata.paper_id < f'{end_yymm}.999999')
-            if categories:
-                self.query = self.query.filter(or_(*[Metadata.abs_categories.like(f'%{category.id}%') for category in categories]))
-            if source_formats:
-                self.query = self.query.filter(Metadata.source_format.in_(source_formats))
-            if only_latest_version:
-                self.query = self.query.filter(Metadata.is_current == 1)
-            
-            self.ids = self.query.all()
-
-        self.len_ids = len(self.ids)
-        self.index = 0
+            query = self.filter_query(session.query(Metadata.paper_id, Metadata.version))
+            if self._last is not None:
+                last_id, last_version = self._last
+                query = query.filter(or_(Metadata.paper_id > last_id,
+                                         and_(Metadata.paper_id == last_id,
+                                              Metadata.version > last_version)))
+            rows = query.order_by(Metadata.paper_id, Metadata.version) \
+                .limit(self.page_size) \
+                .all()
+
+        page = [(paper_id, version) for paper_id, version in rows]
+        if len(page) < self.page_size:
+            self._done = True
+        if page:
+            self._last = page[-1]
+        return page
 
     def __iter__ (self) -> 'arXivIDIterator':
         """Iterator for arXiv ids."""
         return self
-    
+
     def __next__ (self) -> Identifier:
         """Gets next."""
-        if self.index >= self.len_ids:
-            raise StopIteration
-        paper_id, version = self.ids[self.index].tuple()
-        self.index += 1
+        if self._index >= len(self._page):
+            if self._done:
+                raise StopIteration
+            self._page = self._fetch_page()
+            self._index = 0
+            if not self._page:
+                raise StopIteration
+        paper_id, version = self._page[self._index]
+        self._index += 1
         return Identifier(f'{paper_id}v{version}')
+
+    def chunks(self, size: Optional[int] = None) -> Iterator[List[Identifier]]:
+        """Yields lists of up to `size` IDs, for handing out to workers.
+
+        `size` defaults to `page_size`. This consumes the same IDs as
+        iterating over this object.
+        """
+        size = size or self.page_size
+        while True:
+            chunk = list(islice(self, size))
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,161 @@
+"""Find every arXiv ID in large texts.
+
+`parse_arxiv_id` finds only the first ID in a string and `OLD_STYLE` is an
+alternation of every archive and category name which the regex engine tries
+at every position of the text. The scanner here instead looks for the cheap
+`/YYMMNNN` anchor of an old style ID and only then checks for an archive or
+category name right before it. New style IDs are found by a search for
+`NNNN.NNNN` which is only checked against the full pattern at the hits.
+
+Matches are the same as `arxiv.identifier.STANDARD` and `OLD_STYLE` but all the IDs in the
+text are found, in order, with their offsets.
+"""
+import re
+from typing import IO, AnyStr, Generic, Iterable, Iterator, List, \
+    NamedTuple, Optional, Pattern, Union
+
+from . import _archive, _category
+from ..taxonomy.definitions import ARCHIVES, CATEGORIES
+
+
+class IdMatch(NamedTuple):
+    """An arXiv ID found in a text."""
+
+    arxiv_id: str
+    """The ID as it appears in the text, without any `arXiv:` prefix."""
+
+    start: int
+    """Offset of the start of the ID, in characters for `str` and bytes for
+    `bytes`."""
+
+    end: int
+    """Offset just past the end of the ID."""
+
+
+_MAX_NAME = max(len(name) for name in [*ARCHIVES.keys(), *CATEGORIES.keys()])
+
+_LOOKBACK = _MAX_NAME + 1
+"""How far before an old style anchor a name can start, plus one char of
+lookbehind needed by `STANDARD`."""
+
+_MAX_MATCH = 64
+"""IDs longer than this, which can only be due to very long version numbers,
+may be missed if split across chunks by `scan_chunks`."""
+
+
+class _Patterns(Generic[AnyStr]):
+    def __init__(self, standard_hint: Pattern[AnyStr], standard: Pattern[AnyStr],
+                 anchor: Pattern[AnyStr], name_at_end: Pattern[AnyStr]):
+        self.standard_hint = standard_hint
+        self.standard = standard
+        self.anchor = anchor
+        self.name_at_end = name_at_end
+
+
+_STR = _Patterns(
+    re.compile(r'\d{4}\.\d{4}'),
+    # Same as STANDARD without the optional prefix, which does not change
+    # where the ID is
+    re.compile(r'(?<![\d=\.])\d{4}\.\d{4,5}(?:v\d*)?', re.I),
+    re.compile(r'/\d{2}[01]\d{4}(?:v\d*)?', re.I),
+    re.compile(r'(?:%s)\Z' % f'{_archive}|{_category}', re.I))
+
+_BYTES = _Patterns(*[re.compile(pat.pattern.encode('ascii'), pat.flags & re.I)
+                     for pat in (_STR.standard_hint, _STR.standard,
+                                 _STR.anchor, _STR.name_at_end)])
+
+
+def _as_str(value: Union[str, bytes]) -> str:
+    return value if isinstance(value, str) else value.decode('ascii')
+
+
+def _scan(text: AnyStr, pats: '_Patterns[AnyStr]', pos: int, endpos: int) \
+        -> List[IdMatch]:
+    """Find IDs starting in `text[pos:endpos]`.
+
+    Context before `pos` is used for lookbehind but matches can not start
+    there.
+    """
+    found = []
+    hint = pats.standard_hint.search(text, pos)
+    while hint is not None and hint.start() < endpos:
+        # A real match can only start at the start of a hint since the other
+        # positions in a hint have a digit or . before them.
+        match = pats.standard.match(text, hint.start())
+        if match:
+            found.append(IdMatch(_as_str(match.group(0)), match.start(), match.end()))
+            hint = pats.standard_hint.search(text, match.end())
+        else:
+            hint = pats.standard_hint.search(text, hint.end())
+    n_standard = len(found)
+
+    prev_end = pos
+    for anchor in pats.anchor.finditer(text, pos):
+        slash = anchor.start()
+        if slash >= endpos + _MAX_NAME:
+            break
+        name = pats.name_at_end.search(text, max(prev_end, slash - _MAX_NAME), slash)
+        if name is None or name.start() >= endpos:
+            continue
+        found.append(IdMatch(_as_str(text[name.start():anchor.end()]),
+                             name.start(), anchor.end()))
+        prev_end = anchor.end()
+
+    if n_standard and len(found) > n_standard:
+        found.sort(key=lambda m: m.start)
+    return found
+
+
+def scan_text(text: Union[str, bytes]) -> Iterator[IdMatch]:
+    """Yield every arXiv ID in `text` in order."""
+    if isinstance(text, str):
+        yield from _scan(text, _STR, 0, len(text))
+    else:
+        yield from _scan(text, _BYTES, 0, len(text))
+
+
+def scan_chunks(chunks: Iterable[AnyStr]) -> Iterator[IdMatch]:
+    """Yield every arXiv ID in a stream of `str` or `bytes` chunks.
+
+    Offsets are from the start of the stream. IDs split across chunks are
+    found. A file opened for reading is an iterable of lines so can be passed
+    directly, see also `scan_file()`.
+
+    Memory used is bounded by the size of the largest chunk.
+    """
+    buf: Optional[AnyStr] = None
+    base = 0
+    min_start = 0
+    pats: Optional[_Patterns] = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if buf is None:
+            buf = chunk
+            pats = _STR if isinstance(chunk, str) else _BYTES
+        else:
+            buf = buf + chunk
+        if len(buf) <= _MAX_MATCH + _LOOKBACK:
+            continue
+
+        # Matches that start before safe are complete in buf
+        safe = len(buf) - _MAX_MATCH
+        for match in _scan(buf, pats, min_start - base, safe):  # type: ignore
+            if match.end == len(buf):  # may continue in next chunk
+                safe = match.start
+                break
+            yield IdMatch(match.arxiv_id, match.start + base, match.end + base)
+            min_start = match.end + base
+        min_start = max(min_start, safe + base)
+        keep_from = max(0, safe - _LOOKBACK)
+        buf = buf[keep_from:]
+        base += keep_from
+
+    if buf:
+        for match in _scan(buf, pats, min_start - base, len(buf)):  # type: ignore
+            yield IdMatch(match.arxiv_id, match.start + base, match.end + base)
+
+
+def scan_file(fh: IO, chunk_size: int = 1024 * 1024) -> Iterator[IdMatch]:
+    """Yield every arXiv ID in a file opened in text or binary mode."""
+    yield from scan_chunks(iter(lambda: fh.read(chunk_size), fh.read(0)))
@@ -0,0 +1,102 @@
+"""Plan shards of arXiv IDs for parallel jobs over the corpus.
+
+The number of papers per month grew about 10x over the years so splitting a
+job by month gives very unbalanced shards. `plan_shards()` uses the counts in
+`arXiv_metadata` to split a range into shards with about the same number of
+IDs.
+
+Ex.
+
+    shards = plan_shards(16, '0704', '2412', only_latest_version=True)
+    # then each worker gets one shard, maybe as JSON, and does
+    shard = Shard(*json.loads(message))
+    for arxiv_id in shard.iterator(only_latest_version=True):
+        ...
+"""
+import logging
+from typing import List, NamedTuple, Optional, Any
+
+from sqlalchemy import func
+
+from ..db import Session
+from ..db.models import Metadata
+from ..taxonomy.category import Category
+from ..document.version import SOURCE_FORMAT
+from .iteration import arXivIDIterator
+
+logger = logging.getLogger(__name__)
+
+
+class Shard(NamedTuple):
+    """A range of paper IDs without versions, both ends inclusive.
+
+    As a `NamedTuple` this can be pickled or serialized as a JSON list.
+    """
+
+    start_id: str
+    end_id: str
+
+    def iterator(self, **kwargs: Any) -> arXivIDIterator:
+        """Gets an `arXivIDIterator` over this shard.
+
+        `kwargs` are passed to `arXivIDIterator` and should be the same
+        filters that were passed to `plan_shards()`.
+        """
+        return arXivIDIterator(self.start_id, self.end_id, **kwargs)
+
+
+def plan_shards(n: int,
+                start_yymm: str,
+                end_yymm: str,
+                categories: Optional[List[Category]] = None,
+                source_formats: Optional[List[SOURCE_FORMAT]] = None,
+                only_latest_version: bool = False) -> List[Shard]:
+    """Split the IDs from `start_yymm` to `end_yymm` into `n` balanced shards.
+
+    The shards are balanced by the number of IDs, with the same filters as
+    `arXivIDIterator`, that each will yield. All the versions of a paper are in
+    the same shard. Fewer than `n` shards are returned if there are fewer than
+    `n` papers.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    ids = arXivIDIterator(start_yymm, end_yymm, categories=categories,
+                          source_formats=source_formats,
+                          only_latest_version=only_latest_version)
+    yymm = func.substr(Metadata.paper_id, 1, 4)
+    with Session() as session:
+        months = ids.filter_query(session.query(yymm, func.count())) \
+            .group_by(yymm) \
+            .order_by(yymm) \
+            .all()
+        total = sum(count for _, count in months)
+        if not total:
+            return []
+
+        # Row offsets, in (paper_id, version) order, where the shards start
+        targets = [total * i // n for i in range(1, n)]
+        starts: List[str] = [
+            ids.filter_query(session.query(func.min(Metadata.paper_id))).scalar()]
+        seen = 0
+        for month, count in months:
+            while targets and targets[0] < seen + count:
+                offset = targets.pop(0) - seen
+                paper_id = ids.filter_query(session.query(Metadata.paper_id)) \
+                    .filter(Metadata.paper_id.like(f'{month}.%')) \
+                    .order_by(Metadata.paper_id, Metadata.version) \
+                    .offset(offset) \
+                    .limit(1) \
+                    .scalar()
+                if paper_id is not None and paper_id > starts[-1]:
+                    starts.append(paper_id)
+            seen += count
+
+        ends = [ids.filter_query(session.query(func.max(Metadata.paper_id)))
+                .filter(Metadata.paper_id < next_start).scalar()
+                for next_start in starts[1:]]
+        ends.append(ids.filter_query(session.query(func.max(Metadata.paper_id))).scalar())
+
+    shards = [Shard(start, end) for start, end in zip(starts, ends)]
+    logger.debug("planned %d shards for %d IDs from %s to %s",
+                 len(shards), total, start_yymm, end_yymm)
+    return shards
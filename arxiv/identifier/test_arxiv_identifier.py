@@ -1,4 +1,7 @@
-from . import Identifier
+import pytest
+
+from . import Identifier, IdentifierCache, IdentifierException, \
+    RE_CANONICAL_ID, _apply_substitutions
 
 def test_id_without_extra():
     arxiv_id = Identifier('physics/0303098')
@@ -33,3 +36,49 @@ def test_id_with_extra():
     assert (arxiv_id.is_old_id
             and arxiv_id.arxiv_prefix == False)
     assert (arxiv_id.extra == '/static/icon.png')
+
+
+def test_parse_is_cached():
+    cache = IdentifierCache(maxsize=2)
+    first = cache.get('1501.00001v2')
+    assert cache.get('1501.00001v2') is first
+    assert first == Identifier('1501.00001v2')
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    cache.get('hep-th/9901001')
+    cache.get('math/0303098')
+    assert len(cache) == 2
+    assert cache.get('1501.00001v2') is not first, "oldest should be evicted"
+
+
+def test_parse_is_immutable():
+    arxiv_id = Identifier.parse('0704.0001')
+    assert isinstance(arxiv_id, Identifier)
+    with pytest.raises(AttributeError):
+        arxiv_id.version = 3
+    assert Identifier.parse('0704.0001').version == 0
+
+
+def test_parse_invalid():
+    cache = IdentifierCache()
+    with pytest.raises(IdentifierException):
+        cache.get('0704.0000')
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize('arxiv_id', [
+    '1501.00001', '1501.00001v12', '0704.0001v1', 'hep-th/9901001',
+    'math/0303098v3', 'cond-mat/0001001', 'astro-ph/9912001v2'
+])
+def test_canonical_skips_substitutions(arxiv_id):
+    assert RE_CANONICAL_ID.match(arxiv_id)
+    assert _apply_substitutions(arxiv_id) == arxiv_id
+    assert Identifier(arxiv_id).idv == arxiv_id
+
+
+@pytest.mark.parametrize('arxiv_id', [
+    'arxiv:1501.00001', '1501.00001.pdf', 'hepth/9901001', 'Math/0303098',
+    'math.NA/0303098', '/hep-th/9901001', 'physics/0303098/'
+])
+def test_not_canonical(arxiv_id):
+    assert not RE_CANONICAL_ID.match(arxiv_id)
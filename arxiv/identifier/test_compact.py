@@ -0,0 +1,42 @@
+"""Tests for :mod:`arxiv.identifier.compact`."""
+import pytest
+
+from . import Identifier
+from .compact import CompactIdentifier
+
+
+@pytest.mark.parametrize('arxiv_id', [
+    '0704.0001', '1412.9999v2', '1501.00001v12', 'hep-th/9901001',
+    'math/0303098v3', 'cond-mat/0001001'
+])
+def test_round_trip(arxiv_id):
+    ident = Identifier(arxiv_id)
+    compact = CompactIdentifier.from_identifier(ident)
+    assert compact.idv == ident.idv
+    assert compact.id == ident.id
+    assert compact.yymm == ident.yymm
+    assert compact.squashed == ident.squashed
+    assert compact.squashedv == ident.squashedv
+    assert compact.filename == ident.filename
+    assert compact.is_old_id == ident.is_old_id
+    assert compact.has_version == ident.has_version
+    assert compact.to_identifier() == ident
+
+
+def test_frozen_and_slotted():
+    compact = CompactIdentifier.parse('2401.12345v2')
+    assert not hasattr(compact, '__dict__')
+    with pytest.raises(AttributeError):
+        compact.version = 3  # type: ignore
+
+
+def test_hash_and_order():
+    ids = ['2401.12345v2', 'hep-th/9901001', '0704.0001', 'math/0703001',
+           '2401.12345v1', '2401.00001', 'astro-ph/9901001']
+    compact = sorted(CompactIdentifier.parse(i) for i in ids)
+    assert [c.idv for c in compact] == [
+        'astro-ph/9901001', 'hep-th/9901001', 'math/0703001', '0704.0001',
+        '2401.00001', '2401.12345v1', '2401.12345v2']
+    assert len({CompactIdentifier.parse('0704.0001'),
+                CompactIdentifier.parse('0704.0001'),
+                CompactIdentifier.parse('0704.0001v1')}) == 2
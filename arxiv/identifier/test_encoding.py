@@ -0,0 +1,64 @@
+"""Tests for :mod:`arxiv.identifier.encoding`."""
+import sys
+
+import pytest
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+from . import IdentifierException
+from .compact import CompactIdentifier
+from .encoding import decode, decode_many, encode, encode_many, month_range
+
+needs_numpy = pytest.mark.skipif(np is None, reason="numpy is not installed")
+
+IDS = ['astro-ph/9901001', 'hep-th/9901001v2', 'math/0703001', '0704.0001',
+       '0704.0001v1', '1412.9999', '1501.00001v3', '2401.12345']
+
+
+@pytest.mark.parametrize('arxiv_id', IDS)
+def test_round_trip(arxiv_id):
+    value = encode(arxiv_id)
+    assert value > 0
+    assert decode(value) == CompactIdentifier.parse(arxiv_id)
+    assert decode(value).idv == arxiv_id
+
+
+def test_fast_path_matches_identifier():
+    for arxiv_id in ['0704.0001', '1412.9999v4', '1501.00001', '2401.12345v2']:
+        assert encode(arxiv_id) == encode(CompactIdentifier.parse(arxiv_id))
+    assert encode('0704.00001') == encode('0704.0001')
+
+
+@needs_numpy
+def test_order_matches_chronology():
+    shuffled = list(reversed(IDS))
+    values = encode_many(shuffled)
+    assert values.dtype == np.int64
+    assert decode_many(np.sort(values)) == IDS
+    assert sorted(encode(i) for i in IDS) == [encode(str(c)) for c in
+                                             sorted(CompactIdentifier.parse(i) for i in IDS)]
+
+
+@needs_numpy
+def test_month_range():
+    values = np.sort(encode_many(IDS))
+    start, end = month_range('0703', '0704')
+    found = values[np.searchsorted(values, start):np.searchsorted(values, end)]
+    assert decode_many(found) == ['math/0703001', '0704.0001', '0704.0001v1']
+
+
+def test_invalid():
+    with pytest.raises(IdentifierException):
+        encode('0704.0000')
+    with pytest.raises(IdentifierException):
+        encode('bad-arch/0101001')
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    assert decode(encode('0704.0001')).idv == '0704.0001'
+    with pytest.raises(ImportError, match=r'arxiv-base\[numpy\]'):
+        encode_many(IDS)
@@ -0,0 +1,100 @@
+"""Tests for :mod:`arxiv.identifier.iteration` and :mod:`arxiv.identifier.sharding`."""
+import json
+
+import pytest
+
+from ..db import Session
+from ..db.models import Metadata
+from ..taxonomy.definitions import CATEGORIES
+from .iteration import arXivIDIterator
+from .sharding import Shard, plan_shards
+
+PAPERS = [
+    # paper_id, versions, abs_categories, source_format
+    ('2401.00001', 2, 'cs.AI', 'tex'),
+    ('2401.00002', 1, 'cs.AR cs.AI', 'pdf'),
+    ('2401.00003', 3, 'math.GN', 'tex'),
+    ('2402.00001', 1, 'hep-th math-ph math.MP', 'tex'),
+    ('2403.00001', 1, 'cs.AI', 'tex'),
+]
+
+
+@pytest.fixture
+def papers(db_configed):
+    with Session() as session:
+        doc_id = 0
+        for paper_id, versions, cats, fmt in PAPERS:
+            doc_id += 1
+            for version in range(1, versions + 1):
+                session.add(Metadata(document_id=doc_id, paper_id=paper_id,
+                                     version=version, abs_categories=cats,
+                                     source_format=fmt, submitter_name='sub',
+                                     submitter_email='sub@example.com',
+                                     is_current=int(version == versions),
+                                     is_withdrawn=0))
+        session.commit()
+    yield
+    with Session() as session:
+        session.query(Metadata).delete()
+        session.commit()
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 1000])
+def test_pages(papers, page_size):
+    ids = [i.idv for i in arXivIDIterator('2401', '2402', page_size=page_size)]
+    assert ids == ['2401.00001v1', '2401.00001v2', '2401.00002v1', '2401.00003v1',
+                   '2401.00003v2', '2401.00003v3', '2402.00001v1']
+
+
+def test_filters(papers):
+    ids = [i.idv for i in arXivIDIterator('2401', '2403', page_size=2,
+                                          categories=[CATEGORIES['cs.AR']])]
+    assert ids == ['2401.00002v1']
+
+    ids = [i.idv for i in arXivIDIterator('2401', '2403', page_size=2,
+                                          categories=[CATEGORIES['cs.AI']],
+                                          only_latest_version=True)]
+    assert ids == ['2401.00001v2', '2401.00002v1', '2403.00001v1']
+
+    ids = [i.idv for i in arXivIDIterator('2401', '2403', source_formats=['pdf'])]
+    assert ids == ['2401.00002v1']
+
+
+def test_chunks(papers):
+    chunks = list(arXivIDIterator('2401', '2403', page_size=2).chunks(3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 2]
+    assert chunks[-1][-1].idv == '2403.00001v1'
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 20])
+def test_plan_shards(papers, n):
+    all_ids = [i.idv for i in arXivIDIterator('2401', '2403')]
+    shards = plan_shards(n, '2401', '2403')
+    assert 1 <= len(shards) <= n
+    assert shards[0].start_id == '2401.00001' and shards[-1].end_id == '2403.00001'
+    shard_ids = [[i.idv for i in Shard(*json.loads(json.dumps(shard))).iterator()]
+                 for shard in shards]
+    assert [i for ids in shard_ids for i in ids] == all_ids
+    assert all(shard_ids)
+
+
+def test_plan_shards_balanced(db_configed):
+    with Session() as session:
+        for month, count in [('0801', 10), ('1501', 100), ('2401', 1000)]:
+            fmt = '04d' if month < '15' else '05d'
+            for num in range(1, count + 1):
+                session.add(Metadata(document_id=1, paper_id=f'{month}.{num:{fmt}}',
+                                     version=1, submitter_name='sub',
+                                     submitter_email='sub@example.com',
+                                     is_current=1, is_withdrawn=0))
+        session.commit()
+    try:
+        shards = plan_shards(4, '0801', '2401')
+        sizes = [sum(1 for _ in shard.iterator()) for shard in shards]
+        assert sum(sizes) == 1110
+        assert max(sizes) - min(sizes) <= 1
+        assert plan_shards(4, '2501', '2512') == []
+    finally:
+        with Session() as session:
+            session.query(Metadata).delete()
+            session.commit()
@@ -0,0 +1,96 @@
+"""Tests for :mod:`arxiv.identifier.scan`."""
+import io
+import os
+import random
+import time
+from typing import Iterator
+
+import pytest
+
+from . import OLD_STYLE, STANDARD
+from .scan import scan_chunks, scan_file, scan_text
+
+PIECES = ['hep-th/9901001', 'arXiv:1501.00001v2', ' math.NA/0303098 ',
+          'cs/0101001v12', '1234.5678', 'x', '  ', '\n', '/0101001',
+          '=1234.5678', 'astro-ph/9912001V3', 'cond-mat/0001001', 'foo bar ',
+          '1203.12345', 'math/0701234.5678', 'hep-ph/1203.12345v12']
+
+
+def _with_regexes(text):
+    """All the matches of the regexes used by `parse_arxiv_id`."""
+    found = [(m.group('arxiv_id'), m.start('arxiv_id'), m.end('arxiv_id'))
+             for regex in (STANDARD, OLD_STYLE) for m in regex.finditer(text)]
+    return sorted(found, key=lambda m: m[1])
+
+
+@pytest.fixture(scope='module')
+def text():
+    rand = random.Random(1)
+    return ''.join(rand.choice(PIECES) for _ in range(2000))
+
+
+def test_scan_text(text):
+    assert [tuple(m) for m in scan_text(text)] == _with_regexes(text)
+    assert [tuple(m) for m in scan_text(text.encode())] == _with_regexes(text)
+
+
+def test_scan_text_examples():
+    found = list(scan_text('See arXiv:2401.12345v2 and hep-th/9901001, not 12345.67890'))
+    assert [m.arxiv_id for m in found] == ['2401.12345v2', 'hep-th/9901001']
+    assert found[1].start == 27 and found[1].end == 41
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 50, 1000])
+def test_scan_chunks(text, chunk_size):
+    expected = _with_regexes(text)
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    assert [tuple(m) for m in scan_chunks(chunks)] == expected
+    assert [tuple(m) for m in scan_file(io.BytesIO(text.encode()), chunk_size)] == expected
+
+
+def test_scan_file_lines(text):
+    assert [tuple(m) for m in scan_chunks(io.StringIO(text))] == _with_regexes(text)
+
+
+WORDS = ("the of and we show that a model for quantum field theory results in see "
+         "also ref et al. 2019 pp. 123-145 Phys. Rev. Lett. 10.1103/PhysRevLett.123.456 "
+         "hep-th/9901001 arXiv:1501.00001v2 math.NA/0303098 1203.12345").split()
+
+
+def _corpus(size: int) -> Iterator[bytes]:
+    """Reference list like text in 1MB chunks."""
+    rand = random.Random(2)
+    chunk = ' '.join(rand.choice(WORDS) for _ in range(180_000)).encode()
+    for _ in range(max(1, size // len(chunk))):
+        yield chunk
+
+
+@pytest.mark.benchmark
+def test_benchmark_scan():
+    """Compare the scanner to the regexes on a corpus of ARXIV_BENCHMARK_MB.
+
+    The regexes are only run on the first 16MB since they are so slow.
+    """
+    size = int(os.environ.get('ARXIV_BENCHMARK_MB', 1024)) * 1024 * 1024
+    start = time.perf_counter()
+    n_bytes = n_ids = 0
+    for chunk in _corpus(size):
+        n_bytes += len(chunk)
+    generate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    n_ids = sum(1 for _ in scan_chunks(_corpus(size)))
+    scan_secs = time.perf_counter() - start - generate
+
+    sample = b''.join(_corpus(16 * 1024 * 1024)).decode()
+    start = time.perf_counter()
+    n_regex = len(_with_regexes(sample))
+    regex_secs = time.perf_counter() - start
+    start = time.perf_counter()
+    assert sum(1 for _ in scan_text(sample)) == n_regex
+    sample_secs = time.perf_counter() - start
+
+    mb = 1024 * 1024
+    print(f"\nscan_chunks: {n_ids} IDs in {n_bytes / mb:.0f}MB at {n_bytes / mb / scan_secs:.1f}MB/s"
+          f"\nregexes: {len(sample) / mb / regex_secs:.2f}MB/s, "
+          f"scan_text: {len(sample) / mb / sample_secs:.1f}MB/s on {len(sample) / mb:.0f}MB")
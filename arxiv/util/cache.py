@@ -0,0 +1,94 @@
+"""Bounded, thread safe LRU cache with per entry time to live."""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar, Union
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+D = TypeVar('D')
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache that holds at most `maxsize` entries for up to `ttl` seconds.
+
+    Keeps counts of hits, misses, evictions due to size and expirations that
+    are available from `stats()`.
+
+    `timer` is only expected to be changed in tests.
+    """
+
+    def __init__(self, maxsize: int, ttl: float,
+                 timer: Callable[[], float] = time.monotonic) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K, default: Optional[D] = None) -> Union[V, D, None]:
+        """Gets the value for `key` or `default` if absent or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires, value = item
+            if expires <= self.timer():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Sets `key` to `value`, expiring after `ttl` or the default TTL."""
+        expires = self.timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """Removes `key`, returning its value if it was present."""
+        with self._lock:
+            item = self._data.pop(key, None)
+            return None if item is None else item[1]
+
+    def keys(self) -> List[K]:
+        """Gets a copy of the keys, which may include expired ones."""
+        with self._lock:
+            return list(self._data)
+
+    def clear(self) -> None:
+        """Removes all entries, the counts are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Gets the counts and the current size."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations,
+                    'size': len(self._data),
+                    'maxsize': self.maxsize}
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            item = self._data.get(key)  # type: ignore
+            return item is not None and item[0] > self.timer()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,36 @@
+"""Tests for :mod:`arxiv.util.cache`."""
+from arxiv.util.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = TTLCache(2, 10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl():
+    timer = FakeTimer()
+    cache = TTLCache(10, 5, timer=timer)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=20)
+    timer.now = 6
+    assert cache.get('a') is None
+    assert cache.get('a', 'gone') == 'gone'
+    assert cache.get('b') == 2
+    stats = cache.stats()
+    assert stats['expirations'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 2
+    assert cache.pop('b') == 2 and len(cache) == 0